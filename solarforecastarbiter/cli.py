@@ -131,9 +131,15 @@ def cli():
               type=UTCTIMESTAMP,
               show_default='23:59:59 Yesterday (UTC)',
               help='datetime to end validation at')
+@click.option('--workers', type=int, default=None,
+              help=('Validate all observations with this many concurrent '
+                    'requests and worker processes'))
+@click.option('--incremental', is_flag=True, default=False,
+              help=('Only validate the values that have not been validated '
+                    'with the latest checks'))
 @click.argument('observation_id', nargs=-1)
 def dailyvalidation(verbose, user, password, start, end, base_url,
-                    observation_id):
+                    workers, incremental, observation_id):
     """
     Run the daily validation tasks for a given set of observations
     """
@@ -143,15 +149,20 @@ def dailyvalidation(verbose, user, password, start, end, base_url,
         logger.info(
             ('Validating daily observation data from %s to %s for all '
              'observations'), start, end)
-        validation_tasks.daily_observation_validation(token, start, end,
-                                                      base_url)
+        if workers is not None:
+            validation_tasks.daily_observation_validation(
+                token, start, end, base_url, max_workers=workers,
+                processes=workers, incremental=incremental)
+        else:
+            validation_tasks.daily_observation_validation(
+                token, start, end, base_url, incremental=incremental)
     else:
         logger.info(
             ('Validating daily observation data from %s to %s for '
              'observations:\n\t%s'), start, end, ','.join(observation_id))
         for obsid in observation_id:
             validation_tasks.daily_single_observation_validation(
-                token, obsid, start, end, base_url)
+                token, obsid, start, end, base_url, incremental=incremental)
 
 
 @cli.group(help=reference_data.CLI_DESCRIPTION)
@@ -218,12 +229,17 @@ def referencedata_update(verbose, user, password, base_url, network, start,
               help='Only convert files at save_directory to netcdf')
 @click.option('--workers', type=int, default=1,
               help='Number of worker processes')
+@click.option('--sidecar-points', type=click.Path(
+    exists=True, resolve_path=True, dir_okay=False),
+              help=('CSV file with latitude and longitude columns. The '
+                    'time series of these points are also saved to a '
+                    'sidecar file for fast reads'))
 @click.argument('save_directory', type=click.Path(
     exists=True, writable=True, resolve_path=True, file_okay=False))
 @click.argument('model', type=click.Choice([
     'gfs_0p25', 'nam_12km', 'rap', 'hrrr_hourly', 'hrrr_subhourly', 'gefs']))
 def fetchnwp(verbose, chunksize, once, use_tmp, netcdf_only, workers,
-             save_directory, model):
+             sidecar_points, save_directory, model):
     """
     Retrieve weather forecasts with variables relevant to solar power
     from the NCEP NOMADS server. The utility function wgrib2 is
@@ -232,6 +248,9 @@ def fetchnwp(verbose, chunksize, once, use_tmp, netcdf_only, workers,
     set_log_level(verbose)
     from solarforecastarbiter.io.fetch import nwp
     nwp.check_wgrib2()
+    if sidecar_points is not None:
+        points = pd.read_csv(sidecar_points)
+        sidecar_points = list(zip(points['latitude'], points['longitude']))
     start_cluster(workers, 4)
     basepath = Path(save_directory)
     if netcdf_only:
@@ -243,11 +262,12 @@ def fetchnwp(verbose, chunksize, once, use_tmp, netcdf_only, workers,
             logger.error('%s is not a valid directory with grib files',
                          path_to_files)
             sys.exit(1)
-        fut = asyncio.ensure_future(nwp.optimize_only(path_to_files, model))
+        fut = asyncio.ensure_future(nwp.optimize_only(
+            path_to_files, model, sidecar_points))
     else:
         logger.info('Fetching NWP forecasts for %s', model)
         fut = asyncio.ensure_future(nwp.run(basepath, model, chunksize,
-                                            once, use_tmp))
+                                            once, use_tmp, sidecar_points))
 
     loop = asyncio.get_event_loop()
 
@@ -273,11 +293,19 @@ def fetchnwp(verbose, chunksize, once, use_tmp, netcdf_only, workers,
                     'initialization time'),
               show_default=True,
               default='10min')
+@click.option('--workers', type=int, default=1, show_default=True,
+              help=('Number of forecast groups to process in parallel '
+                    'worker processes'))
+@click.option('--gefs-member-workers', type=int, default=None,
+              help=('Number of processes to load the GEFS members of a '
+                    'forecast in when forecast groups are processed '
+                    'one at a time'))
 @click.argument('nwp_directory', type=click.Path(
     exists=True, resolve_path=True, file_okay=False),
                 required=False)
 def referencenwp(verbose, user, password, base_url, run_time,
-                 issue_time_buffer, nwp_directory):
+                 issue_time_buffer, workers, gefs_member_workers,
+                 nwp_directory):
     """
     Make the reference NWP forecasts that should be issued around run_time
     """
@@ -285,8 +313,36 @@ def referencenwp(verbose, user, password, base_url, run_time,
     token = cli_access_token(user, password)
     issue_buffer = pd.Timedelta(issue_time_buffer)
     nwp.set_base_path(nwp_directory)
+    nwp.set_grid_index_caching(True)
+    reference_forecasts.models.set_gefs_member_workers(gefs_member_workers)
     reference_forecasts.make_latest_nwp_forecasts(
-        token, run_time, issue_buffer, base_url)
+        token, run_time, issue_buffer, base_url, workers=workers)
+
+
+@cli.command()
+@common_options
+@click.option('--run-time', type=UTCTIMESTAMP,
+              help='Run time for the forecasts',
+              show_default='now',
+              default=pd.Timestamp.utcnow())
+@click.option('--issue-time-buffer', type=str,
+              help=('Max time-delta between the run time and next '
+                    'issue time'),
+              show_default=True,
+              default='10min')
+@click.option('--workers', type=int, default=4, show_default=True,
+              help='Number of forecast values to upload at the same time')
+def referencepersistence(verbose, user, password, base_url, run_time,
+                         issue_time_buffer, workers):
+    """
+    Make the reference persistence forecasts that should be issued around
+    run_time
+    """
+    set_log_level(verbose)
+    token = cli_access_token(user, password)
+    issue_buffer = pd.Timedelta(issue_time_buffer)
+    reference_forecasts.make_latest_persistence_forecasts(
+        token, run_time, issue_buffer, base_url, workers=workers)
 
 
 @cli.command()
@@ -12,7 +12,33 @@ import pandas as pd
 import pytest
 
 
-from solarforecastarbiter import datamodel
+from solarforecastarbiter import datamodel, pvmodel
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', default=False,
+                     help='run the benchmarks, which report timings')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'benchmark: timing comparison, only run with --benchmark')
+
+
+@pytest.fixture(autouse=True)
+def no_solar_position_cache(monkeypatch):
+    # task entry points enable the module cache, which would otherwise
+    # carry over to later tests
+    monkeypatch.setattr(pvmodel, 'SOLAR_POSITION_CACHE', None)
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='needs --benchmark to run')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
 
 
 @pytest.fixture()
@@ -1,18 +1,22 @@
 """
 Functions to connect to and process data from SolarForecastArbiter API
 """
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
+import threading
+import time
+
+
+import pandas as pd
 import requests
 from urllib3 import Retry
 
 
 from solarforecastarbiter import datamodel
 from solarforecastarbiter.io.utils import (
-    json_payload_to_observation_df,
-    json_payload_to_forecast_series,
-    observation_df_to_json_payload,
-    forecast_object_to_json,
+    VALUES_CODECS, JSON_MIMETYPE, get_values_codec,
     adjust_timeseries_for_interval_label,
     serialize_data, deserialize_data,
     serialize_raw_report, deserialize_raw_report,
@@ -34,6 +38,93 @@ def request_cli_access_token(user, password):
     return req.json()['access_token']
 
 
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'revalidations', 'maxsize', 'currsize'])
+
+
+class MetadataCache:
+    """
+    Thread-safe, size-bounded, least-recently-used cache of metadata
+    responses from the API. Entries are fresh for ttl seconds, after
+    which they may be revalidated with the stored ETag.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of responses to keep
+    ttl : float
+        Number of seconds a response may be used without asking the API
+        if it has changed
+    """
+    _Entry = namedtuple('_Entry', ['content', 'etag', 'expires'])
+
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get(self, key):
+        """
+        Get the (content, etag, expires) entry for key or None if not
+        present. The entry is marked as the most recently used.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        return entry is not None and entry.expires > time.monotonic()
+
+    def put(self, key, content, etag=None):
+        with self._lock:
+            self._data[key] = self._Entry(content, etag,
+                                          time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def refresh(self, key):
+        """Reset the expiration time of the entry for key"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data[key] = entry._replace(
+                    expires=time.monotonic() + self.ttl)
+
+    def record(self, hit=False, revalidated=False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            elif revalidated:
+                self.revalidations += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        """
+        Returns
+        -------
+        CacheInfo
+            Named tuple of the number of hits, misses, revalidations with
+            the API that found the entry unchanged, the maxsize and the
+            current size of the cache
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.revalidations,
+                             self.maxsize, len(self._data))
+
+
 class APISession(requests.Session):
     """
     Subclass of requests.Session to handle requets to the SolarForecastArbiter
@@ -52,11 +143,41 @@ class APISession(requests.Session):
         server.
     base_url : string
         URL to use as the base for endpoints to APISession
+    values_format : string
+        Preferred format for transferring timeseries values, one of the
+        keys of :py:data:`solarforecastarbiter.io.utils.VALUES_CODECS`
+        ('json', 'arrow', or 'parquet'). Binary formats are requested
+        with the Accept header and JSON is used when the API does
+        not support the requested format. Default is 'json'.
+    metadata_cache_size : int
+        If greater than zero, cache up to this many site, observation, and
+        forecast metadata responses in the ``metadata_cache`` attribute, a
+        :py:class:`MetadataCache`. The cache is cleared by the create
+        methods. Default is 0, no caching.
+    metadata_cache_ttl : float
+        Number of seconds that cached metadata is used before the API is
+        asked if it has changed with a conditional request.
+
+    Raises
+    ------
+    ValueError
+        If values_format is not a known format
     """
 
     def __init__(self, access_token, default_timeout=(10, 60),
-                 base_url=None):
+                 base_url=None, values_format='json',
+                 metadata_cache_size=0, metadata_cache_ttl=300):
         super().__init__()
+        if values_format not in VALUES_CODECS:
+            raise ValueError(
+                f'Unknown values_format {values_format}, must be one of '
+                f'{", ".join(VALUES_CODECS.keys())}')
+        self.values_format = values_format
+        if metadata_cache_size > 0:
+            self.metadata_cache = MetadataCache(metadata_cache_size,
+                                                metadata_cache_ttl)
+        else:
+            self.metadata_cache = None
         if isinstance(access_token, HiddenToken):
             access_token = access_token.token
         self.headers = {'Authorization': f'Bearer {access_token}',
@@ -102,6 +223,73 @@ class APISession(requests.Session):
 
         return result
 
+    def _get_metadata(self, endpoint):
+        """
+        Get the JSON metadata at endpoint, using the metadata cache if
+        enabled
+        """
+        cache = self.metadata_cache
+        if cache is None:
+            return self.get(endpoint).json()
+        entry = cache.get(endpoint)
+        if cache.is_fresh(entry):
+            cache.record(hit=True)
+            return json.loads(entry.content)
+        headers = {}
+        if entry is not None and entry.etag is not None:
+            headers['If-None-Match'] = entry.etag
+        req = self.get(endpoint, headers=headers)
+        if req.status_code == 304 and entry is not None:
+            cache.record(revalidated=True)
+            cache.refresh(endpoint)
+            return json.loads(entry.content)
+        cache.record()
+        cache.put(endpoint, req.content, req.headers.get('ETag'))
+        return req.json()
+
+    def _clear_metadata_cache(self):
+        if self.metadata_cache is not None:
+            self.metadata_cache.clear()
+
+    @property
+    def _values_accept(self):
+        mimetype = VALUES_CODECS[self.values_format].mimetype
+        if mimetype == JSON_MIMETYPE:
+            return JSON_MIMETYPE
+        return f'{mimetype}, {JSON_MIMETYPE};q=0.5'
+
+    def _get_values(self, endpoint, start, end):
+        """
+        Get timeseries values from endpoint in the negotiated format and
+        return a DataFrame with a DatetimeIndex
+        """
+        req = self.get(endpoint, params={'start': start, 'end': end},
+                       headers={'Accept': self._values_accept})
+        codec = get_values_codec(req.headers.get('Content-Type'))
+        return codec.decode(req.content)
+
+    def _post_values(self, endpoint, payload_df, params=None):
+        """
+        Post the DataFrame of timeseries values to endpoint using the
+        preferred format, falling back to JSON if the API responds that
+        the format is not supported.
+        """
+        codec = VALUES_CODECS[self.values_format]
+        if codec.mimetype != JSON_MIMETYPE:
+            try:
+                return self.post(endpoint, data=codec.encode(payload_df),
+                                 params=params,
+                                 headers={'Content-Type': codec.mimetype})
+            except requests.exceptions.HTTPError as err:
+                if err.response.status_code != 415:
+                    raise
+                logger.warning('%s is not supported for posting values, '
+                               'using JSON instead', codec.mimetype)
+                codec = VALUES_CODECS['json']
+        return self.post(endpoint, data=codec.encode(payload_df),
+                         params=params,
+                         headers={'Content-Type': codec.mimetype})
+
     def _process_site_dict(self, site_dict):
         if (
                 site_dict.get('modeling_parameters', {}).get(
@@ -127,8 +315,7 @@ class APISession(requests.Session):
            Dataclass with all the metadata for the site depending on if
            the Site is a power plant with modeling parameters or not.
         """
-        req = self.get(f'/sites/{site_id}')
-        site_dict = req.json()
+        site_dict = self._get_metadata(f'/sites/{site_id}')
         return self._process_site_dict(site_dict)
 
     def list_sites(self):
@@ -164,6 +351,7 @@ class APISession(requests.Session):
         req = self.post('/sites/', data=site_json,
                         headers={'Content-Type': 'application/json'})
         new_id = req.text
+        self._clear_metadata_cache()
         return self.get_site(new_id)
 
     def get_observation(self, observation_id):
@@ -180,8 +368,8 @@ class APISession(requests.Session):
         -------
         datamodel.Observation
         """
-        req = self.get(f'/observations/{observation_id}/metadata')
-        obs_dict = req.json()
+        obs_dict = self._get_metadata(
+            f'/observations/{observation_id}/metadata')
         site = self.get_site(obs_dict['site_id'])
         obs_dict['site'] = site
         return datamodel.Observation.from_dict(obs_dict)
@@ -228,6 +416,7 @@ class APISession(requests.Session):
         req = self.post('/observations/', data=obs_json,
                         headers={'Content-Type': 'application/json'})
         new_id = req.text
+        self._clear_metadata_cache()
         return self.get_observation(new_id)
 
     def get_forecast(self, forecast_id):
@@ -243,8 +432,8 @@ class APISession(requests.Session):
         -------
         datamodel.Forecast
         """
-        req = self.get(f'/forecasts/single/{forecast_id}/metadata')
-        fx_dict = req.json()
+        fx_dict = self._get_metadata(
+            f'/forecasts/single/{forecast_id}/metadata')
         site = self.get_site(fx_dict['site_id'])
         fx_dict['site'] = site
         return datamodel.Forecast.from_dict(fx_dict)
@@ -290,6 +479,7 @@ class APISession(requests.Session):
         req = self.post('/forecasts/single/', data=fx_json,
                         headers={'Content-Type': 'application/json'})
         new_id = req.text
+        self._clear_metadata_cache()
         return self.get_forecast(new_id)
 
     def list_probabilistic_forecasts(self):
@@ -308,14 +498,27 @@ class APISession(requests.Session):
         out = []
         for fx_dict in fx_dicts:
             site = sites.get(fx_dict['site_id'])
-            fx_dict['site'] = site
-            cvs = []
-            for constant_value_dict in fx_dict['constant_values']:
+            out.append(self._process_prob_forecast_dict(fx_dict, site))
+        return out
+
+    def _process_prob_forecast_dict(self, fx_dict, site):
+        # The constant values share all of the metadata of the
+        # probabilistic forecast except forecast_id and constant_value,
+        # so build them here instead of requesting each one from the API.
+        fx_dict['site'] = site
+        cvs = []
+        for constant_value_dict in fx_dict['constant_values']:
+            if 'constant_value' not in constant_value_dict:
                 cvs.append(self.get_probabilistic_forecast_constant_value(
                     constant_value_dict['forecast_id'], site=site))
-            fx_dict['constant_values'] = cvs
-            out.append(datamodel.ProbabilisticForecast.from_dict(fx_dict))
-        return out
+                continue
+            cv_dict = fx_dict.copy()
+            cv_dict.update(constant_value_dict)
+            cvs.append(
+                datamodel.ProbabilisticForecastConstantValue.from_dict(
+                    cv_dict))
+        fx_dict['constant_values'] = cvs
+        return datamodel.ProbabilisticForecast.from_dict(fx_dict)
 
     def get_probabilistic_forecast(self, forecast_id):
         """
@@ -333,16 +536,9 @@ class APISession(requests.Session):
         """
         # add /metadata after
         # https://github.com/SolarArbiter/solarforecastarbiter-api/issues/158
-        req = self.get(f'/forecasts/cdf/{forecast_id}')
-        fx_dict = req.json()
+        fx_dict = self._get_metadata(f'/forecasts/cdf/{forecast_id}')
         site = self.get_site(fx_dict['site_id'])
-        fx_dict['site'] = site
-        cvs = []
-        for constant_value_dict in fx_dict['constant_values']:
-            cvs.append(self.get_probabilistic_forecast_constant_value(
-                constant_value_dict['forecast_id'], site=site))
-        fx_dict['constant_values'] = cvs
-        return datamodel.ProbabilisticForecast.from_dict(fx_dict)
+        return self._process_prob_forecast_dict(fx_dict, site)
 
     def get_probabilistic_forecast_constant_value(self, forecast_id,
                                                   site=None):
@@ -371,8 +567,7 @@ class APISession(requests.Session):
         """
         # add /metadata after
         # https://github.com/SolarArbiter/solarforecastarbiter-api/issues/158
-        req = self.get(f'/forecasts/cdf/single/{forecast_id}')
-        fx_dict = req.json()
+        fx_dict = self._get_metadata(f'/forecasts/cdf/single/{forecast_id}')
         site_id = fx_dict['site_id']
         if site is None:
             site = self.get_site(site_id)
@@ -413,6 +608,7 @@ class APISession(requests.Session):
         req = self.post('/forecasts/cdf/', data=fx_json,
                         headers={'Content-Type': 'application/json'})
         new_id = req.text
+        self._clear_metadata_cache()
         return self.get_probabilistic_forecast(new_id)
 
     @ensure_timestamps('start', 'end')
@@ -445,12 +641,81 @@ class APISession(requests.Session):
         ValueError
             If start or end cannot be converted into a Pandas Timestamp
         """
-        req = self.get(f'/observations/{observation_id}/values',
-                       params={'start': start, 'end': end})
-        out = json_payload_to_observation_df(req.json())
+        out = self._get_values(f'/observations/{observation_id}/values',
+                               start, end)[['value', 'quality_flag']]
         return adjust_timeseries_for_interval_label(
             out, interval_label, start, end)
 
+    @ensure_timestamps('start', 'end')
+    def iter_observation_values(self, observation_id, start, end,
+                                interval_label=None, chunk='7d'):
+        """
+        Iterate over the observation values from start to end for
+        observation_id in chunks of time. The next chunk is requested
+        from the API while the current chunk is processed so that only
+        about two chunks of data are in memory at once.
+
+        Parameters
+        ----------
+        observation_id : string
+            UUID of the observation object.
+        start : timelike object
+            Start time in interval to retrieve values for
+        end : timelike object
+            End time of the interval
+        interval_label : str or None
+            Interval label of the observation. Values on the boundary
+            between chunks are only included in one chunk, and the first
+            and last chunks are adjusted as in
+            :py:meth:`get_observation_values`.
+        chunk : str or pandas.Timedelta
+            Length of time to request at once
+
+        Yields
+        ------
+        pandas.DataFrame
+            With a datetime index and (value, quality_flag) columns for
+            each chunk of time in order
+
+        Raises
+        ------
+        ValueError
+            If start or end cannot be converted into a Pandas Timestamp
+            or chunk is not a positive length of time
+        """
+        chunk = pd.Timedelta(chunk)
+        if chunk <= pd.Timedelta(0):
+            raise ValueError('chunk must be a positive length of time')
+        bounds = []
+        chunk_start = start
+        while True:
+            chunk_end = chunk_start + chunk
+            if chunk_end >= end:
+                # last chunk includes end unless labeled beginning
+                bounds.append((chunk_start, end, interval_label))
+                break
+            # values at chunk_end belong to the next chunk unless labeled
+            # ending
+            label = 'ending' if interval_label == 'ending' else 'beginning'
+            bounds.append((chunk_start, chunk_end, label))
+            chunk_start = chunk_end
+        return self._prefetch_values(self.get_observation_values,
+                                     observation_id, bounds)
+
+    def _prefetch_values(self, getter, obj_id, bounds):
+        """
+        Generator that calls getter for each (start, end, interval_label)
+        in bounds, requesting the next values in a background thread
+        while the current values are being used.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_fut = executor.submit(getter, obj_id, *bounds[0])
+            for next_bounds in bounds[1:] + [None]:
+                result = next_fut.result()
+                if next_bounds is not None:
+                    next_fut = executor.submit(getter, obj_id, *next_bounds)
+                yield result
+
     @ensure_timestamps('start', 'end')
     def get_forecast_values(self, forecast_id, start, end,
                             interval_label=None):
@@ -480,9 +745,8 @@ class APISession(requests.Session):
         ValueError
             If start or end cannot be converted into a Pandas Timestamp
         """
-        req = self.get(f'/forecasts/single/{forecast_id}/values',
-                       params={'start': start, 'end': end})
-        out = json_payload_to_forecast_series(req.json())
+        out = self._get_values(f'/forecasts/single/{forecast_id}/values',
+                               start, end)['value']
         return adjust_timeseries_for_interval_label(
             out, interval_label, start, end)
 
@@ -515,9 +779,9 @@ class APISession(requests.Session):
         ValueError
             If start or end cannot be converted into a Pandas Timestamp
         """
-        req = self.get(f'/forecasts/cdf/single/{forecast_id}/values',
-                       params={'start': start, 'end': end})
-        out = json_payload_to_forecast_series(req.json())
+        out = self._get_values(
+            f'/forecasts/cdf/single/{forecast_id}/values', start, end
+        )['value']
         return adjust_timeseries_for_interval_label(
             out, interval_label, start, end)
 
@@ -538,10 +802,9 @@ class APISession(requests.Session):
             Parameters passed through POST request. Types are the same as
             Requests <https://2.python-requests.org/en/master/api/#requests.Request>
         """  # NOQA
-        json_vals = observation_df_to_json_payload(observation_df)
-        self.post(f'/observations/{observation_id}/values',
-                  data=json_vals, params=params,
-                  headers={'Content-Type': 'application/json'})
+        self._post_values(f'/observations/{observation_id}/values',
+                          observation_df[['value', 'quality_flag']],
+                          params=params)
 
     def post_forecast_values(self, forecast_id, forecast_series):
         """
@@ -556,10 +819,8 @@ class APISession(requests.Session):
             Pandas series with a datetime index that contains the values to
             upload to the API
         """
-        json_vals = forecast_object_to_json(forecast_series)
-        self.post(f'/forecasts/single/{forecast_id}/values',
-                  data=json_vals,
-                  headers={'Content-Type': 'application/json'})
+        self._post_values(f'/forecasts/single/{forecast_id}/values',
+                          forecast_series.to_frame('value'))
 
     def post_probabilistic_forecast_constant_value_values(self, forecast_id,
                                                           forecast_series):
@@ -575,10 +836,123 @@ class APISession(requests.Session):
             Pandas series with a datetime index that contains the values to
             upload to the API
         """
-        json_vals = forecast_object_to_json(forecast_series)
-        self.post(f'/forecasts/cdf/single/{forecast_id}/values',
-                  data=json_vals,
-                  headers={'Content-Type': 'application/json'})
+        self._post_values(f'/forecasts/cdf/single/{forecast_id}/values',
+                          forecast_series.to_frame('value'))
+
+    def _values_methods(self, obj):
+        """
+        Get the values getter, values poster, and UUID for a datamodel
+        object
+        """
+        if isinstance(obj, datamodel.Observation):
+            return (self.get_observation_values,
+                    self.post_observation_values, obj.observation_id)
+        elif isinstance(obj, datamodel.ProbabilisticForecast):
+            raise TypeError('ProbabilisticForecast values must be requested '
+                            'for each ProbabilisticForecastConstantValue')
+        elif isinstance(obj, datamodel.ProbabilisticForecastConstantValue):
+            return (self.get_probabilistic_forecast_constant_value_values,
+                    self.post_probabilistic_forecast_constant_value_values,
+                    obj.forecast_id)
+        elif isinstance(obj, datamodel.Forecast):
+            return (self.get_forecast_values, self.post_forecast_values,
+                    obj.forecast_id)
+        else:
+            raise TypeError(f'Cannot transfer values for {type(obj)}')
+
+    def _run_bulk(self, func, objects, max_workers):
+        """
+        Run func for each unique object on a thread pool that shares the
+        connection pool of this session. Exceptions are stored as the
+        result for the object instead of being raised.
+        """
+        out = {}
+        # objects may be repeated, but only make each request once
+        objects = list(dict.fromkeys(objects))
+        if len(objects) == 0:
+            return out
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(obj, executor.submit(func, obj)) for obj in objects]
+            for obj, fut in futures:
+                try:
+                    out[obj] = fut.result()
+                except Exception as exc:
+                    logger.error('Request for %s failed: %s', obj.name, exc)
+                    out[obj] = exc
+        return out
+
+    @ensure_timestamps('start', 'end')
+    def get_values_bulk(self, objects, start, end, max_workers=4):
+        """
+        Get the values from start to end for many observations and
+        forecasts with concurrent requests.
+
+        Parameters
+        ----------
+        objects : iterable
+            datamodel.Observation, datamodel.Forecast, and
+            datamodel.ProbabilisticForecastConstantValue objects to
+            retrieve values for. Repeated objects are only requested once.
+        start : timelike object
+            Start of the interval to retrieve values for
+        end : timelike object
+            End of the interval
+        max_workers : int
+            Maximum number of requests to make at the same time. Values
+            larger than the connection pool size (10) will not make more
+            simultaneous connections.
+
+        Returns
+        -------
+        dict
+            Keys are the objects and values are a pandas.DataFrame of
+            observation values or a pandas.Series of forecast values. If the
+            request for an object failed, the value is the exception that
+            was raised so the other results are still available.
+
+        Raises
+        ------
+        ValueError
+            If start or end cannot be converted into a Pandas Timestamp
+        """
+        def get(obj):
+            getter, _, obj_id = self._values_methods(obj)
+            return getter(obj_id, start, end)
+
+        return self._run_bulk(get, objects, max_workers)
+
+    def post_values_bulk(self, values, params=None, max_workers=4):
+        """
+        Upload the values for many observations and forecasts with
+        concurrent requests.
+
+        Parameters
+        ----------
+        values : dict
+            Keys are datamodel.Observation, datamodel.Forecast, or
+            datamodel.ProbabilisticForecastConstantValue objects and values
+            are the pandas.DataFrame or pandas.Series to upload as in
+            :py:meth:`post_observation_values` and
+            :py:meth:`post_forecast_values`.
+        params : dict, list, string, default None
+            Parameters passed through POST requests for observation values.
+        max_workers : int
+            Maximum number of requests to make at the same time.
+
+        Returns
+        -------
+        dict
+            Keys are the objects and values are None if the upload
+            succeeded or the exception that was raised if it failed.
+        """
+        def post(obj):
+            _, poster, obj_id = self._values_methods(obj)
+            if isinstance(obj, datamodel.Observation):
+                poster(obj_id, values[obj], params=params)
+            else:
+                poster(obj_id, values[obj])
+
+        return self._run_bulk(post, values.keys(), max_workers)
 
     def _process_report_dict(self, rep_dict):
         req_dict = rep_dict['report_parameters']
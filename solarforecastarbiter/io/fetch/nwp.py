@@ -47,6 +47,8 @@ import xarray as xr
 
 from solarforecastarbiter.io.fetch import (
     make_session, run_in_executor, abort_all_on_exception)
+from solarforecastarbiter.io.nwp import (
+    write_point_sidecar, point_sidecar_paths)
 
 
 logger = logging.getLogger(__name__)
@@ -535,8 +537,10 @@ def _process_grib(folder, nctmp, grib_prefix, wind_in_model):
     return nctmp
 
 
-def _optimize_netcdf(nctmpfile, out_path):
-    """Optmizes the netcdf file for accessing by time slice."""
+def _optimize_netcdf(nctmpfile, out_path, sidecar_points=None):
+    """Optmizes the netcdf file for accessing by time slice. If
+    sidecar_points is a list of (latitude, longitude), also writes the
+    time series of these points to a sidecar of out_path."""
     ds = xr.open_dataset(nctmpfile, engine='netcdf4',
                          backend_kwargs={'mode': 'r'})
     # time is likely unlimited
@@ -561,11 +565,18 @@ def _optimize_netcdf(nctmpfile, out_path):
                  mode='w', unlimited_dims=None,
                  encoding=encoding)
     ds.close()
+    if sidecar_points is not None:
+        # read back the optimized file so that the sidecar has exactly
+        # the values stored in the netcdf file
+        with xr.open_dataset(out_path) as optimized:
+            write_point_sidecar(optimized, sidecar_points, out_path)
 
 
-async def optimize_netcdf(nctmpfile, final_path):
+async def optimize_netcdf(nctmpfile, final_path, sidecar_points=None):
     """Compress the netcdf file and adjust the chunking for fast time-series
-    access"""
+    access. Optionally write a sidecar with the time-series of
+    sidecar_points, see
+    :py:func:`solarforecastarbiter.io.nwp.write_point_sidecar`"""
     logger.info('Optimizing NetCDF file to save at %s', final_path)
     parent = Path(final_path.parent)
     if not parent.is_dir():
@@ -575,12 +586,21 @@ async def optimize_netcdf(nctmpfile, final_path):
     tmp_path = Path(tmp_path)
     # possible that this leaks memory, so run in separate process
     # that is restarted after a number of jobs
+    tmp_sidecar = point_sidecar_paths(tmp_path)
     try:
-        await run_in_executor(_optimize_netcdf, nctmpfile, tmp_path)
+        await run_in_executor(_optimize_netcdf, nctmpfile, tmp_path,
+                              sidecar_points)
     except Exception:
         tmp_path.unlink()
+        for path in tmp_sidecar:
+            if path.exists():
+                path.unlink()
         raise
     else:
+        if sidecar_points is not None:
+            final_sidecar = point_sidecar_paths(final_path)
+            for tmp, final in zip(tmp_sidecar, final_sidecar):
+                tmp.rename(final)
         tmp_path.rename(final_path)
         final_path.chmod(stat.S_IRGRP | stat.S_IRUSR | stat.S_IROTH |
                          stat.S_IWUSR)
@@ -649,7 +669,8 @@ async def next_run_time(inittime, modelpath, model):
     return inittime
 
 
-async def _run_loop(session, model, modelpath, chunksize, once, use_tmp):
+async def _run_loop(session, model, modelpath, chunksize, once, use_tmp,
+                    sidecar_points=None):
     inittime = await startup_find_next_runtime(modelpath, session, model)
     while True:
         fetch_tasks = set()
@@ -672,7 +693,7 @@ async def _run_loop(session, model, modelpath, chunksize, once, use_tmp):
             try:
                 nctmpfile = await process_grib_to_netcdf(path_to_files,
                                                          model)
-                await optimize_netcdf(nctmpfile, finalpath)
+                await optimize_netcdf(nctmpfile, finalpath, sidecar_points)
             except Exception:
                 raise
         if use_tmp:
@@ -688,12 +709,14 @@ async def _run_loop(session, model, modelpath, chunksize, once, use_tmp):
             inittime = await next_run_time(inittime, modelpath, model)
 
 
-async def run(basepath, model_name, chunksize, once=False, use_tmp=False):
+async def run(basepath, model_name, chunksize, once=False, use_tmp=False,
+              sidecar_points=None):
     session = make_session()
     modelpath = basepath / model_name
     if model_name != 'gefs':
         model = model_map[model_name]
-        await _run_loop(session, model, modelpath, chunksize, once, use_tmp)
+        await _run_loop(session, model, modelpath, chunksize, once, use_tmp,
+                        sidecar_points)
     else:
         base_model = model_map[model_name].copy()
         members = base_model.pop('members')
@@ -705,17 +728,17 @@ async def run(basepath, model_name, chunksize, once=False, use_tmp=False):
             model['filename'] = model['filename'].format(stat_or_member=member)
             member_loops.add(asyncio.create_task(
                 _run_loop(session, model, modelpath, chunksize, once,
-                          use_tmp)))
+                          use_tmp, sidecar_points)))
         await asyncio.wait(member_loops)
     await session.close()
 
 
-async def optimize_only(path_to_files, model_name):
+async def optimize_only(path_to_files, model_name, sidecar_points=None):
     model = model_map[model_name]
     nctmpfile = await process_grib_to_netcdf(path_to_files, model)
     try:
         await optimize_netcdf(
-            nctmpfile, path_to_files / f'{model_name}.nc')
+            nctmpfile, path_to_files / f'{model_name}.nc', sidecar_points)
     except Exception:
         raise
     else:
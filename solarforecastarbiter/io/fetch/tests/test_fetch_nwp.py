@@ -3,8 +3,10 @@ from pathlib import Path
 
 import aiohttp
 from asynctest import CoroutineMock, MagicMock
+import numpy as np
 import pandas as pd
 import pytest
+import xarray as xr
 
 
 from solarforecastarbiter.io.fetch import nwp
@@ -266,3 +268,28 @@ async def test_next_run_time(mocker, tmp_path):
         (pp / 'file.nc').touch()
     res = await nwp.next_run_time(init, tmp_path, model)
     assert res == pd.Timestamp('20190410T0000Z')
+
+
+@pytest.mark.parametrize('sidecar_points', [None, [(32.2, -110.9)]])
+def test__optimize_netcdf(tmp_path, sidecar_points):
+    lat, lon = np.meshgrid(np.linspace(31, 33, 60),
+                           np.linspace(248, 251, 70), indexing='ij')
+    time = pd.date_range('20190515T0000', freq='1h', periods=4)
+    ds = xr.Dataset(
+        {'t2m': (('time', 'y', 'x'), np.full((4, 60, 70), 300.)),
+         'dswrf': (('time', 'y', 'x'), np.full((4, 60, 70), 500.))},
+        coords={'time': time, 'latitude': (('y', 'x'), lat),
+                'longitude': (('y', 'x'), lon)})
+    infile = tmp_path / 'in.nc'
+    ds.to_netcdf(infile)
+    out_path = tmp_path / 'out.nc'
+    nwp._optimize_netcdf(infile, out_path, sidecar_points)
+    with xr.open_dataset(out_path) as out:
+        assert out.t2m.encoding['chunksizes'] == (4, 50, 50)
+    npy_path = tmp_path / 'out.points.npy'
+    if sidecar_points is None:
+        assert not npy_path.exists()
+    else:
+        data = np.load(npy_path)
+        assert data.shape == (1, 2, 4)
+        assert (data[0, 0] == 300).all()
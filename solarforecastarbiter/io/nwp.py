@@ -1,11 +1,25 @@
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import logging
+import os
 from pathlib import Path
+import threading
 
 
 import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
 import xarray as xr
 
 
+logger = logging.getLogger(__name__)
+
+
 BASE_PATH = ''
+CACHE_GRID_INDEX = False
 
 
 def set_base_path(new_path):
@@ -14,6 +28,12 @@ def set_base_path(new_path):
         BASE_PATH = new_path
 
 
+def set_grid_index_caching(enabled):
+    """Save model grid indexes to files next to the NWP files"""
+    global CACHE_GRID_INDEX
+    CACHE_GRID_INDEX = bool(enabled)
+
+
 CF_MAPPING = {
     't2m': 'air_temperature',
     'si10': 'wind_speed',
@@ -24,17 +44,211 @@ CF_MAPPING = {
 }
 
 
-def _load_pnt(ds, latitude, longitude, limit):
-    lats = ds.latitude.values
-    lons = ds.longitude.values
-    if lats.ndim == 1:
-        # ds uses lat and lon as primary coordinates. We still want to use
-        # tunnel_fast to determine distance so that we can check that
-        # the query point is not too far out of the domain.
-        # tunnel_fast requires 2D grid
-        lons, lats = np.meshgrid(lons, lats)
-    iy_min, ix_min = tunnel_fast(lats, lons, latitude, longitude,
-                                 limit=limit)
+def _unit_sphere_xyz(latitude, longitude):
+    """Cartesian coordinates on the unit sphere, shape (n, 3)"""
+    rad_factor = np.pi/180.0
+    latvals = np.asarray(latitude, dtype='float64').ravel() * rad_factor
+    lonvals = np.asarray(longitude, dtype='float64').ravel() * rad_factor
+    clat = np.cos(latvals)
+    return np.stack([clat * np.cos(lonvals), clat * np.sin(lonvals),
+                     np.sin(latvals)], axis=1)
+
+
+class GridIndex:
+    """
+    Nearest neighbor index of the cells of an NWP model grid.
+
+    A KD-tree is built from the unit sphere coordinates of the grid
+    cells so that the closest cell to a point is found in O(log n)
+    instead of computing the distance to every cell as
+    :py:func:`tunnel_fast` does. The distances are the same tunnel
+    (chord) distances used by :py:func:`tunnel_fast`.
+
+    Parameters
+    ----------
+    latitude : numpy.array
+        2D array of model latitudes.
+    longitude : numpy.array
+        2D array of model longitudes.
+    """
+    def __init__(self, latitude, longitude):
+        self.shape = np.shape(latitude)
+        self.tree = cKDTree(_unit_sphere_xyz(latitude, longitude))
+
+    @classmethod
+    def from_points(cls, points, shape):
+        """Build the index from the unit sphere coordinates of the grid
+        cells, e.g. the ``tree.data`` of another index."""
+        index = cls.__new__(cls)
+        index.shape = tuple(shape)
+        index.tree = cKDTree(points)
+        return index
+
+    @staticmethod
+    def fingerprint(latitude, longitude):
+        """Hash that identifies a grid by its shape and coordinates"""
+        digest = hashlib.sha1(str(np.shape(latitude)).encode())
+        for coord in (latitude, longitude):
+            digest.update(np.ascontiguousarray(coord, dtype='float64'))
+        return digest.hexdigest()
+
+    def query(self, latitudes, longitudes, limit=None):
+        """
+        Find the closest grid cells to many points.
+
+        Parameters
+        ----------
+        latitudes : array-like
+            Latitudes of the desired points.
+        longitudes : array-like
+            Longitudes of the desired points.
+        limit : None or float
+            Maximum distance allowed in units of km.
+
+        Returns
+        -------
+        iy : numpy.array
+            Latitude (or y) index of the closest cell to each point.
+        ix : numpy.array
+            Longitude (or x) index of the closest cell to each point.
+
+        Raises
+        ------
+        ValueError
+            If any closest point exceeds the maximum distance.
+        """
+        iy_min, ix_min, dist = self.nearest(latitudes, longitudes)
+        if limit is not None and (dist > limit).any():
+            raise ValueError('Maximum distance limit exceeded')
+        return iy_min, ix_min
+
+    def nearest(self, latitudes, longitudes):
+        """
+        Like :py:meth:`query`, but also returns the distance in km to
+        each closest grid cell instead of checking a limit.
+        """
+        dist, minindex_1d = self.tree.query(
+            _unit_sphere_xyz(latitudes, longitudes))
+        iy_min, ix_min = np.unravel_index(minindex_1d, self.shape)
+        return iy_min, ix_min, 6378.1 * dist
+
+
+# grid fingerprint -> GridIndex
+_GRID_INDEXES = {}
+# (file path, modification time) -> grid fingerprint
+_GRID_FINGERPRINTS = OrderedDict()
+_GRID_FINGERPRINTS_MAXSIZE = 4096
+
+
+def _grid_fingerprint(ds):
+    """:py:meth:`GridIndex.fingerprint` of the grid of *ds*, hashed
+    once per file when *ds* was opened from a file"""
+    source = ds.encoding.get('source')
+    file_key = None
+    if source is not None:
+        try:
+            file_key = (str(source), os.stat(source).st_mtime_ns)
+        except OSError:
+            pass
+        else:
+            fingerprint = _GRID_FINGERPRINTS.get(file_key)
+            if fingerprint is not None:
+                _GRID_FINGERPRINTS.move_to_end(file_key)
+                return fingerprint
+    fingerprint = GridIndex.fingerprint(ds.latitude.values,
+                                        ds.longitude.values)
+    if file_key is not None:
+        _GRID_FINGERPRINTS[file_key] = fingerprint
+        while len(_GRID_FINGERPRINTS) > _GRID_FINGERPRINTS_MAXSIZE:
+            _GRID_FINGERPRINTS.popitem(last=False)
+    return fingerprint
+
+
+def get_grid_index(ds, cache_dir=None):
+    """
+    Get the :py:class:`GridIndex` of the grid of a model dataset.
+
+    Indexes are kept in memory for the life of the process, identified
+    by the :py:meth:`GridIndex.fingerprint` of the grid coordinates,
+    which is only calculated once for each file. If *cache_dir* is
+    given, the grid cell coordinates of the index are also read from or
+    saved to a file in that directory so that they are only calculated
+    once per model grid.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        Dataset with latitude and longitude coordinates. The
+        coordinates are either 1D or 2D (y, x).
+    cache_dir : None, str, or pathlib.Path
+        Directory of the cached index files, typically the directory
+        of the model's NetCDF files.
+
+    Returns
+    -------
+    GridIndex
+    """
+    key = _grid_fingerprint(ds)
+    if key in _GRID_INDEXES:
+        return _GRID_INDEXES[key]
+
+    index = None
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = Path(cache_dir) / f'grid_index_{key[:16]}.npz'
+        index = _load_grid_index(cache_file, key)
+    if index is None:
+        lats = ds.latitude.values
+        lons = ds.longitude.values
+        if lats.ndim == 1:
+            lons, lats = np.meshgrid(lons, lats)
+        index = GridIndex(lats, lons)
+        if cache_file is not None:
+            _save_grid_index(index, cache_file, key)
+    _GRID_INDEXES[key] = index
+    return index
+
+
+def _load_grid_index(cache_file, fingerprint):
+    # the tree is rebuilt from the saved points, which are read without
+    # unpickling anything
+    try:
+        with np.load(cache_file, allow_pickle=False) as npz:
+            if str(npz['fingerprint']) != fingerprint:
+                return None
+            return GridIndex.from_points(npz['points'], npz['shape'])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError):
+        logger.warning('Unable to read grid index %s', cache_file,
+                       exc_info=True)
+        return None
+
+
+def _save_grid_index(index, cache_file, fingerprint):
+    # write to a temporary file and rename so that other processes
+    # never read a partially written index
+    tmp_file = cache_file.with_name(
+        f'.{cache_file.stem}.{os.getpid()}.tmp.npz')
+    try:
+        np.savez(tmp_file, points=index.tree.data,
+                 shape=np.asarray(index.shape, dtype='int64'),
+                 fingerprint=np.asarray(fingerprint))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        logger.warning('Unable to save grid index to %s', cache_file,
+                       exc_info=True)
+
+
+def _nearest_grid_indices(ds, latitudes, longitudes, limit, cache_dir=None):
+    index = get_grid_index(ds, cache_dir=cache_dir)
+    return index.query(latitudes, longitudes, limit=limit)
+
+
+def _load_pnt(ds, latitude, longitude, limit, cache_dir=None):
+    iy_min, ix_min = _nearest_grid_indices(ds, [latitude], [longitude],
+                                           limit, cache_dir=cache_dir)
+    iy_min, ix_min = iy_min[0], ix_min[0]
     # could avoid this if statement if we only use positional indexing
     # like ds[iy_min, ix_min] but this seems safer
     if ds.latitude.ndim == 1:
@@ -44,6 +258,272 @@ def _load_pnt(ds, latitude, longitude, limit):
     return pnt
 
 
+def _load_pnts(ds, latitudes, longitudes, limit, cache_dir=None):
+    iy_min, ix_min = _nearest_grid_indices(ds, latitudes, longitudes, limit,
+                                           cache_dir=cache_dir)
+    iy_min = xr.DataArray(iy_min, dims='point')
+    ix_min = xr.DataArray(ix_min, dims='point')
+    if ds.latitude.ndim == 1:
+        pnts = ds.isel(latitude=iy_min, longitude=ix_min)
+    else:
+        pnts = ds.isel(y=iy_min, x=ix_min)
+    return pnts
+
+
+def _model_dir(model, base_path):
+    base_path = base_path if base_path is not None else BASE_PATH
+    if 'gefs' in model:
+        # account for slightly different file layout for gefs
+        model_path = 'gefs'
+    else:
+        model_path = model
+    return Path(base_path) / model_path
+
+
+def _grid_index_dir(model, base_path):
+    if CACHE_GRID_INDEX:
+        return _model_dir(model, base_path)
+    return None
+
+
+class DatasetPool:
+    """
+    Least recently used pool of open NWP datasets.
+
+    Opening a NetCDF file and parsing its metadata is a significant
+    part of the time to load a single point. Datasets in the pool are
+    kept open and reused by later calls for the same file. Files are
+    identified by their path and modification time, so a file that is
+    rewritten is opened again.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of datasets to keep open. Datasets that are in
+        use do not count against this limit and are never closed
+        while in use. If 0, datasets are closed as soon as they are
+        no longer in use.
+    """
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # key -> [dataset, number of users]
+        self._datasets = OrderedDict()
+        self._retired = {}
+
+    @contextmanager
+    def dataset(self, filepath):
+        """
+        Context manager that yields the open xarray.Dataset of
+        *filepath* from the pool, opening it if needed.
+        """
+        filepath = Path(filepath)
+        key = (str(filepath.resolve()), filepath.stat().st_mtime_ns)
+        with self._lock:
+            entry = self._datasets.get(key)
+            if entry is not None:
+                self._datasets.move_to_end(key)
+                entry[1] += 1
+        if entry is None:
+            ds = xr.open_dataset(filepath)
+            with self._lock:
+                entry = self._datasets.get(key)
+                if entry is None:
+                    entry = [ds, 1]
+                    self._retire_path(key[0])
+                    self._datasets[key] = entry
+                else:
+                    # another thread opened the same file first
+                    entry[1] += 1
+                    ds.close()
+        try:
+            yield entry[0]
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                to_close = self._evict()
+            for ds in to_close:
+                ds.close()
+
+    def _retire_path(self, path):
+        # must be called with the lock held. older versions of a
+        # rewritten file are removed from the pool and closed when idle
+        for key in [k for k in self._datasets if k[0] == path]:
+            entry = self._datasets.pop(key)
+            self._retired[id(entry)] = entry
+
+    def _evict(self):
+        # must be called with the lock held. returns the datasets that
+        # are no longer in the pool or in use and should be closed
+        to_close = [self._retired.pop(key)[0] for key in
+                    [k for k, entry in self._retired.items()
+                     if entry[1] == 0]]
+        while len(self._datasets) > self.maxsize:
+            idle = [key for key, entry in self._datasets.items()
+                    if entry[1] == 0]
+            if idle:
+                to_close.append(self._datasets.pop(idle[0])[0])
+            else:
+                break
+        return to_close
+
+    def close(self):
+        """
+        Close all datasets in the pool. Datasets that are in use are
+        closed once they are released.
+        """
+        with self._lock:
+            for entry in self._datasets.values():
+                self._retired[id(entry)] = entry
+            self._datasets.clear()
+            to_close = self._evict()
+        for ds in to_close:
+            ds.close()
+
+    def __len__(self):
+        return len(self._datasets)
+
+
+DATASET_POOL = DatasetPool()
+
+
+def set_dataset_pool_size(maxsize):
+    """Set the number of NWP datasets kept open by
+    :py:func:`load_forecast` and :py:func:`load_forecasts`"""
+    with DATASET_POOL._lock:
+        DATASET_POOL.maxsize = maxsize
+        to_close = DATASET_POOL._evict()
+    for ds in to_close:
+        ds.close()
+
+
+def close_datasets():
+    """Close the NWP datasets that are kept open in the pool"""
+    DATASET_POOL.close()
+
+
+# close while the netCDF4 library is still available at exit
+atexit.register(close_datasets)
+
+
+def _model_filepath(init_time, model, base_path):
+    filepath = (_model_dir(model, base_path) /
+                init_time.strftime('%Y/%m/%d/%H') / (model + '.nc'))
+    if not filepath.is_file():
+        raise FileNotFoundError(f'{filepath} does not exist')
+    return filepath
+
+
+def point_sidecar_paths(filepath):
+    """Paths of the array and metadata files of the point sidecar of
+    the NetCDF file at *filepath*"""
+    filepath = Path(filepath)
+    return (filepath.with_name(filepath.stem + '.points.npy'),
+            filepath.with_name(filepath.stem + '.points.json'))
+
+
+def write_point_sidecar(ds, points, filepath, limit=500):
+    """
+    Write the time series of the grid cells closest to *points* to a
+    sidecar of the NetCDF file at *filepath*.
+
+    The sidecar is an uncompressed numpy array of shape
+    (point, variable, time) in ``<name>.points.npy`` and its metadata
+    in ``<name>.points.json``. :py:func:`load_forecast` reads points
+    from the memory mapped array instead of the NetCDF file when the
+    sidecar exists.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        Dataset of the NetCDF file at *filepath*.
+    points : list of (float, float)
+        The (latitude, longitude) of each point. Points that are
+        further than *limit* km from the model grid are skipped.
+    filepath : str or pathlib.Path
+        Path of the NetCDF file.
+    limit : float
+        Maximum distance in km from a point to its grid cell.
+
+    Returns
+    -------
+    npy_path : pathlib.Path
+    json_path : pathlib.Path
+    """
+    npy_path, json_path = point_sidecar_paths(filepath)
+    points = np.asarray(list(points), dtype='float64').reshape(-1, 2)
+    variables = [k for k in CF_MAPPING if k in ds.data_vars]
+    if len(points) > 0:
+        iy_min, ix_min, dist = get_grid_index(ds).nearest(
+            points[:, 0], points[:, 1])
+        keep = dist <= limit
+        points = points[keep]
+        iy_min, ix_min = iy_min[keep], ix_min[keep]
+    else:
+        iy_min = ix_min = np.array([], dtype='int64')
+    data = np.empty((len(points), len(variables), ds.dims['time']),
+                    dtype='float32')
+    if len(points) > 0:
+        iy_da = xr.DataArray(iy_min, dims='point')
+        ix_da = xr.DataArray(ix_min, dims='point')
+        if ds.latitude.ndim == 1:
+            pnts = ds[variables].isel(latitude=iy_da, longitude=ix_da)
+        else:
+            pnts = ds[variables].isel(y=iy_da, x=ix_da)
+        for i, var in enumerate(variables):
+            data[:, i, :] = pnts[var].transpose('point', 'time').values
+    meta = {
+        'points': points.tolist(),
+        'variables': [CF_MAPPING[k] for k in variables],
+        'time': ds.indexes['time'].asi8.tolist(),
+    }
+    np.save(npy_path, data, allow_pickle=False)
+    with open(json_path, 'w') as f:
+        json.dump(meta, f)
+    return npy_path, json_path
+
+
+def _read_point_sidecar(filepath, points, variables, start, end):
+    """
+    Read the points from the sidecar of *filepath*. Returns a list with
+    the Series of each point or None for points not in the sidecar.
+    Returns None if there is no current sidecar with all variables.
+    """
+    npy_path, json_path = point_sidecar_paths(filepath)
+    try:
+        if npy_path.stat().st_mtime < Path(filepath).stat().st_mtime:
+            return None
+        with open(json_path, 'r') as f:
+            meta = json.load(f)
+        data = np.load(npy_path, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if not set(variables).issubset(meta['variables']):
+        return None
+    var_index = [meta['variables'].index(v) for v in variables]
+    index = pd.DatetimeIndex(meta['time'], name='time').tz_localize('UTC')
+    tslice = index.slice_indexer(start, end)
+    index = index[tslice]
+    sidecar_points = np.asarray(meta['points']).reshape(-1, 2)
+    out = []
+    for latitude, longitude in points:
+        match = np.flatnonzero(
+            np.isclose(sidecar_points[:, 0], latitude, rtol=0, atol=1e-6) &
+            np.isclose(sidecar_points[:, 1], longitude, rtol=0, atol=1e-6))
+        if len(match) == 0:
+            out.append(None)
+            continue
+        values = np.array(data[match[0], var_index, tslice])
+        series = []
+        for i, variable in enumerate(variables):
+            ser = pd.Series(values[i], index=index, name=variable)
+            if variable == 'air_temperature':
+                ser = ser - 273.15  # convert Kelvin to deg C
+            series.append(ser)
+        out.append(series)
+    return out
+
+
 def load_forecast(
         latitude, longitude, init_time, start, end, model,
         variables=('ghi', 'dni', 'dhi', 'air_temperature', 'wind_speed'),
@@ -90,30 +570,107 @@ def load_forecast(
     Raises
     ------
     ValueError : Raised if the requested variable is not found.
+
+    Notes
+    -----
+    If the model file has a point sidecar that contains the point and
+    variables (see :py:func:`write_point_sidecar`), the data is read
+    from the sidecar instead of the NetCDF file.
     """
-    base_path = base_path if base_path is not None else BASE_PATH
-    if 'gefs' in model:
-        # account for slightly different file layout for gefs
-        model_path = 'gefs'
-    else:
-        model_path = model
-    filepath = (Path(base_path) / model_path /
-                init_time.strftime('%Y/%m/%d/%H') / (model + '.nc'))
-    if not filepath.is_file():
-        raise FileNotFoundError(f'{filepath} does not exist')
+    filepath = _model_filepath(init_time, model, base_path)
+    from_sidecar = _read_point_sidecar(filepath, [(latitude, longitude)],
+                                       variables, start, end)
+    if from_sidecar is not None and from_sidecar[0] is not None:
+        return from_sidecar[0]
     mapping_subset = {k: v for k, v in CF_MAPPING.items() if v in variables}
 
     limit = 500  # maximum distance from point to closest grid point
-    with xr.open_dataset(filepath) as ds:
-        pnt = _load_pnt(ds, latitude, longitude, limit)
+    with DATASET_POOL.dataset(filepath) as ds:
+        pnt = _load_pnt(ds, latitude, longitude, limit,
+                        cache_dir=_grid_index_dir(model, base_path))
         pnt = pnt.sel(time=slice(start, end))
         pnt = pnt.rename(mapping_subset)
-        pnt['air_temperature'] -= 273.15  # convert Kelvin to deg C
+        # convert Kelvin to deg C. avoid modifying the data in place
+        # because it may be shared with the pooled dataset
+        pnt['air_temperature'] = pnt['air_temperature'] - 273.15
         series = [pnt[variable].to_series().tz_localize('UTC')
                   for variable in variables]
         return series
 
 
+def load_forecasts(
+        points, init_time, start, end, model,
+        variables=('ghi', 'dni', 'dhi', 'air_temperature', 'wind_speed'),
+        base_path=None):
+    """Load NWP model data for many points from a single read of the
+    model file.
+
+    The file is opened once, the closest grid cells to all points are
+    found in one pass over the model grid, and the time series of every
+    point are extracted together. Points in the point sidecar of the
+    file are read from the sidecar instead.
+
+    Parameters
+    ----------
+    points : list of (float, float)
+        The (latitude, longitude) of each point.
+
+    init_time : pd.Timestamp
+        Full datetime of a model initialization
+
+    start : pd.Timestamp
+
+    end : pd.Timestamp
+
+    model : str
+        Name of model. See :py:func:`load_forecast`.
+
+    variables : list of str
+        The variables to load.
+
+    Returns
+    -------
+    list
+        One item per point in the order of *points*. Each item is the
+        list of pd.Series that :py:func:`load_forecast` returns for
+        that point.
+
+    Raises
+    ------
+    ValueError : Raised if the requested variable is not found or if
+        any point is too far from the model grid.
+    """
+    points = list(points)
+    if len(points) == 0:
+        return []
+    filepath = _model_filepath(init_time, model, base_path)
+    out = _read_point_sidecar(filepath, points, variables, start, end)
+    if out is None:
+        out = [None] * len(points)
+    missing = [i for i, series in enumerate(out) if series is None]
+    if len(missing) == 0:
+        return out
+    latitudes, longitudes = zip(*[points[i] for i in missing])
+    mapping_subset = {k: v for k, v in CF_MAPPING.items() if v in variables}
+
+    limit = 500  # maximum distance from point to closest grid point
+    with DATASET_POOL.dataset(filepath) as ds:
+        pnts = _load_pnts(ds, latitudes, longitudes, limit,
+                          cache_dir=_grid_index_dir(model, base_path))
+        pnts = pnts.sel(time=slice(start, end))
+        pnts = pnts.rename(mapping_subset)[list(variables)].load()
+        if 'air_temperature' in pnts:
+            # convert Kelvin to deg C
+            pnts['air_temperature'] = pnts['air_temperature'] - 273.15
+        index = pnts.indexes['time'].tz_localize('UTC')
+        values = {variable: pnts[variable].transpose('point', 'time').values
+                  for variable in variables}
+    for j, i in enumerate(missing):
+        out[i] = [pd.Series(values[variable][j], index=index, name=variable)
+                  for variable in variables]
+    return out
+
+
 def tunnel_fast(latvar, lonvar, lat0, lon0, limit=None):
     """
     Find closest point in a set of (lat, lon) points to specified point.
@@ -239,6 +239,57 @@ def test_apisession_list_prob_forecasts(requests_mock, many_prob_forecasts,
     assert fx_list == many_prob_forecasts
 
 
+def test_apisession_list_prob_forecasts_request_count(
+        requests_mock, prob_forecast_text, mock_list_sites):
+    session = api.APISession('')
+    # 30 probabilistic forecasts with 21 constant values each
+    group = json.loads(prob_forecast_text)
+    fx_dicts = []
+    for i in range(30):
+        fx_dict = group.copy()
+        fx_dict['forecast_id'] = f'group{i}'
+        fx_dict['constant_values'] = [
+            {'_links': {}, 'constant_value': float(cv),
+             'forecast_id': f'group{i}cv{cv}'}
+            for cv in range(0, 105, 5)]
+        fx_dicts.append(fx_dict)
+    list_mock = requests_mock.register_uri(
+        'GET', re.compile(session.base_url + r'/forecasts/cdf/$'),
+        content=json.dumps(fx_dicts).encode())
+    single_mock = requests_mock.register_uri(
+        'GET', re.compile(f'{session.base_url}/forecasts/cdf/single/.*'))
+    fx_list = session.list_probabilistic_forecasts()
+    assert list_mock.call_count == 1
+    assert single_mock.call_count == 0
+    assert len(fx_list) == 30
+    for i, fx in enumerate(fx_list):
+        assert fx.forecast_id == f'group{i}'
+        assert len(fx.constant_values) == 21
+        cv = fx.constant_values[1]
+        assert cv.forecast_id == f'group{i}cv5'
+        assert cv.constant_value == 5.0
+        assert cv.axis == fx.axis
+        assert cv.site == fx.site
+        assert cv.interval_length == fx.interval_length
+
+
+def test_apisession_get_prob_forecast_missing_constant_value(
+        requests_mock, prob_forecasts, prob_forecast_text, mock_get_site,
+        prob_forecast_constant_value_text):
+    session = api.APISession('')
+    cv_mock = requests_mock.register_uri(
+        'GET', re.compile(f'{session.base_url}/forecasts/cdf/single/.*'),
+        content=prob_forecast_constant_value_text)
+    fx_dict = json.loads(prob_forecast_text)
+    del fx_dict['constant_values'][0]['constant_value']
+    requests_mock.register_uri(
+        'GET', re.compile(session.base_url + r'/forecasts/cdf/[\w-]*$'),
+        content=json.dumps(fx_dict).encode())
+    fx = session.get_probabilistic_forecast('')
+    assert fx == prob_forecasts
+    assert cv_mock.call_count == 1
+
+
 def test_apisession_list_prob_forecasts_empty(requests_mock):
     session = api.APISession('')
     matcher = re.compile(f'{session.base_url}/forecasts/cdf/$')
@@ -304,6 +355,84 @@ def test_apisession_create_prob_forecast(requests_mock, prob_forecasts,
     assert new_forecast == prob_forecasts
 
 
+def test_apisession_metadata_cache_disabled(mock_get_site):
+    session = api.APISession('')
+    assert session.metadata_cache is None
+    session.get_site('123e4567-e89b-12d3-a456-426655440002')
+
+
+def test_apisession_metadata_cache(requests_mock, single_observation,
+                                   single_observation_text, mock_get_site):
+    session = api.APISession('', metadata_cache_size=10)
+    matcher = re.compile(f'{session.base_url}/observations/.*')
+    obs_mock = requests_mock.register_uri('GET', matcher,
+                                          content=single_observation_text)
+    for _ in range(3):
+        obs = session.get_observation(single_observation.observation_id)
+        assert obs == single_observation
+    assert obs_mock.call_count == 1
+    info = session.metadata_cache.info()
+    # one observation and one site request, each hit twice
+    assert info.misses == 2
+    assert info.hits == 4
+    assert info.currsize == 2
+
+
+def test_apisession_metadata_cache_lru(mock_get_site, many_sites):
+    session = api.APISession('', metadata_cache_size=2)
+    ids = [site.site_id for site in many_sites[:3]]
+    for site_id in ids:
+        session.get_site(site_id)
+    assert session.metadata_cache.info().currsize == 2
+    session.get_site(ids[0])
+    assert session.metadata_cache.info().misses == 4
+    session.get_site(ids[2])
+    assert session.metadata_cache.info().hits == 1
+
+
+def test_apisession_metadata_cache_revalidate(requests_mock, site_text,
+                                              single_site, mocker):
+    session = api.APISession('', metadata_cache_size=10,
+                             metadata_cache_ttl=100)
+    matcher = re.compile(f'{session.base_url}/sites/.*')
+    mocked = requests_mock.register_uri('GET', matcher, [
+        {'content': site_text, 'headers': {'ETag': '"v1"'}},
+        {'status_code': 304},
+        {'content': site_text, 'headers': {'ETag': '"v2"'}}])
+    monotonic = mocker.patch('solarforecastarbiter.io.api.time.monotonic',
+                             return_value=0)
+    assert session.get_site(single_site.site_id) == single_site
+    assert session.get_site(single_site.site_id) == single_site
+    assert mocked.call_count == 1
+    # expired, revalidate with etag
+    monotonic.return_value = 101
+    assert session.get_site(single_site.site_id) == single_site
+    assert mocked.call_count == 2
+    assert mocked.last_request.headers['If-None-Match'] == '"v1"'
+    assert session.get_site(single_site.site_id) == single_site
+    assert mocked.call_count == 2
+    # expired and changed
+    monotonic.return_value = 202
+    assert session.get_site(single_site.site_id) == single_site
+    assert mocked.call_count == 3
+    assert session.metadata_cache.get(
+        f'/sites/{single_site.site_id}').etag == '"v2"'
+    assert session.metadata_cache.info()[:3] == (2, 2, 1)
+
+
+def test_apisession_metadata_cache_create_clears(
+        requests_mock, single_site, site_text):
+    session = api.APISession('', metadata_cache_size=10)
+    matcher = re.compile(f'{session.base_url}/sites/.*')
+    requests_mock.register_uri('POST', matcher, text=single_site.site_id)
+    mocked = requests_mock.register_uri('GET', matcher, content=site_text)
+    session.get_site(single_site.site_id)
+    assert session.metadata_cache.info().currsize == 1
+    new_site = session.create_site(single_site)
+    assert new_site == single_site
+    assert mocked.call_count == 2
+
+
 @pytest.fixture(params=[0, 1])
 def obs_start_end(request):
     if request.param == 0:
@@ -440,6 +569,260 @@ def test_apisession_post_prob_forecast_constant_value_values(
     assert mocked.request_history[0].text == '{"values":[{"timestamp":"2019-01-01T13:00:00Z","value":0.0},{"timestamp":"2019-01-01T14:00:00Z","value":1.0},{"timestamp":"2019-01-01T15:00:00Z","value":2.0},{"timestamp":"2019-01-01T16:00:00Z","value":3.0},{"timestamp":"2019-01-01T17:00:00Z","value":4.0},{"timestamp":"2019-01-01T18:00:00Z","value":5.0}]}'  # NOQA
 
 
+def test_apisession_init_bad_values_format():
+    with pytest.raises(ValueError):
+        api.APISession('', values_format='csv')
+
+
+@pytest.fixture()
+def values_server(requests_mock):
+    """Stand-in for the API values endpoints that serves and accepts
+    any supported format and records the bytes transferred"""
+    store = {}
+    transferred = []
+
+    def get_values(request, context):
+        accept = request.headers.get('Accept', utils.JSON_MIMETYPE)
+        codec = utils.get_values_codec(accept.split(',')[0])
+        context.headers['Content-Type'] = codec.mimetype
+        df = store[request.path.split('/')[-2]]
+        out = codec.encode(df.copy())
+        if isinstance(out, str):
+            out = out.encode('utf-8')
+        transferred.append((codec.mimetype, len(out)))
+        return out
+
+    def post_values(request, context):
+        codec = utils.get_values_codec(request.headers['Content-Type'])
+        store[request.path.split('/')[-2]] = codec.decode(
+            request.body).drop(columns='timestamp', errors='ignore')
+        transferred.append((codec.mimetype, len(request.body)))
+        context.status_code = 201
+
+    matcher = re.compile(f'{api.BASE_URL}/.*/values')
+    requests_mock.register_uri('GET', matcher, content=get_values)
+    requests_mock.register_uri('POST', matcher, content=post_values)
+    return store, transferred
+
+
+@pytest.mark.parametrize('values_format', ['json', 'arrow', 'parquet'])
+def test_apisession_observation_values_format_roundtrip(
+        values_server, observation_values, values_format):
+    store, transferred = values_server
+    # decoded index never has a freq
+    observation_values.index.freq = None
+    session = api.APISession('', values_format=values_format)
+    session.post_observation_values('obsid', observation_values)
+    out = session.get_observation_values(
+        'obsid', observation_values.index[0], observation_values.index[-1])
+    pdt.assert_frame_equal(out, observation_values)
+    mimetype = utils.VALUES_CODECS[values_format].mimetype
+    assert [t[0] for t in transferred] == [mimetype, mimetype]
+
+
+@pytest.mark.parametrize('values_format', ['json', 'arrow', 'parquet'])
+def test_apisession_forecast_values_format_roundtrip(
+        values_server, forecast_values, values_format):
+    forecast_values.index.freq = None
+    session = api.APISession('', values_format=values_format)
+    session.post_forecast_values('fxid', forecast_values)
+    out = session.get_forecast_values(
+        'fxid', forecast_values.index[0], forecast_values.index[-1])
+    pdt.assert_series_equal(out, forecast_values)
+    session.post_probabilistic_forecast_constant_value_values(
+        'cvid', forecast_values)
+    out = session.get_probabilistic_forecast_constant_value_values(
+        'cvid', forecast_values.index[0], forecast_values.index[-1])
+    pdt.assert_series_equal(out, forecast_values)
+
+
+@pytest.mark.parametrize('values_format', ['arrow', 'parquet'])
+def test_apisession_binary_values_smaller(values_server, values_format):
+    store, transferred = values_server
+    index = pd.date_range(start='2019-01-01T00:00Z', end='2019-01-31T00:00Z',
+                          freq='1min', name='timestamp')
+    obs = pd.DataFrame({'value': np.random.random(len(index)),
+                        'quality_flag': 2}, index=index)
+    store['obsid'] = obs
+    start, end = index[0], index[-1]
+    json_out = api.APISession('').get_observation_values('obsid', start, end)
+    bin_out = api.APISession(
+        '', values_format=values_format).get_observation_values(
+            'obsid', start, end)
+    pdt.assert_frame_equal(json_out, bin_out)
+    assert transferred[1][1] < transferred[0][1] / 2
+
+
+def test_apisession_get_values_json_fallback(
+        requests_mock, observation_values, observation_values_text):
+    observation_values.index.freq = None
+    session = api.APISession('', values_format='arrow')
+    matcher = re.compile(f'{session.base_url}/observations/.*/values')
+    mocked = requests_mock.register_uri(
+        'GET', matcher, content=observation_values_text,
+        headers={'Content-Type': 'application/json'})
+    out = session.get_observation_values(
+        'obsid', observation_values.index[0], observation_values.index[-1])
+    pdt.assert_frame_equal(out, observation_values)
+    assert mocked.last_request.headers['Accept'].startswith(
+        utils.ARROW_MIMETYPE)
+
+
+def test_apisession_post_values_json_fallback(
+        requests_mock, forecast_values):
+    session = api.APISession('', values_format='parquet')
+    matcher = re.compile(f'{session.base_url}/forecasts/single/.*/values')
+    mocked = requests_mock.register_uri(
+        'POST', matcher, [{'status_code': 415}, {'status_code': 201}])
+    session.post_forecast_values('fxid', forecast_values)
+    assert len(mocked.request_history) == 2
+    assert (mocked.request_history[0].headers['Content-Type'] ==
+            utils.PARQUET_MIMETYPE)
+    assert (mocked.request_history[1].headers['Content-Type'] ==
+            utils.JSON_MIMETYPE)
+    assert json.loads(mocked.request_history[1].text)['values'][0] == {
+        'timestamp': '2019-01-01T13:00:00Z', 'value': 0.0}
+
+
+def test_apisession_post_values_error(requests_mock, forecast_values):
+    session = api.APISession('', values_format='arrow')
+    matcher = re.compile(f'{session.base_url}/forecasts/single/.*/values')
+    mocked = requests_mock.register_uri('POST', matcher, status_code=400)
+    with pytest.raises(requests.exceptions.HTTPError):
+        session.post_forecast_values('fxid', forecast_values)
+    assert len(mocked.request_history) == 1
+
+
+def test_apisession_get_values_bulk(
+        requests_mock, single_observation, single_forecast,
+        prob_forecast_constant_value, observation_values,
+        observation_values_text, forecast_values, forecast_values_text):
+    session = api.APISession('')
+    obs_matcher = re.compile(
+        f'{session.base_url}/observations/{single_observation.observation_id}/values')  # NOQA
+    requests_mock.register_uri('GET', obs_matcher,
+                               content=observation_values_text)
+    fx_matcher = re.compile(f'{session.base_url}/forecasts/.*/values')
+    requests_mock.register_uri('GET', fx_matcher,
+                               content=forecast_values_text)
+    bad_obs = single_observation.replace(observation_id='bad')
+    requests_mock.register_uri(
+        'GET', f'{session.base_url}/observations/bad/values',
+        status_code=404)
+    out = session.get_values_bulk(
+        [single_observation, single_forecast, prob_forecast_constant_value,
+         bad_obs, single_forecast],
+        '2019-01-01T06:00:00-0700', '2019-01-01T13:00:00-0700',
+        max_workers=3)
+    assert list(out.keys()) == [single_observation, single_forecast,
+                                prob_forecast_constant_value, bad_obs]
+    pdt.assert_frame_equal(out[single_observation].reset_index(),
+                           observation_values.reset_index())
+    pdt.assert_series_equal(out[single_forecast].reset_index(drop=True),
+                            forecast_values.reset_index(drop=True))
+    pdt.assert_series_equal(
+        out[prob_forecast_constant_value].reset_index(drop=True),
+        forecast_values.reset_index(drop=True))
+    assert isinstance(out[bad_obs], requests.exceptions.HTTPError)
+    assert len(requests_mock.request_history) == 4
+
+
+def test_apisession_get_values_bulk_empty():
+    session = api.APISession('')
+    assert session.get_values_bulk([], '2019-01-01T00:00Z',
+                                   '2019-01-02T00:00Z') == {}
+
+
+def test_apisession_get_values_bulk_prob_forecast(prob_forecasts):
+    session = api.APISession('')
+    out = session.get_values_bulk([prob_forecasts], '2019-01-01T00:00Z',
+                                  '2019-01-02T00:00Z')
+    assert isinstance(out[prob_forecasts], TypeError)
+
+
+def test_apisession_post_values_bulk(
+        requests_mock, single_observation, single_forecast,
+        prob_forecast_constant_value, observation_values, forecast_values):
+    session = api.APISession('')
+    obs_mock = requests_mock.register_uri(
+        'POST', re.compile(f'{session.base_url}/observations/.*/values'))
+    fx_mock = requests_mock.register_uri(
+        'POST', re.compile(f'{session.base_url}/forecasts/single/.*/values'),
+        status_code=400)
+    cv_mock = requests_mock.register_uri(
+        'POST', re.compile(f'{session.base_url}/forecasts/cdf/.*/values'))
+    out = session.post_values_bulk(
+        {single_observation: observation_values,
+         single_forecast: forecast_values,
+         prob_forecast_constant_value: forecast_values},
+        params='donotvalidate', max_workers=2)
+    assert out[single_observation] is None
+    assert out[prob_forecast_constant_value] is None
+    assert isinstance(out[single_forecast], requests.exceptions.HTTPError)
+    assert obs_mock.last_request.qs == {'donotvalidate': ['']}
+    assert fx_mock.call_count == 1
+    assert cv_mock.call_count == 1
+
+
+@pytest.fixture()
+def long_observation_values(requests_mock):
+    index = pd.date_range(start='2019-01-01T00:00Z', end='2019-01-22T00:00Z',
+                          freq='1h', name='timestamp')
+    values = pd.DataFrame({'value': np.arange(len(index), dtype=float),
+                           'quality_flag': 0}, index=index)
+
+    def get_values(request, context):
+        start = pd.Timestamp(request.qs['start'][0])
+        end = pd.Timestamp(request.qs['end'][0])
+        return utils.VALUES_CODECS['json'].encode(
+            values.loc[start:end].copy()).encode('utf-8')
+
+    matcher = re.compile(f'{api.BASE_URL}/observations/.*/values')
+    mocked = requests_mock.register_uri('GET', matcher, content=get_values)
+    return values, mocked
+
+
+@pytest.mark.parametrize('label', [None, 'instant', 'beginning', 'ending'])
+@pytest.mark.parametrize('chunk', ['7d', pd.Timedelta('5d'), '30d'])
+def test_apisession_iter_observation_values(long_observation_values, label,
+                                            chunk):
+    values, mocked = long_observation_values
+    session = api.APISession('')
+    start = pd.Timestamp('2019-01-01T00:00Z')
+    end = pd.Timestamp('2019-01-21T00:00Z')
+    expected = session.get_observation_values('obsid', start, end, label)
+    chunks = list(session.iter_observation_values(
+        'obsid', start, end, label, chunk=chunk))
+    nchunks = int(np.ceil((end - start) / pd.Timedelta(chunk)))
+    assert len(chunks) == nchunks
+    assert mocked.call_count == nchunks + 1
+    out = pd.concat(chunks)
+    assert not out.index.duplicated().any()
+    pdt.assert_frame_equal(out.reset_index(), expected.reset_index())
+    for chunk_df in chunks[1:-1]:
+        assert len(chunk_df) == pd.Timedelta(chunk) / pd.Timedelta('1h')
+
+
+def test_apisession_iter_observation_values_prefetch(
+        long_observation_values):
+    values, mocked = long_observation_values
+    session = api.APISession('')
+    it = session.iter_observation_values(
+        'obsid', '2019-01-01T00:00Z', '2019-01-21T00:00Z', chunk='7d')
+    assert mocked.call_count == 0
+    next(it)
+    # only the second chunk has been requested in the background
+    it.close()
+    assert mocked.call_count == 2
+
+
+def test_apisession_iter_observation_values_bad_chunk():
+    session = api.APISession('')
+    with pytest.raises(ValueError):
+        session.iter_observation_values(
+            'obsid', '2019-01-01T00:00Z', '2019-01-21T00:00Z', chunk='0d')
+
+
 @pytest.fixture()
 def mock_request_fxobs(report_objects, mocker):
     _, obs, fx0, fx1 = report_objects
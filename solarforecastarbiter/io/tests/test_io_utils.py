@@ -2,6 +2,7 @@ from functools import partial
 import json
 import pandas as pd
 import pandas.testing as pdt
+import pyarrow as pa
 import pytest
 
 from solarforecastarbiter.io import utils
@@ -85,6 +86,57 @@ def test_empty_payload_to_forecast_series():
     assert isinstance(out.index, pd.DatetimeIndex)
 
 
+@pytest.mark.parametrize('encode,decode', [
+    (utils.dataframe_to_arrow_payload, utils.arrow_payload_to_dataframe),
+    (utils.dataframe_to_parquet_payload, utils.parquet_payload_to_dataframe)
+])
+def test_binary_payload_roundtrip(encode, decode):
+    td = TEST_DATA.tz_convert('America/Denver')
+    out = decode(encode(td))
+    pdt.assert_frame_equal(out.reset_index(), TEST_DATA.reset_index())
+    out = decode(encode(td[['value']]))
+    pdt.assert_frame_equal(out.reset_index(),
+                           TEST_DATA[['value']].reset_index())
+
+
+@pytest.mark.parametrize('encode,decode', [
+    (utils.dataframe_to_arrow_payload, utils.arrow_payload_to_dataframe),
+    (utils.dataframe_to_parquet_payload, utils.parquet_payload_to_dataframe)
+])
+def test_binary_payload_empty(encode, decode):
+    td = pd.DataFrame({'value': [], 'quality_flag': []},
+                      index=pd.DatetimeIndex([], tz='UTC', name='timestamp'))
+    out = decode(encode(td))
+    assert list(out.columns) == ['value', 'quality_flag']
+    assert isinstance(out.index, pd.DatetimeIndex)
+    assert len(out) == 0
+
+
+def test_arrow_payload_to_dataframe_epoch_seconds():
+    table = pa.Table.from_arrays(
+        [pa.array(DF_INDEX.asi8 // 10**9), pa.array(TEST_DICT['value'])],
+        names=['timestamp', 'value'])
+    sink = pa.BufferOutputStream()
+    writer = pa.RecordBatchStreamWriter(sink, table.schema)
+    writer.write_table(table)
+    writer.close()
+    out = utils.arrow_payload_to_dataframe(sink.getvalue().to_pybytes())
+    assert (out.index == DF_INDEX).all()
+    assert list(out['value']) == TEST_DICT['value']
+
+
+@pytest.mark.parametrize('mimetype,exp', [
+    ('application/json', 'json'),
+    ('application/json; charset=utf-8', 'json'),
+    (None, 'json'),
+    ('text/html', 'json'),
+    ('application/vnd.apache.arrow.stream', 'arrow'),
+    ('application/vnd.apache.parquet', 'parquet'),
+])
+def test_get_values_codec(mimetype, exp):
+    assert utils.get_values_codec(mimetype) == utils.VALUES_CODECS[exp]
+
+
 @pytest.mark.parametrize('label,exp,start,end', [
     ('instant', TEST_DATA, None, None),
     (None, TEST_DATA, None, None),
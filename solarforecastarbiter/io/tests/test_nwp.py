@@ -1,7 +1,13 @@
+import os
 from pathlib import Path
+import shutil
+import time
 
 
 import numpy as np
+import pandas as pd
+from pandas.testing import assert_series_equal
+import pytest
 import xarray as xr
 
 
@@ -54,3 +60,432 @@ def test_load_pnt_xy():
     pnt = nwp._load_pnt(ds, 32.05, -110.4, 500)
     assert (pnt.latitude - 32.049805) < 1e-6
     assert (pnt.longitude - 249.60938) < 1e-6
+
+
+@pytest.mark.parametrize('model', ['hrrr_hourly', 'gfs_0p25', 'gefs_c00'])
+def test_load_forecasts_matches_load_forecast(model):
+    init_time = pd.Timestamp('20190515T0000Z')
+    start = pd.Timestamp('20190515T0700Z')
+    end = pd.Timestamp('20190515T1200Z')
+    points = [(32.2, -110.9), (32.05, -110.4), (32.2, -110.9)]
+    variables = ('ghi', 'air_temperature', 'wind_speed')
+    if model == 'gefs_c00':
+        variables = ('cloud_cover', 'air_temperature', 'wind_speed')
+    out = nwp.load_forecasts(points, init_time, start, end, model,
+                             variables=variables, base_path=BASE_PATH)
+    assert len(out) == len(points)
+    for (lat, lon), series in zip(points, out):
+        expected = nwp.load_forecast(lat, lon, init_time, start, end, model,
+                                     variables=variables,
+                                     base_path=BASE_PATH)
+        assert len(series) == len(variables)
+        for ser, exp in zip(series, expected):
+            assert_series_equal(ser, exp)
+
+
+def test_load_forecasts_empty():
+    assert nwp.load_forecasts([], pd.Timestamp('20190515T0000Z'), None,
+                              None, 'hrrr_hourly', base_path=BASE_PATH) == []
+
+
+def test_load_forecasts_limit():
+    with pytest.raises(ValueError):
+        nwp.load_forecasts([(32.2, -110.9), (0, 0)],
+                           pd.Timestamp('20190515T0000Z'), None, None,
+                           'hrrr_hourly', base_path=BASE_PATH)
+
+
+def test_nearest_grid_indices_matches_tunnel_fast():
+    lats = np.linspace(20, 50, 61)
+    lons = np.linspace(-130, -60, 141)
+    ds = xr.Dataset(coords={'latitude': lats, 'longitude': lons})
+    rng = np.random.RandomState(0)
+    qlats = rng.uniform(20, 50, 50)
+    qlons = rng.uniform(-130, -60, 50)
+    iy, ix = nwp._nearest_grid_indices(ds, qlats, qlons, 500)
+    mlons, mlats = np.meshgrid(lons, lats)
+    for i in range(len(qlats)):
+        assert (iy[i], ix[i]) == nwp.tunnel_fast(mlats, mlons, qlats[i],
+                                                 qlons[i])
+
+
+@pytest.fixture()
+def curvilinear_grid():
+    # rotated grid similar to the lambert conformal grids of HRRR/NAM
+    y, x = np.meshgrid(np.arange(150.), np.arange(200.), indexing='ij')
+    theta = np.radians(10)
+    lat = 25 + 0.1 * (y * np.cos(theta) + x * np.sin(theta))
+    lon = 240 + 0.12 * (x * np.cos(theta) - y * np.sin(theta))
+    return lat, lon
+
+
+def test_grid_index_matches_tunnel_fast(curvilinear_grid):
+    lat, lon = curvilinear_grid
+    index = nwp.GridIndex(lat, lon)
+    rng = np.random.RandomState(0)
+    qlats = rng.uniform(30, 38, 100)
+    qlons = rng.uniform(-115, -105, 100)
+    iy, ix = index.query(qlats, qlons, limit=500)
+    for i in range(len(qlats)):
+        assert (iy[i], ix[i]) == nwp.tunnel_fast(lat, lon, qlats[i],
+                                                 qlons[i], limit=500)
+
+
+def _hrrr_grid():
+    # rotated 3 km grid with the shape of the HRRR CONUS grid
+    y, x = np.meshgrid(np.arange(1059.), np.arange(1799.), indexing='ij')
+    theta = np.radians(10)
+    lat = 21 + 0.027 * (y * np.cos(theta) + x * np.sin(theta))
+    lon = 225 + 0.034 * (x * np.cos(theta) - y * np.sin(theta))
+    return lat, lon
+
+
+def _gfs_grid():
+    # global 0.25 degree latitude, longitude grid of GFS
+    lon, lat = np.meshgrid(np.arange(0, 360, 0.25),
+                           np.arange(90, -90.25, -0.25))
+    return lat, lon
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('grid', [_hrrr_grid, _gfs_grid],
+                         ids=['hrrr', 'gfs'])
+def test_grid_index_benchmark(grid, tmp_path):
+    lat, lon = grid()
+    rng = np.random.RandomState(0)
+    qlats = rng.uniform(30, 45, 200)
+    qlons = rng.uniform(-115, -85, 200)
+    start = time.perf_counter()
+    index = nwp.GridIndex(lat, lon)
+    build_time = time.perf_counter() - start
+    cache_file = tmp_path / 'grid_index.npz'
+    nwp._save_grid_index(index, cache_file, 'key')
+    start = time.perf_counter()
+    nwp._load_grid_index(cache_file, 'key')
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    iy, ix = index.query(qlats, qlons, limit=500)
+    query_time = time.perf_counter() - start
+    ntunnel = 10
+    start = time.perf_counter()
+    for i in range(ntunnel):
+        assert (iy[i], ix[i]) == nwp.tunnel_fast(lat, lon, qlats[i],
+                                                 qlons[i], limit=500)
+    tunnel_time = (time.perf_counter() - start) / ntunnel
+    print(f'\n{grid.__name__[1:]} {lat.shape}: build {build_time:.3f} s, '
+          f'load {load_time:.3f} s, query {len(qlats)} points '
+          f'{query_time * 1000:.2f} ms, tunnel_fast '
+          f'{tunnel_time * 1000:.2f} ms per point')
+
+
+def test_grid_index_limit(curvilinear_grid):
+    index = nwp.GridIndex(*curvilinear_grid)
+    iy, ix = index.query([0, 32], [0, -110])
+    assert len(iy) == 2
+    with pytest.raises(ValueError):
+        index.query([32, 0], [-110, 0], limit=500)
+
+
+def test_get_grid_index_cache(curvilinear_grid, tmp_path, mocker):
+    mocker.patch.object(nwp, '_GRID_INDEXES', {})
+    lat, lon = curvilinear_grid
+    ds = xr.Dataset(coords={'latitude': (('y', 'x'), lat),
+                            'longitude': (('y', 'x'), lon)})
+    index = nwp.get_grid_index(ds, cache_dir=tmp_path)
+    assert nwp.get_grid_index(ds, cache_dir=tmp_path) is index
+    files = list(tmp_path.glob('grid_index_*.npz'))
+    assert len(files) == 1
+    # nothing in the file needs unpickling
+    with np.load(files[0], allow_pickle=False) as npz:
+        assert set(npz.files) == {'points', 'shape', 'fingerprint'}
+
+    nwp._GRID_INDEXES.clear()
+    unit_sphere = mocker.spy(nwp, '_unit_sphere_xyz')
+    loaded = nwp.get_grid_index(ds, cache_dir=tmp_path)
+    assert loaded is not index
+    # the points are read from the file, not calculated again
+    assert unit_sphere.call_count == 0
+    assert loaded.shape == index.shape
+    assert loaded.query([32], [-110]) == index.query([32], [-110])
+
+    # a different grid gets a different index
+    ds2 = ds.assign_coords(latitude=ds.latitude + 1)
+    assert nwp.get_grid_index(ds2, cache_dir=tmp_path) is not loaded
+    assert len(list(tmp_path.glob('grid_index_*.npz'))) == 2
+
+
+def test_get_grid_index_cache_mismatch(curvilinear_grid, tmp_path, mocker):
+    mocker.patch.object(nwp, '_GRID_INDEXES', {})
+    lat, lon = curvilinear_grid
+    ds = xr.Dataset(coords={'latitude': (('y', 'x'), lat),
+                            'longitude': (('y', 'x'), lon)})
+    key = nwp.GridIndex.fingerprint(lat, lon)
+    cache_file = tmp_path / f'grid_index_{key[:16]}.npz'
+    # a file of another grid with the same file name
+    np.savez(cache_file, points=np.zeros((1, 3)), shape=np.array([1, 1]),
+             fingerprint=np.asarray('other'))
+    index = nwp.get_grid_index(ds, cache_dir=tmp_path)
+    assert index.shape == lat.shape
+    nwp._GRID_INDEXES.clear()
+    cache_file.write_bytes(b'not an npz file')
+    log = mocker.patch.object(nwp.logger, 'warning')
+    index = nwp.get_grid_index(ds, cache_dir=tmp_path)
+    assert index.shape == lat.shape
+    assert log.called
+
+
+def test_get_grid_index_in_memory(curvilinear_grid, tmp_path, mocker):
+    mocker.patch.object(nwp, '_GRID_INDEXES', {})
+    lats = np.linspace(20, 50, 61)
+    lons = np.linspace(-130, -60, 141)
+    ds = xr.Dataset(coords={'latitude': lats, 'longitude': lons})
+    index = nwp.get_grid_index(ds, cache_dir=tmp_path)
+    # grids of the same shape with the same first, middle and last
+    # coordinates are different grids
+    shifted = lons.copy()
+    shifted[1:70] += 0.1
+    ds2 = ds.assign_coords(longitude=shifted)
+    assert nwp.get_grid_index(ds2) is not index
+    lat, lon = curvilinear_grid
+    lat2 = lat.copy()
+    lat2[1, 1] += 0.01
+    ds3 = xr.Dataset(coords={'latitude': (('y', 'x'), lat),
+                             'longitude': (('y', 'x'), lon)})
+    ds4 = xr.Dataset(coords={'latitude': (('y', 'x'), lat2),
+                             'longitude': (('y', 'x'), lon)})
+    assert nwp.get_grid_index(ds3) is not nwp.get_grid_index(ds4)
+    meshgrid = mocker.patch.object(nwp.np, 'meshgrid')
+    assert nwp.get_grid_index(ds, cache_dir=tmp_path) is index
+    assert nwp.get_grid_index(ds) is index
+    meshgrid.assert_not_called()
+
+
+def test_get_grid_index_fingerprint_once_per_file(tmp_path, mocker):
+    mocker.patch.object(nwp, '_GRID_INDEXES', {})
+    mocker.patch.object(nwp, '_GRID_FINGERPRINTS', nwp.OrderedDict())
+    path = tmp_path / 'grid.nc'
+    xr.Dataset({'a': (('latitude', 'longitude'), np.zeros((61, 141)))},
+               coords={'latitude': np.linspace(20, 50, 61),
+                       'longitude': np.linspace(-130, -60, 141)}
+               ).to_netcdf(path)
+    fingerprint = mocker.spy(nwp.GridIndex, 'fingerprint')
+    with xr.open_dataset(path) as ds:
+        index = nwp.get_grid_index(ds)
+        assert nwp.get_grid_index(ds) is index
+    with xr.open_dataset(path) as ds:
+        assert nwp.get_grid_index(ds) is index
+    assert fingerprint.call_count == 1
+
+
+def test_get_grid_index_unwritable(curvilinear_grid, tmp_path, mocker):
+    mocker.patch.object(nwp, '_GRID_INDEXES', {})
+    lat, lon = curvilinear_grid
+    ds = xr.Dataset(coords={'latitude': (('y', 'x'), lat),
+                            'longitude': (('y', 'x'), lon)})
+    log = mocker.patch.object(nwp.logger, 'warning')
+    index = nwp.get_grid_index(ds, cache_dir=tmp_path / 'missing')
+    assert isinstance(index, nwp.GridIndex)
+    assert log.called
+
+
+def test_load_forecast_grid_index_caching(tmp_path, mocker):
+    mocker.patch.object(nwp, '_GRID_INDEXES', {})
+    mocker.patch.object(nwp, 'CACHE_GRID_INDEX', False)
+    nwp.set_grid_index_caching(True)
+    model_dir = tmp_path / 'hrrr_hourly'
+    shutil.copytree(BASE_PATH / 'hrrr_hourly', model_dir)
+    init_time = pd.Timestamp('20190515T0000Z')
+    variables = ('ghi', 'air_temperature')
+    out = nwp.load_forecast(32.2, -110.9, init_time, None, None,
+                            'hrrr_hourly', variables=variables,
+                            base_path=tmp_path)
+    assert len(list(model_dir.glob('grid_index_*.npz'))) == 1
+    nwp._GRID_INDEXES.clear()
+    out2 = nwp.load_forecast(32.2, -110.9, init_time, None, None,
+                             'hrrr_hourly', variables=variables,
+                             base_path=tmp_path)
+    assert_series_equal(out[0], out2[0])
+
+
+@pytest.fixture()
+def pool_files(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'{i}.nc'
+        xr.Dataset({'a': ('time', np.arange(3.) + i)}).to_netcdf(path)
+        paths.append(path)
+    return paths
+
+
+def test_dataset_pool_reuse(pool_files, mocker):
+    pool = nwp.DatasetPool(maxsize=2)
+    opener = mocker.spy(nwp.xr, 'open_dataset')
+    with pool.dataset(pool_files[0]) as ds:
+        assert ds.a.values[0] == 0
+    with pool.dataset(pool_files[0]) as ds2:
+        assert ds2 is ds
+    assert opener.call_count == 1
+    assert len(pool) == 1
+
+
+def _close_count(close, ds):
+    return sum(call[0][0] is ds for call in close.call_args_list)
+
+
+def test_dataset_pool_lru(pool_files, mocker):
+    close = mocker.spy(xr.Dataset, 'close')
+    pool = nwp.DatasetPool(maxsize=2)
+    with pool.dataset(pool_files[0]) as ds0:
+        pass
+    with pool.dataset(pool_files[1]) as ds1:
+        pass
+    # use 0 again so that 1 is the least recently used
+    with pool.dataset(pool_files[0]):
+        pass
+    with pool.dataset(pool_files[2]):
+        pass
+    assert len(pool) == 2
+    assert _close_count(close, ds1) == 1
+    assert _close_count(close, ds0) == 0
+    pool.close()
+    assert len(pool) == 0
+    assert _close_count(close, ds0) == 1
+
+
+def test_dataset_pool_in_use_not_closed(pool_files, mocker):
+    close = mocker.spy(xr.Dataset, 'close')
+    pool = nwp.DatasetPool(maxsize=0)
+    with pool.dataset(pool_files[0]) as ds:
+        with pool.dataset(pool_files[1]):
+            pass
+        pool.close()
+        assert _close_count(close, ds) == 0
+        assert ds.a.values[0] == 0
+    assert _close_count(close, ds) == 1
+
+
+def test_dataset_pool_mtime(pool_files, mocker):
+    close = mocker.spy(xr.Dataset, 'close')
+    pool = nwp.DatasetPool(maxsize=2)
+    with pool.dataset(pool_files[0]) as ds:
+        pass
+    xr.Dataset({'a': ('time', np.arange(3.) + 10)}).to_netcdf(
+        pool_files[0].with_suffix('.new'))
+    os.replace(pool_files[0].with_suffix('.new'), pool_files[0])
+    stat = pool_files[0].stat()
+    os.utime(pool_files[0], ns=(stat.st_atime_ns,
+                                stat.st_mtime_ns + 10**9))
+    with pool.dataset(pool_files[0]) as new_ds:
+        assert new_ds is not ds
+        assert new_ds.a.values[0] == 10
+    assert _close_count(close, ds) == 1
+    assert len(pool) == 1
+
+
+def test_load_forecast_uses_pool(mocker):
+    mocker.patch.object(nwp, 'DATASET_POOL', nwp.DatasetPool())
+    opener = mocker.spy(nwp.xr, 'open_dataset')
+    init_time = pd.Timestamp('20190515T0000Z')
+    for member in ('gefs_c00', 'gefs_p01', 'gefs_c00'):
+        out = nwp.load_forecast(
+            32.2, -110.9, init_time, None, None, member,
+            variables=('cloud_cover', 'air_temperature'),
+            base_path=BASE_PATH)
+        assert (out[1] < 60).all()
+    nwp.load_forecasts([(32.2, -110.9)], init_time, None, None, 'gefs_c00',
+                       variables=('cloud_cover', 'air_temperature'),
+                       base_path=BASE_PATH)
+    assert opener.call_count == 2
+    assert len(nwp.DATASET_POOL) == 2
+    nwp.set_dataset_pool_size(1)
+    assert len(nwp.DATASET_POOL) == 1
+    nwp.close_datasets()
+    assert len(nwp.DATASET_POOL) == 0
+
+
+@pytest.fixture()
+def hrrr_copy(tmp_path):
+    shutil.copytree(BASE_PATH / 'hrrr_hourly', tmp_path / 'hrrr_hourly')
+    return tmp_path, (tmp_path / 'hrrr_hourly/2019/05/15/00/hrrr_hourly.nc')
+
+
+def test_write_point_sidecar(hrrr_copy):
+    base_path, filepath = hrrr_copy
+    with xr.open_dataset(filepath) as ds:
+        npy, meta = nwp.write_point_sidecar(
+            ds, [(32.2, -110.9), (0, 0), (32.05, -110.4)], filepath)
+    assert npy == filepath.with_name('hrrr_hourly.points.npy')
+    assert meta == filepath.with_name('hrrr_hourly.points.json')
+    data = np.load(npy, mmap_mode='r')
+    # point far outside of the domain is skipped
+    assert data.shape == (2, 6, 37)
+    assert data.dtype == np.float32
+
+
+@pytest.mark.parametrize('start,end', [
+    (None, None),
+    (pd.Timestamp('20190515T0700Z'), pd.Timestamp('20190515T1200Z'))
+])
+def test_load_forecast_point_sidecar(hrrr_copy, mocker, start, end):
+    base_path, filepath = hrrr_copy
+    init_time = pd.Timestamp('20190515T0000Z')
+    mocker.patch.object(nwp, 'DATASET_POOL', nwp.DatasetPool(maxsize=0))
+    expected = nwp.load_forecast(32.2, -110.9, init_time, start, end,
+                                 'hrrr_hourly', base_path=base_path)
+    with xr.open_dataset(filepath) as ds:
+        nwp.write_point_sidecar(ds, [(32.2, -110.9)], filepath)
+    opener = mocker.spy(nwp.xr, 'open_dataset')
+    out = nwp.load_forecast(32.2, -110.9, init_time, start, end,
+                            'hrrr_hourly', base_path=base_path)
+    assert opener.call_count == 0
+    assert len(out) == len(expected)
+    for ser, exp in zip(out, expected):
+        assert_series_equal(ser, exp)
+
+    # points that are not in the sidecar are read from the NetCDF file
+    nwp.load_forecast(32.05, -110.4, init_time, start, end,
+                      'hrrr_hourly', base_path=base_path)
+    assert opener.call_count == 1
+
+
+def test_load_forecasts_point_sidecar(hrrr_copy, mocker):
+    base_path, filepath = hrrr_copy
+    init_time = pd.Timestamp('20190515T0000Z')
+    points = [(32.2, -110.9), (32.05, -110.4)]
+    expected = nwp.load_forecasts(points, init_time, None, None,
+                                  'hrrr_hourly', base_path=base_path)
+    with xr.open_dataset(filepath) as ds:
+        nwp.write_point_sidecar(ds, points[1:], filepath)
+    load_pnts = mocker.spy(nwp, '_load_pnts')
+    out = nwp.load_forecasts(points, init_time, None, None,
+                             'hrrr_hourly', base_path=base_path)
+    assert load_pnts.call_count == 1
+    assert load_pnts.call_args[0][1:3] == ((32.2,), (-110.9,))
+    for series, exp_series in zip(out, expected):
+        for ser, exp in zip(series, exp_series):
+            assert_series_equal(ser, exp)
+
+
+def test_load_forecast_point_sidecar_not_used(hrrr_copy, mocker):
+    base_path, filepath = hrrr_copy
+    init_time = pd.Timestamp('20190515T0000Z')
+    with xr.open_dataset(filepath) as ds:
+        nwp.write_point_sidecar(ds[['t2m', 'dswrf', 'latitude']],
+                                [(32.2, -110.9)], filepath)
+    load_pnt = mocker.spy(nwp, '_load_pnt')
+    # wind speed is not in the sidecar
+    nwp.load_forecast(32.2, -110.9, init_time, None, None, 'hrrr_hourly',
+                      variables=('ghi', 'air_temperature', 'wind_speed'),
+                      base_path=base_path)
+    assert load_pnt.call_count == 1
+    nwp.load_forecast(32.2, -110.9, init_time, None, None, 'hrrr_hourly',
+                      variables=('ghi', 'air_temperature'),
+                      base_path=base_path)
+    assert load_pnt.call_count == 1
+    # the NetCDF file is newer than the sidecar
+    newer = filepath.with_name('hrrr_hourly.points.npy').stat().st_mtime + 10
+    os.utime(filepath, (newer, newer))
+    nwp.load_forecast(32.2, -110.9, init_time, None, None, 'hrrr_hourly',
+                      variables=('ghi', 'air_temperature'),
+                      base_path=base_path)
+    assert load_pnt.call_count == 2
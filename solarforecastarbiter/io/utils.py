@@ -4,13 +4,16 @@
 and vice versa.
 """
 import base64
+from collections import namedtuple
 from functools import wraps
 from inspect import signature
+import json
 import zlib
 
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.parquet as pq
 
 
 from solarforecastarbiter import datamodel
@@ -95,10 +98,10 @@ def forecast_object_to_json(forecast_series):
 
 
 def _json_to_dataframe(json_payload):
-    # in the future, might worry about reading the response in chunks
-    # to stream the data and avoid having it all in memory at once,
-    # but 30 days of 1 minute data is probably ~4 MB of text. A better
-    # approach would probably be to switch to a binary format.
+    # 30 days of 1 minute data is probably ~4 MB of text. The binary
+    # codecs below avoid most of this cost when the API supports them,
+    # and APISession.iter_observation_values limits how much data is
+    # in memory at once for long periods.
     vals = json_payload['values']
     if len(vals) == 0:
         df = pd.DataFrame([], columns=['value', 'quality_flag'],
@@ -152,6 +155,169 @@ def json_payload_to_forecast_series(json_payload):
     return df['value']
 
 
+def _json_content_to_dataframe(content):
+    return _json_to_dataframe(json.loads(content))
+
+
+def _dataframe_to_arrow_table(payload_df):
+    # timestamps are sent as UTC epoch integers so no string formatting
+    # or parsing is required on either end
+    index = pd.DatetimeIndex(payload_df.index).tz_convert('UTC')
+    arrays = [pa.array(index.asi8, type=pa.timestamp('ns', tz='UTC'))]
+    names = ['timestamp']
+    for col in payload_df.columns:
+        arrays.append(pa.array(payload_df[col].values))
+        names.append(col)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _arrow_table_to_dataframe(table):
+    ts = table.column('timestamp')
+    if pa.types.is_timestamp(ts.type):
+        unit = ts.type.unit
+        ts = ts.cast(pa.int64())
+    else:
+        unit = 's'
+    epoch = ts.to_numpy().astype(f'datetime64[{unit}]')
+    index = pd.DatetimeIndex(epoch, name='timestamp').tz_localize('UTC')
+    data = {name: table.column(name).to_numpy()
+            for name in table.column_names if name != 'timestamp'}
+    return pd.DataFrame(data, index=index)
+
+
+def dataframe_to_arrow_payload(payload_df):
+    """
+    Serialize a DataFrame of values to the Arrow IPC streaming format.
+
+    Parameters
+    ----------
+    payload_df : pandas.DataFrame
+        DataFrame with a tz-aware DatetimeIndex and value columns such as
+        'value' and 'quality_flag'.
+
+    Returns
+    -------
+    bytes
+        The Arrow IPC stream with a UTC 'timestamp' column followed
+        by the columns of payload_df
+    """
+    table = _dataframe_to_arrow_table(payload_df)
+    sink = pa.BufferOutputStream()
+    writer = pa.RecordBatchStreamWriter(sink, table.schema)
+    writer.write_table(table)
+    writer.close()
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_payload_to_dataframe(content):
+    """
+    Convert an Arrow IPC stream of values into a DataFrame.
+
+    Parameters
+    ----------
+    content : bytes
+        Arrow IPC stream with a 'timestamp' column of UTC timestamps
+        or integer epoch seconds
+
+    Returns
+    -------
+    pandas.DataFrame
+       With a tz-aware DatetimeIndex named timestamp and the remaining
+       columns of the stream
+    """
+    table = pa.ipc.open_stream(pa.BufferReader(content)).read_all()
+    return _arrow_table_to_dataframe(table)
+
+
+def dataframe_to_parquet_payload(payload_df):
+    """
+    Serialize a DataFrame of values to Parquet.
+
+    Parameters
+    ----------
+    payload_df : pandas.DataFrame
+        DataFrame with a tz-aware DatetimeIndex and value columns such as
+        'value' and 'quality_flag'.
+
+    Returns
+    -------
+    bytes
+        The Parquet file with a UTC 'timestamp' column followed
+        by the columns of payload_df
+    """
+    table = _dataframe_to_arrow_table(payload_df)
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def parquet_payload_to_dataframe(content):
+    """
+    Convert a Parquet file of values into a DataFrame.
+
+    Parameters
+    ----------
+    content : bytes
+        Parquet file with a 'timestamp' column of UTC timestamps
+        or integer epoch seconds
+
+    Returns
+    -------
+    pandas.DataFrame
+       With a tz-aware DatetimeIndex named timestamp and the remaining
+       columns of the file
+    """
+    table = pq.read_table(pa.BufferReader(content))
+    return _arrow_table_to_dataframe(table)
+
+
+JSON_MIMETYPE = 'application/json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+
+ValuesCodec = namedtuple('ValuesCodec', ['mimetype', 'encode', 'decode'])
+ValuesCodec.__doc__ = """
+Encoder and decoder of timeseries values for a particular media type.
+``encode`` takes a DataFrame with a DatetimeIndex and returns the request
+body, and ``decode`` takes the response body and returns a DataFrame with
+a DatetimeIndex named timestamp.
+"""
+
+
+VALUES_CODECS = {
+    'json': ValuesCodec(JSON_MIMETYPE, _dataframe_to_json,
+                        _json_content_to_dataframe),
+    'arrow': ValuesCodec(ARROW_MIMETYPE, dataframe_to_arrow_payload,
+                         arrow_payload_to_dataframe),
+    'parquet': ValuesCodec(PARQUET_MIMETYPE, dataframe_to_parquet_payload,
+                           parquet_payload_to_dataframe),
+}
+
+
+def get_values_codec(mimetype):
+    """
+    Find the codec for the given Content-Type header value, defaulting
+    to JSON if the media type is unknown or missing.
+
+    Parameters
+    ----------
+    mimetype : str or None
+        Value of a Content-Type header, possibly with parameters like
+        charset
+
+    Returns
+    -------
+    ValuesCodec
+    """
+    if mimetype:
+        mimetype = mimetype.split(';')[0].strip().lower()
+        for codec in VALUES_CODECS.values():
+            if codec.mimetype == mimetype:
+                return codec
+    return VALUES_CODECS['json']
+
+
 def adjust_start_end_for_interval_label(interval_label, start, end,
                                         limit_instant=False):
     """
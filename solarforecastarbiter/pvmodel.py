@@ -4,26 +4,465 @@ times, and weather data.
 
 Steps are:
 
-1. Calculate solar position using solar_position
+1. Calculate solar position using calculate_solar_position. Results for
+   regular time grids are kept in a :py:class:`SolarPositionCache`.
 2. If not already known, calculate 3 irradiance components from measured
    GHI using irradiance_components or modeled clear sky using clearsky.
 3. calculate_poa_effective
 4. calculate_power
 
-Steps 3 and 4 are bundled in :py:func:`irradiance_to_power`
+Steps 3 and 4 are bundled in :py:func:`irradiance_to_power` and, for
+ensembles of irradiance forecasts, :py:func:`irradiance_to_power_ensemble`
 """
 
+import calendar
+from collections import OrderedDict
 from functools import partial
+import hashlib
+import logging
+import os
+import threading
 
+
+import numpy as np
+import pandas as pd
 import pvlib
 
 from solarforecastarbiter import datamodel
 
 
+logger = logging.getLogger(__name__)
+
+
+SOLAR_POSITION_COLUMNS = ('apparent_zenith', 'zenith', 'apparent_elevation',
+                          'elevation', 'azimuth', 'equation_of_time')
+CLEARSKY_COLUMNS = ('ghi', 'dni', 'dhi')
+_DAY = pd.Timedelta('1D').value
+# cache grids no finer than 1 minute
+_MAX_GRID_POINTS = 1440
+
+
+def _spa(latitude, longitude, elevation, times):
+    return pvlib.solarposition.get_solarposition(times, latitude,
+                                                 longitude,
+                                                 altitude=elevation,
+                                                 method='nrel_numpy')
+
+
+class SolarPositionCache:
+    """
+    Least recently used cache of solar position and clear sky
+    irradiance on daily time grids.
+
+    Solar position for a regular DatetimeIndex is calculated for every
+    point of each UTC day that the index covers, and the requested
+    times are sliced from the daily grids. A grid is identified by
+    the site latitude, longitude, elevation and the start, end and
+    frequency of the grid, so later calls for other times of the same
+    day and site, such as hourly persistence forecasts or repeated
+    validation, reuse it.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of daily grids to keep in memory.
+    cache_dir : str or None
+        If not None, grids are also saved to and loaded from this
+        directory so that they persist between processes.
+    """
+    def __init__(self, maxsize=256, cache_dir=None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        # key -> [solar position array, {time zone: clear sky array}]
+        self._grids = OrderedDict()
+
+    @staticmethod
+    def _grid_spacing(times):
+        # returns the frequency and offset of the daily grid that
+        # contains all times or None if times can't be cached
+        if not isinstance(times, pd.DatetimeIndex) or len(times) < 2:
+            return None
+        # nanoseconds since the epoch in UTC. naive times are UTC
+        ns = times.asi8
+        steps = np.diff(ns)
+        if (steps <= 0).any():
+            return None
+        freq = int(np.gcd.reduce(steps))
+        if _DAY % freq or _DAY // freq > _MAX_GRID_POINTS:
+            return None
+        return freq, int(ns[0] % freq)
+
+    def _cache_file(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'solar_position_{name}.npz')
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            with np.load(self._cache_file(key)) as npz:
+                return [npz['solar_position'],
+                        {name[9:]: npz[name] for name in npz.files
+                         if name.startswith('clearsky_')}]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, key, entry):
+        if self.cache_dir is None:
+            return
+        cache_file = self._cache_file(key)
+        arrays = {'solar_position': entry[0]}
+        arrays.update({f'clearsky_{tz}': cs for tz, cs in entry[1].items()})
+        tmpfile = cache_file + f'.{os.getpid()}.tmp.npz'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(tmpfile, **arrays)
+            os.replace(tmpfile, cache_file)
+        except OSError:
+            logger.warning('Unable to save solar position to %s',
+                           cache_file)
+
+    @staticmethod
+    def _keys(latitude, longitude, elevation, days, freq, offset):
+        return [(float(latitude), float(longitude), float(elevation),
+                 int(day) * _DAY + offset, (int(day) + 1) * _DAY + offset,
+                 freq) for day in days]
+
+    def _cached(self, keys):
+        # grids from memory or disk, None if not cached
+        with self._lock:
+            entries = [self._grids.get(key) for key in keys]
+        for i, key in enumerate(keys):
+            if entries[i] is None:
+                entries[i] = self._load(key)
+        return entries
+
+    def _store(self, keys, entries):
+        with self._lock:
+            for key, entry in zip(keys, entries):
+                self._grids[key] = entry
+                self._grids.move_to_end(key)
+            while len(self._grids) > max(self.maxsize, 0):
+                self._grids.popitem(last=False)
+
+    def _entries(self, latitude, longitude, elevation, days, freq, offset,
+                 clearsky_tz):
+        npts = _DAY // freq
+        keys = self._keys(latitude, longitude, elevation, days, freq, offset)
+        entries = self._cached(keys)
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        if missing:
+            # one SPA calculation for all missing days
+            times = pd.DatetimeIndex(np.concatenate([
+                keys[i][3] + np.arange(npts, dtype='int64') * freq
+                for i in missing]), tz='UTC')
+            solpos = _spa(latitude, longitude, elevation, times)
+            values = solpos[list(SOLAR_POSITION_COLUMNS)].to_numpy(
+                dtype='float64').reshape(len(missing), npts, -1)
+            for n, i in enumerate(missing):
+                entries[i] = [values[n], {}]
+        tzname = str(clearsky_tz)
+        no_clearsky = ([i for i, entry in enumerate(entries)
+                        if tzname not in entry[1]]
+                       if clearsky_tz is not None else [])
+        if no_clearsky:
+            # turbidity and extraterrestrial irradiance depend on the day
+            # of year in the time zone of the requested times
+            times = pd.DatetimeIndex(np.concatenate([
+                keys[i][3] + np.arange(npts, dtype='int64') * freq
+                for i in no_clearsky]), tz='UTC').tz_convert(clearsky_tz)
+            apparent_zenith = pd.Series(
+                np.concatenate([entries[i][0][:, 0] for i in no_clearsky]),
+                index=times)
+            cs = calculate_clearsky(latitude, longitude, elevation,
+                                    apparent_zenith)
+            values = cs[list(CLEARSKY_COLUMNS)].to_numpy(
+                dtype='float64').reshape(len(no_clearsky), npts, -1)
+            for n, i in enumerate(no_clearsky):
+                entries[i][1][tzname] = values[n]
+        for i in set(missing) | set(no_clearsky):
+            self._save(keys[i], entries[i])
+        self._store(keys, entries)
+        return entries
+
+    def preload(self, latitudes, longitudes, elevations, times):
+        """
+        Calculate the daily grids of many sites that contain *times*
+        with a single call to :py:func:`calculate_solar_position_batch`.
+
+        Later calls to :py:meth:`get` for the sites and any regular
+        times on the same grids do not calculate solar position. Sites
+        with the same coordinates are calculated once, and only as many
+        sites as fit in *maxsize* are calculated; a warning is logged
+        for the rest.
+
+        Parameters
+        ----------
+        latitudes : array-like
+        longitudes : array-like
+        elevations : array-like
+        times : pd.DatetimeIndex
+        """
+        spacing = self._grid_spacing(times)
+        if spacing is None:
+            return
+        freq, offset = spacing
+        npts = _DAY // freq
+        days = np.unique(times.asi8 // _DAY)
+        # sites that share coordinates are calculated once
+        sites = [list(site) for site in dict.fromkeys(
+            tuple(self._keys(latitude, longitude, elevation, days, freq,
+                             offset))
+            for latitude, longitude, elevation in zip(
+                latitudes, longitudes, elevations))]
+        fit = max(self.maxsize, 0) // len(days)
+        if len(sites) > fit:
+            logger.warning(
+                'Solar position cache of size %s can only hold %s of %s '
+                'sites for %s days, the rest are not preloaded',
+                self.maxsize, fit, len(sites), len(days))
+            sites = sites[:fit]
+        missing = [keys for keys in sites
+                   if any(entry is None for entry in self._cached(keys))]
+        if not missing:
+            return
+        grid = pd.DatetimeIndex(np.concatenate([
+            key[3] + np.arange(npts, dtype='int64') * freq
+            for key in missing[0]]), tz='UTC')
+        solpos = calculate_solar_position_batch(
+            [keys[0][0] for keys in missing],
+            [keys[0][1] for keys in missing],
+            [keys[0][2] for keys in missing], grid)
+        # (site, day, time of day, column)
+        values = np.stack([
+            solpos[column].to_numpy(dtype='float64')
+            for column in SOLAR_POSITION_COLUMNS], axis=-1).transpose(
+                1, 0, 2).reshape(len(missing), len(days), npts, -1)
+        for n, keys in enumerate(missing):
+            entries = [[values[n, d], {}] for d in range(len(days))]
+            for key, entry in zip(keys, entries):
+                self._save(key, entry)
+            self._store(keys, entries)
+
+    def get(self, latitude, longitude, elevation, times, clearsky=False):
+        """
+        Get solar position, and optionally clear sky irradiance, at
+        *times*.
+
+        Parameters
+        ----------
+        latitude : float
+        longitude : float
+        elevation : float
+        times : pd.DatetimeIndex
+        clearsky : bool
+            If True, also return the clear sky ghi, dni and dhi
+            calculated by :py:func:`calculate_clearsky`.
+
+        Returns
+        -------
+        pd.DataFrame or None
+            Columns are those of :py:func:`calculate_solar_position`
+            followed by ghi, dni and dhi if *clearsky*. None if the
+            times are not regular enough to be cached.
+        """
+        spacing = self._grid_spacing(times)
+        if spacing is None:
+            return None
+        freq, offset = spacing
+        ns = times.asi8
+        day_of_time = ns // _DAY
+        days = np.unique(day_of_time)
+        clearsky_tz = None
+        if clearsky:
+            clearsky_tz = 'UTC' if times.tz is None else times.tz
+        entries = self._entries(latitude, longitude, elevation, days, freq,
+                                offset, clearsky_tz)
+        npts = _DAY // freq
+        positions = (np.searchsorted(days, day_of_time) * npts +
+                     (ns - day_of_time * _DAY - offset) // freq)
+        columns = list(SOLAR_POSITION_COLUMNS)
+        values = np.concatenate([entry[0] for entry in entries])[positions]
+        if clearsky:
+            columns += list(CLEARSKY_COLUMNS)
+            values = np.concatenate([
+                values,
+                np.concatenate([entry[1][str(clearsky_tz)]
+                                for entry in entries])[positions]],
+                axis=1)
+        return pd.DataFrame(values, index=times, columns=columns)
+
+    def clear(self):
+        """Remove all grids from memory"""
+        with self._lock:
+            self._grids.clear()
+
+    def __len__(self):
+        return len(self._grids)
+
+
+# solar position is only cached when a cache is set, see
+# enable_solar_position_cache
+SOLAR_POSITION_CACHE = None
+
+
+def set_solar_position_cache(maxsize=256, cache_dir=None):
+    """
+    Set or replace the cache used by :py:func:`calculate_solar_position`
+    and :py:func:`calculate_clearsky_at_times`.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        Maximum number of daily grids to keep in memory. If None,
+        solar position is not cached.
+    cache_dir : str or None
+        Directory to also save grids to.
+    """
+    global SOLAR_POSITION_CACHE
+    if maxsize is None:
+        SOLAR_POSITION_CACHE = None
+    else:
+        SOLAR_POSITION_CACHE = SolarPositionCache(maxsize, cache_dir)
+
+
+def enable_solar_position_cache():
+    """
+    Cache solar position with the default :py:class:`SolarPositionCache`
+    if no cache is set. Used by the validation tasks and reference
+    forecasts that calculate solar position for the same sites and days
+    many times. A cache set by :py:func:`set_solar_position_cache` is
+    kept.
+    """
+    if SOLAR_POSITION_CACHE is None:
+        set_solar_position_cache()
+
+
+def preload_solar_position(latitudes, longitudes, elevations, times):
+    """
+    Calculate solar position of many sites at once and keep it in
+    ``SOLAR_POSITION_CACHE`` for later calls to
+    :py:func:`calculate_solar_position` and
+    :py:func:`calculate_clearsky_at_times`. See
+    :py:meth:`SolarPositionCache.preload`.
+
+    Parameters
+    ----------
+    latitudes : array-like
+    longitudes : array-like
+    elevations : array-like
+    times : pd.DatetimeIndex
+    """
+    cache = SOLAR_POSITION_CACHE
+    if cache is not None:
+        cache.preload(latitudes, longitudes, elevations, times)
+
+
+def calculate_solar_position_batch(latitudes, longitudes, elevations,
+                                   times):
+    """
+    Calculates solar position of many sites at the same times using
+    pvlib's numpy implementation of NREL SPA.
+
+    Terms that only depend on time, such as the Julian day, nutation,
+    obliquity of the ecliptic and the geocentric position of the sun,
+    are calculated once for all sites. Terms that depend on the site
+    are calculated on (time, site) arrays.
+
+    Parameters
+    ----------
+    latitudes : array-like
+    longitudes : array-like
+    elevations : array-like
+    times : pd.DatetimeIndex
+
+    Returns
+    -------
+    solar_position : pd.DataFrame
+        The columns are a MultiIndex of the columns of
+        :py:func:`calculate_solar_position` and the position of each
+        site in the input arrays, so ``solar_position['azimuth']`` is a
+        (time, site) DataFrame.
+    """
+    spa = pvlib.spa
+    lat = np.asarray(latitudes, dtype='float64')[np.newaxis, :]
+    lon = np.asarray(longitudes, dtype='float64')[np.newaxis, :]
+    elev = np.asarray(elevations, dtype='float64')[np.newaxis, :]
+    # same defaults as pvlib.solarposition.get_solarposition
+    pressure = pvlib.atmosphere.alt2pres(elev) / 100
+    temperature = 12
+    delta_t = 67.0
+    atmos_refract = 0.5667
+    unixtime = np.asarray(times.asi8 / 10**9)
+
+    # time only terms
+    jd = spa.julian_day(unixtime)
+    jde = spa.julian_ephemeris_day(jd, delta_t)
+    jc = spa.julian_century(jd)
+    jce = spa.julian_ephemeris_century(jde)
+    jme = spa.julian_ephemeris_millennium(jce)
+    R = spa.heliocentric_radius_vector(jme)
+    L = spa.heliocentric_longitude(jme)
+    B = spa.heliocentric_latitude(jme)
+    Theta = spa.geocentric_longitude(L)
+    beta = spa.geocentric_latitude(B)
+    x0 = spa.mean_elongation(jce)
+    x1 = spa.mean_anomaly_sun(jce)
+    x2 = spa.mean_anomaly_moon(jce)
+    x3 = spa.moon_argument_latitude(jce)
+    x4 = spa.moon_ascending_longitude(jce)
+    delta_psi = spa.longitude_nutation(jce, x0, x1, x2, x3, x4)
+    delta_epsilon = spa.obliquity_nutation(jce, x0, x1, x2, x3, x4)
+    epsilon0 = spa.mean_ecliptic_obliquity(jme)
+    epsilon = spa.true_ecliptic_obliquity(epsilon0, delta_epsilon)
+    delta_tau = spa.aberration_correction(R)
+    lamd = spa.apparent_sun_longitude(Theta, delta_psi, delta_tau)
+    v0 = spa.mean_sidereal_time(jd, jc)
+    v = spa.apparent_sidereal_time(v0, delta_psi, epsilon)
+    alpha = spa.geocentric_sun_right_ascension(lamd, epsilon, beta)
+    delta = spa.geocentric_sun_declination(lamd, epsilon, beta)
+    m = spa.sun_mean_longitude(jme)
+    eot = spa.equation_of_time(m, alpha, delta_psi, epsilon)
+    xi = spa.equatorial_horizontal_parallax(R)
+
+    # site terms broadcast to (time, site)
+    v, alpha, delta, xi = (arr[:, np.newaxis] for arr in (v, alpha, delta,
+                                                          xi))
+    H = spa.local_hour_angle(v, lon, alpha)
+    u = spa.uterm(lat)
+    x = spa.xterm(u, lat, elev)
+    y = spa.yterm(u, lat, elev)
+    delta_alpha = spa.parallax_sun_right_ascension(x, xi, H, delta)
+    delta_prime = spa.topocentric_sun_declination(delta, x, y, xi,
+                                                  delta_alpha, H)
+    H_prime = spa.topocentric_local_hour_angle(H, delta_alpha)
+    e0 = spa.topocentric_elevation_angle_without_atmosphere(
+        lat, delta_prime, H_prime)
+    delta_e = spa.atmospheric_refraction_correction(
+        pressure, temperature, e0, atmos_refract)
+    e = spa.topocentric_elevation_angle(e0, delta_e)
+    theta = spa.topocentric_zenith_angle(e)
+    theta0 = spa.topocentric_zenith_angle(e0)
+    gamma = spa.topocentric_astronomers_azimuth(H_prime, delta_prime, lat)
+    phi = spa.topocentric_azimuth_angle(gamma)
+
+    nsites = lat.shape[1]
+    eot = np.broadcast_to(eot[:, np.newaxis], theta.shape)
+    columns = pd.MultiIndex.from_product(
+        [list(SOLAR_POSITION_COLUMNS), range(nsites)])
+    values = np.concatenate([theta, theta0, e, e0, phi, eot], axis=1)
+    return pd.DataFrame(values, index=times, columns=columns)
+
+
 def calculate_solar_position(latitude, longitude, elevation, times):
     """
     Calculates solar position using pvlib's implementation of NREL SPA.
 
+    If a cache is enabled, results for regular times are served from
+    daily grids in ``SOLAR_POSITION_CACHE``, see
+    :py:func:`enable_solar_position_cache`.
+
     Parameters
     ----------
     latitude : float
@@ -39,11 +478,12 @@ def calculate_solar_position(latitude, longitude, elevation, times):
         elevation (degrees), azimuth (degrees),
         equation_of_time (minutes).
     """
-    solpos = pvlib.solarposition.get_solarposition(times, latitude,
-                                                   longitude,
-                                                   altitude=elevation,
-                                                   method='nrel_numpy')
-    return solpos
+    cache = SOLAR_POSITION_CACHE
+    if cache is not None:
+        solpos = cache.get(latitude, longitude, elevation, times)
+        if solpos is not None:
+            return solpos
+    return _spa(latitude, longitude, elevation, times)
 
 
 def complete_irradiance_components(ghi, zenith):
@@ -64,11 +504,155 @@ def complete_irradiance_components(ghi, zenith):
     return dni_dhi['dni'], dni_dhi['dhi']
 
 
+LINKE_TURBIDITY_FILE = os.path.join(os.path.dirname(pvlib.__file__), 'data',
+                                    'LinkeTurbidities.h5')
+
+
+def _linke_turbidity_index(latitude, longitude):
+    # row and column of the 5 arc minute cell of the Linke turbidity
+    # file as found by pvlib.clearsky.lookup_linke_turbidity
+    def scale(value, inputmin, inputmax, size):
+        delta = size / (inputmax - inputmin)
+        index = (value - inputmin - 0.5 / delta) * delta
+        # round to the edge if within half an index
+        if index > size - 1 and np.around(index - size + 1, 1) <= 0.5:
+            index = size - 1
+        elif index < 0 and np.around(-index, 1) <= 0.5:
+            index = 0
+        if not 0 <= index <= size - 1:
+            raise IndexError('Latitude should be between 90 and -90, '
+                             'longitude between -180 and 180.')
+        return int(np.around(index))
+    return scale(latitude, 90, -90, 2160), scale(longitude, -180, 180, 4320)
+
+
+def _month_middles(leap):
+    mdays = np.array(calendar.mdays[1:])
+    ydays = 365
+    if leap:
+        mdays[1] += 1
+        ydays = 366
+    # previous December, this year, and next January
+    return np.concatenate([[-calendar.mdays[-1] / 2.],
+                           np.cumsum(mdays) - mdays / 2.,
+                           [ydays + calendar.mdays[1] / 2.]])
+
+
+def _daily_turbidity(monthly):
+    lts = np.concatenate([[monthly[-1]], monthly, [monthly[0]]])
+    days = np.arange(1, 367)
+    return np.stack([np.interp(days, _month_middles(leap), lts) / 20.
+                     for leap in (False, True)])
+
+
+class LinkeTurbidityTable:
+    """
+    Daily Linke turbidity of sites from the SoDa climatological data set
+    in pvlib.
+
+    The monthly turbidity of a site is read from the HDF5 file once and
+    interpolated to each day of the year for leap and non-leap years,
+    so later lookups for the site index a (2, 366) array instead of
+    opening the file. Values are the same as
+    ``pvlib.clearsky.lookup_linke_turbidity``.
+
+    Parameters
+    ----------
+    filepath : str or None
+        Path to the LinkeTurbidities.h5 file. Defaults to the file
+        supplied with pvlib.
+    """
+    def __init__(self, filepath=None):
+        self.filepath = filepath or LINKE_TURBIDITY_FILE
+        self._lock = threading.Lock()
+        # (row, column) -> daily turbidity of non-leap and leap years
+        self._daily = {}
+
+    def load(self, latitudes, longitudes):
+        """
+        Read the turbidity of all sites that are not yet in the table
+        with a single open of the file. Sites outside of the valid
+        range of latitude and longitude are skipped.
+
+        Parameters
+        ----------
+        latitudes : array-like
+        longitudes : array-like
+        """
+        keys = set()
+        for latitude, longitude in zip(latitudes, longitudes):
+            try:
+                keys.add(_linke_turbidity_index(latitude, longitude))
+            except IndexError:
+                continue
+        with self._lock:
+            missing = sorted(keys - set(self._daily))
+        if not missing:
+            return
+        import tables
+        h5file = tables.open_file(self.filepath)
+        try:
+            monthly = [h5file.root.LinkeTurbidity[row, col, :]
+                       for row, col in missing]
+        finally:
+            h5file.close()
+        daily = {key: _daily_turbidity(lts)
+                 for key, lts in zip(missing, monthly)}
+        with self._lock:
+            self._daily.update(daily)
+
+    def lookup(self, times, latitude, longitude):
+        """
+        Daily Linke turbidity of a site at times.
+
+        Parameters
+        ----------
+        times : pd.DatetimeIndex
+        latitude : float
+        longitude : float
+
+        Returns
+        -------
+        pd.Series
+        """
+        key = _linke_turbidity_index(latitude, longitude)
+        daily = self._daily.get(key)
+        if daily is None:
+            self.load([latitude], [longitude])
+            daily = self._daily[key]
+        turbidity = daily[np.asarray(times.is_leap_year, dtype=int),
+                          np.asarray(times.dayofyear) - 1]
+        return pd.Series(turbidity, index=times)
+
+    def __len__(self):
+        return len(self._daily)
+
+
+LINKE_TURBIDITY = LinkeTurbidityTable()
+
+
+def load_linke_turbidity(latitudes, longitudes):
+    """
+    Load the Linke turbidity of many sites for
+    :py:func:`calculate_clearsky` with a single read of the turbidity
+    file.
+
+    Parameters
+    ----------
+    latitudes : array-like
+    longitudes : array-like
+    """
+    LINKE_TURBIDITY.load(latitudes, longitudes)
+
+
 def calculate_clearsky(latitude, longitude, elevation, apparent_zenith):
     """
     Calculates clear sky irradiance using the Ineichen model and the
     SoDa climatological turbidity data set.
 
+    The turbidity of the site is looked up in ``LINKE_TURBIDITY``, see
+    :py:class:`LinkeTurbidityTable`.
+
     Parameters
     ----------
     latitude : float
@@ -85,9 +669,7 @@ def calculate_clearsky(latitude, longitude, elevation, apparent_zenith):
     airmass = pvlib.atmosphere.get_relative_airmass(apparent_zenith)
     pressure = pvlib.atmosphere.alt2pres(elevation)
     am_abs = pvlib.atmosphere.get_absolute_airmass(airmass, pressure)
-    tl = pvlib.clearsky.lookup_linke_turbidity(apparent_zenith.index,
-                                               latitude,
-                                               longitude)
+    tl = LINKE_TURBIDITY.lookup(apparent_zenith.index, latitude, longitude)
     dni_extra = pvlib.irradiance.get_extra_radiation(apparent_zenith.index)
     cs = pvlib.clearsky.ineichen(apparent_zenith, am_abs, tl,
                                  dni_extra=dni_extra,
@@ -95,6 +677,38 @@ def calculate_clearsky(latitude, longitude, elevation, apparent_zenith):
     return cs
 
 
+def calculate_clearsky_at_times(latitude, longitude, elevation, times):
+    """
+    Calculates clear sky irradiance at times using solar position from
+    :py:func:`calculate_solar_position` and :py:func:`calculate_clearsky`.
+
+    If a cache is enabled, results for regular times are served from
+    daily grids in ``SOLAR_POSITION_CACHE``, see
+    :py:func:`enable_solar_position_cache`.
+
+    Parameters
+    ----------
+    latitude : float
+    longitude : float
+    elevation : float
+    times : pd.DatetimeIndex
+
+    Returns
+    -------
+    cs : pd.DataFrame
+        Columns are ghi, dni, dhi.
+    """
+    cache = SOLAR_POSITION_CACHE
+    if cache is not None:
+        out = cache.get(latitude, longitude, elevation, times, clearsky=True)
+        if out is not None:
+            return out[list(CLEARSKY_COLUMNS)]
+    solar_position = calculate_solar_position(latitude, longitude, elevation,
+                                              times)
+    return calculate_clearsky(latitude, longitude, elevation,
+                              solar_position['apparent_zenith'])
+
+
 def aoi_func_factory(modeling_parameters):
     """
     Create a function to calculate AOI, surface tilt, and surface
@@ -266,6 +880,68 @@ def calculate_poa_effective(aoi_func, apparent_zenith, azimuth, ghi, dni, dhi):
     return poa_effective
 
 
+def _as_column(values):
+    """Reshape a time series to a column so that it broadcasts across
+    the members of a (time, member) array. Scalars are unchanged."""
+    if np.ndim(values) == 0:
+        return values
+    return np.asarray(values, dtype='float64').reshape(-1, 1)
+
+
+def calculate_poa_effective_ensemble(aoi_func, apparent_zenith, azimuth,
+                                     ghi, dni, dhi):
+    """
+    Calculate effective plane of array irradiance of an ensemble of
+    irradiance forecasts. Accounts for AOI losses.
+
+    Equivalent to calling :py:func:`calculate_poa_effective` for each
+    column of *ghi*, *dni*, and *dhi*, but AOI and the other terms that
+    only depend on time are calculated once and broadcast across the
+    members.
+
+    Parameters
+    ----------
+    aoi_func : function
+        Function with arguments (apparent_zenith, azimuth) and returns
+        surface_tilt, surface_azimuth, aoi
+    apparent_zenith : pd.Series
+        Solar apparent zenith
+    azimuth : pd.Series
+        Solar azimuth
+    ghi : pd.DataFrame
+        Index is time and columns are the ensemble members.
+    dni : pd.DataFrame
+        Same index and columns as *ghi*.
+    dhi : pd.DataFrame
+        Same index and columns as *ghi*.
+
+    Returns
+    -------
+    poa_effective : pd.DataFrame
+        Same index and columns as *ghi*.
+    """
+    surface_tilt, surface_azimuth, aoi = aoi_func(apparent_zenith, azimuth)
+    surface_tilt = _as_column(surface_tilt)
+    aoi = _as_column(aoi)
+    dni_extra = pvlib.irradiance.get_extra_radiation(apparent_zenith.index)
+    ghi_values = ghi.values
+    dni_values = dni[ghi.columns].values
+    dhi_values = dhi[ghi.columns].values
+    poa_sky_diffuse = pvlib.irradiance.haydavies(
+        surface_tilt, _as_column(surface_azimuth), dhi_values, dni_values,
+        _as_column(dni_extra), solar_zenith=_as_column(apparent_zenith),
+        solar_azimuth=_as_column(azimuth))
+    poa_ground_diffuse = pvlib.irradiance.get_ground_diffuse(
+        surface_tilt, ghi_values, albedo=0.25)
+    aoi_modifier = pvlib.pvsystem.physicaliam(aoi)
+    beam_effective = dni_values * aoi_modifier
+    poa_effective = beam_effective + poa_sky_diffuse + poa_ground_diffuse
+    # aoi, tilt, azi is not defined for tracking systems
+    # when sun is below horizon. replace nan with 0
+    poa_effective = np.where(np.isnan(aoi), 0., poa_effective)
+    return pd.DataFrame(poa_effective, index=ghi.index, columns=ghi.columns)
+
+
 def calculate_power(dc_capacity, temperature_coefficient, dc_loss_factor,
                     ac_capacity, ac_loss_factor, poa_effective, temp_air=20,
                     wind_speed=1):
@@ -338,3 +1014,49 @@ def irradiance_to_power(modeling_parameters, apparent_zenith, azimuth, ghi,
         temp_air=temp_air,
         wind_speed=wind_speed)
     return ac
+
+
+def irradiance_to_power_ensemble(modeling_parameters, apparent_zenith,
+                                 azimuth, ghi, dni, dhi, temp_air=20,
+                                 wind_speed=1):
+    """
+    Calcuate AC power of an ensemble from system metadata, solar
+    position, and ghi, dni, dhi of each member.
+
+    Equivalent to calling :py:func:`irradiance_to_power` for each
+    member, but the calculations are broadcast across all members at
+    once.
+
+    Parameters
+    ----------
+    modeling_parameters : datamodel.FixedTiltModelingParameters or
+                          datamodel.SingleAxisModelingParameters
+    apparent_zenith : pd.Series
+        Solar apparent zenith
+    azimuth : pd.Series
+        Solar azimuth
+    ghi : pd.DataFrame
+        Index is time and columns are the ensemble members.
+    dni : pd.DataFrame
+    dhi : pd.DataFrame
+    temp_air : pd.DataFrame, default 20
+    wind_speed : pd.DataFrame, default 1
+
+    Returns
+    -------
+    ac_power : pd.DataFrame
+        Same index and columns as *ghi*.
+    """
+    aoi_func = aoi_func_factory(modeling_parameters)
+    poa_effective = calculate_poa_effective_ensemble(
+        aoi_func, apparent_zenith, azimuth, ghi, dni, dhi)
+    ac = calculate_power(
+        modeling_parameters.dc_capacity,
+        modeling_parameters.temperature_coefficient,
+        modeling_parameters.dc_loss_factor,
+        modeling_parameters.ac_capacity,
+        modeling_parameters.ac_loss_factor,
+        poa_effective,
+        temp_air=temp_air,
+        wind_speed=wind_speed)
+    return ac
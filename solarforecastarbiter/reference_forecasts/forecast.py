@@ -164,6 +164,90 @@ def reindex_fill_slice(arg, freq='5min', label=None, start=None, end=None,
     return sliced
 
 
+def reindex_fill_slice_many(args, freq='5min', label=None, start=None,
+                            end=None, start_slice=None, end_slice=None,
+                            fill_method='interpolate'):
+    """Apply :py:func:`reindex_fill_slice` to several Series with the
+    same index at once.
+
+    The target index is built once and the data are reindexed, filled,
+    and sliced as a single 2-D array, so all returned Series share the
+    same DatetimeIndex object. Series with different indexes are
+    processed one at a time with :py:func:`reindex_fill_slice`.
+
+    Parameters
+    ----------
+    args : list
+        pd.Series or None.
+    freq : str
+    label : str
+        Sets pandas date_range's closed kwarg.
+    start : None or pd.Timestamp
+    end : None or pd.Timestamp
+    start_slice : None or pd.Timestamp
+    end_slice : None or pd.Timestamp
+    fill_method : str or list of str
+        Method of pd.DataFrame used to fill gaps, for all args or for
+        each arg.
+
+    Returns
+    -------
+    list
+        pd.Series or None for each arg. None and empty args are
+        returned unchanged.
+    """
+    args = list(args)
+    if isinstance(fill_method, str):
+        fill_methods = [fill_method] * len(args)
+    else:
+        fill_methods = list(fill_method)
+        if len(fill_methods) != len(args):
+            raise ValueError('fill_method must be a str or have one method '
+                             'for each arg')
+    fused = [i for i, arg in enumerate(args)
+             if arg is not None and not arg.empty]
+    if not fused:
+        return args
+    index = args[fused[0]].index
+    if not all(args[i].index.equals(index) and args[i].dtype.kind in 'fi'
+               for i in fused):
+        return [
+            reindex_fill_slice(arg, freq=freq, label=label, start=start,
+                               end=end, start_slice=start_slice,
+                               end_slice=end_slice, fill_method=method)
+            for arg, method in zip(args, fill_methods)]
+
+    if start is None:
+        start_reindex = index[0]
+    else:
+        start_reindex = min(pd.Timestamp(start), index[0])
+    if end is None:
+        end_reindex = index[-1]
+    else:
+        end_reindex = max(pd.Timestamp(end), index[-1])
+    target = pd.date_range(start=start_reindex, end=end_reindex, freq=freq,
+                           closed=label)
+    values = np.column_stack([args[i].to_numpy(dtype=float) for i in fused])
+    reindexed = pd.DataFrame(values, index=index).reindex(target)
+    methods = [fill_methods[i] for i in fused]
+    if len(set(methods)) == 1:
+        filled = getattr(reindexed, methods[0])()
+    else:
+        filled_values = np.empty(reindexed.shape)
+        for method in set(methods):
+            columns = [j for j, m in enumerate(methods) if m == method]
+            filled_values[:, columns] = getattr(
+                reindexed.iloc[:, columns], method)().to_numpy()
+        filled = pd.DataFrame(filled_values, index=target)
+    sliced = filled.loc[start_slice:end_slice].bfill().ffill()
+    sliced_values = sliced.to_numpy()
+    out = args.copy()
+    for j, i in enumerate(fused):
+        out[i] = pd.Series(sliced_values[:, j], index=sliced.index,
+                           name=args[i].name)
+    return out
+
+
 def unmix_intervals(mixed, lower=0, upper=100):
     """Convert mixed interval averages into pure interval averages.
 
@@ -202,55 +286,91 @@ def unmix_intervals(mixed, lower=0, upper=100):
         raise ValueError('multiple interval lengths detected. slice forecasts '
                          'into sections with unique interval lengths first.')
     interval = intervals[0]
-    start = mixed.index[0]
-    mixed_vals = np.array(mixed)
-    if interval == pd.Timedelta('1h'):
-        _check_start_time(start, interval)
-        # mixed_1...mixed_6 are the values in the raw forecast file at
-        # each hour of the mixed interval period. Let f1...f6 be unmixed,
-        # true hourly average values. The relationship is:
-        # mixed_1 = f1
-        # mixed_2 = (f1 + f2) / 2
-        # mixed_3 = (f1 + f2 + f3) / 3
-        # mixed_4 = (f1 + f2 + f3 + f4) / 4
-        # mixed_5 = (f1 + f2 + f3 + f4 + f5) / 5
-        # mixed_6 = (f1 + f2 + f3 + f4 + f5 + f6) / 6
-        # some algebra will show that the f1...f6 can be obtained as
-        # coded below.
-        # the cycle repeats itself after 6 hours so
-        # mixed_7 = f7
-        # mixed_8 = (f8 + f9) / 2 ...
-        # To efficiently compute the values for all forecast times,
-        # we use slices for every 6th element, calculate the forecasts
-        # at every 6th point, then interleave them by constructing a 2D
-        # array and reshaping it to a 1D array.
-        mixed_1 = mixed_vals[0::6]
-        mixed_2 = mixed_vals[1::6]
-        mixed_3 = mixed_vals[2::6]
-        mixed_4 = mixed_vals[3::6]
-        mixed_5 = mixed_vals[4::6]
-        mixed_6 = mixed_vals[5::6]
-        f1 = mixed_1
-        f2 = 2 * mixed_2 - mixed_1
-        f3 = 3 * mixed_3 - 2 * mixed_2
-        f4 = 4 * mixed_4 - 3 * mixed_3
-        f5 = 5 * mixed_5 - 4 * mixed_4
-        f6 = 6 * mixed_6 - 5 * mixed_5
-        f = np.array([f1, f2, f3, f4, f5, f6])
-    elif interval == pd.Timedelta('3h'):
-        _check_start_time(start, interval)
-        # similar to above, but
-        # mixed_3 = f_0_3
-        # mixed_6 = (f_0_3 + f_3_6) / 2
-        f3 = mixed_vals[0::2]
-        f6 = 2 * mixed_vals[1::2] - f3
-        f = np.array([f3, f6])
-    else:
+    if interval not in (pd.Timedelta('1h'), pd.Timedelta('3h')):
         raise ValueError('mixed period must be 6 hours and data interval must '
                          'be 3 hours or 1 hour')
-    unmixed = pd.Series(f.reshape(-1, order='F'), index=mixed.index)
-    unmixed = unmixed.clip(lower=0, upper=100)
-    return unmixed
+    _check_start_time(mixed.index[0], interval)
+    unmixed = unmix_intervals_array(np.asarray(mixed),
+                                    mixed.index, lower=lower, upper=upper)
+    return pd.Series(unmixed, index=mixed.index)
+
+
+_MIXED_PERIOD = pd.Timedelta('6h').value
+
+
+def unmix_intervals_array(mixed, index, lower=0, upper=100):
+    """Convert mixed interval averages of one or more columns into pure
+    interval averages.
+
+    Unlike :py:func:`unmix_intervals`, the data may contain several
+    interval lengths, such as the 1 hour, 3 hour, and 12 hour sections
+    of a GFS forecast, and all sections are unmixed in one pass. Data
+    with intervals shorter than 6 hours are averages from the start of
+    a 6 hour period (0, 6, 12, 18Z) to each time. For example, the
+    mixed 1 hour values mixed_1...mixed_6 of a period relate to the
+    true hourly averages f1...f6 as
+
+    mixed_k = (f1 + ... + fk) / k
+
+    so fk = k * mixed_k - (k - 1) * mixed_(k-1). Data with intervals
+    of 6 hours or longer are already pure interval averages.
+
+    Parameters
+    ----------
+    mixed : np.ndarray
+        1-D array of times or 2-D array of (times, columns), for example
+        the members of an ensemble or many sites.
+    index : pd.DatetimeIndex
+        Times of the rows of mixed. Naive times are assumed to be UTC.
+        The first time must be the first output of a mixed interval
+        period.
+    lower : None or float
+        Lower bound of output.
+    upper : None or float
+        Upper bound of output.
+
+    Returns
+    -------
+    np.ndarray
+        Unmixed interval averages with ending label with the shape of
+        mixed.
+
+    Raises
+    ------
+    ValueError
+        If a time is not a whole number of intervals after the start of
+        its mixed interval period, or the first time is not the first
+        output of a period.
+    """
+    mixed = np.asarray(mixed)
+    ns = index.asi8
+    if len(ns) < 2:
+        return _clip(mixed, lower, upper)
+    interval = np.diff(ns)
+    interval = np.concatenate([interval[:1], interval])
+    # time since the start of the 6 hour mixed period of each time
+    elapsed = ns - (-(-ns // _MIXED_PERIOD) * _MIXED_PERIOD - _MIXED_PERIOD)
+    mixed_interval = interval < _MIXED_PERIOD
+    if (elapsed[mixed_interval] % interval[mixed_interval]).any():
+        raise ValueError('mixed interval times must be a multiple of the '
+                         'interval length after 0, 6, 12, or 18Z')
+    # number of intervals averaged into each value
+    count = np.where(mixed_interval, elapsed // interval, 1)
+    if count[0] > 1:
+        raise ValueError('first time must be the first output of a mixed '
+                         'interval period')
+    if mixed.ndim == 2:
+        count = count[:, np.newaxis]
+    previous = np.concatenate([mixed[:1], mixed[:-1]])
+    unmixed = np.where(count > 1, count * mixed - (count - 1) * previous,
+                       mixed)
+    return _clip(unmixed, lower, upper)
+
+
+def _clip(values, lower, upper):
+    if lower is None and upper is None:
+        return values
+    return np.clip(values, lower, upper)
 
 
 def _check_start_time(start, interval):
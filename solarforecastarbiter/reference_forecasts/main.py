@@ -5,10 +5,14 @@ The functions in this module use the
 :py:mod:`solarforecastarbiter.datamodel` objects.
 """
 from collections import namedtuple
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, as_completed)
+from functools import lru_cache, partial
 import itertools
 import json
 import logging
 import re
+import time
 
 
 import pandas as pd
@@ -23,6 +27,16 @@ from solarforecastarbiter.reference_forecasts import persistence, models, utils
 logger = logging.getLogger(__name__)
 
 
+# defined at the module level so that results can be returned from
+# worker processes
+NWPOutput = namedtuple(
+    'NWPOutput', ['ghi', 'dni', 'dhi', 'air_temperature', 'wind_speed',
+                  'ac_power'])
+GroupTiming = namedtuple('GroupTiming', ['compute', 'upload', 'error'])
+PersistenceTiming = namedtuple(
+    'PersistenceTiming', ['find', 'fetch', 'compute', 'upload', 'errors'])
+
+
 def run_nwp(forecast, model, run_time, issue_time):
     """
     Calculate benchmark irradiance and power forecasts for a Forecast or
@@ -116,21 +130,10 @@ def run_nwp(forecast, model, run_time, issue_time):
     if isinstance(site, datamodel.SolarPowerPlant):
         solar_position = solar_position_calculator()
         if isinstance(forecasts[0], pd.DataFrame):
-            # must iterate over columns because pvmodel.irradiance_to_power
-            # calls operations that do not properly broadcast Series along
-            # a DataFrame time index. pvlib.irradiance.haydavies operation
-            # (AI = dni_ens / dni_extra) is the known culprit, though there
-            # may be more.
-            ac_power = {}
-            for col in forecasts[0].columns:
-                member_fx = [fx.get(col) for fx in forecasts]
-                member_ac_power = pvmodel.irradiance_to_power(
-                    site.modeling_parameters,
-                    solar_position['apparent_zenith'],
-                    solar_position['azimuth'],
-                    *member_fx)
-                ac_power[col] = member_ac_power
-            ac_power = pd.DataFrame(ac_power)
+            # each column is a member of the ensemble
+            ac_power = pvmodel.irradiance_to_power_ensemble(
+                site.modeling_parameters, solar_position['apparent_zenith'],
+                solar_position['azimuth'], *forecasts)
         else:
             ac_power = pvmodel.irradiance_to_power(
                 site.modeling_parameters, solar_position['apparent_zenith'],
@@ -140,14 +143,11 @@ def run_nwp(forecast, model, run_time, issue_time):
 
     # resample data after power calculation
     resampled = list(map(resampler, (*forecasts, ac_power)))
-    nwpoutput = namedtuple(
-        'NWPOutput', ['ghi', 'dni', 'dhi', 'air_temperature', 'wind_speed',
-                      'ac_power'])
-    return nwpoutput(*resampled)
+    return NWPOutput(*resampled)
 
 
 def run_persistence(session, observation, forecast, run_time, issue_time,
-                    index=False):
+                    index=False, engine=None):
     """
     Run a persistence *forecast* for an *observation*.
 
@@ -198,6 +198,10 @@ def run_persistence(session, observation, forecast, run_time, issue_time,
     index : bool, default False
         If False, use persistence of observed value. If True, use
         persistence of clear sky or AC power index.
+    engine : persistence.PersistenceEngine or None, default None
+        If not None, make the forecast from the data buffered by
+        *engine*, see :py:func:`make_persistence_engine`. Otherwise,
+        load the observation data from the API.
 
     Returns
     -------
@@ -232,25 +236,36 @@ def run_persistence(session, observation, forecast, run_time, issue_time,
     data_start, data_end = utils.get_data_start_end(
         observation, forecast, run_time)
 
-    def load_data(observation, data_start, data_end):
-        df = session.get_observation_values(observation.observation_id,
-                                            data_start, data_end,
-                                            observation.interval_label)
-        df = df.tz_convert(observation.site.timezone)
-        return df['value']
+    if engine is None:
+        def load_data(observation, data_start, data_end):
+            df = session.get_observation_values(observation.observation_id,
+                                                data_start, data_end,
+                                                observation.interval_label)
+            df = df.tz_convert(observation.site.timezone)
+            return df['value']
+
+        scalar_index = partial(persistence.persistence_scalar_index,
+                               load_data=load_data)
+        scalar = partial(persistence.persistence_scalar, load_data=load_data)
+        interval = partial(persistence.persistence_interval,
+                           load_data=load_data)
+    else:
+        scalar_index = engine.persistence_scalar_index
+        scalar = engine.persistence_scalar
+        interval = engine.persistence_interval
 
     if intraday and index:
-        fx = persistence.persistence_scalar_index(
+        fx = scalar_index(
             observation, data_start, data_end, forecast_start, forecast_end,
-            forecast.interval_length, forecast.interval_label, load_data)
+            forecast.interval_length, forecast.interval_label)
     elif intraday and not index:
-        fx = persistence.persistence_scalar(
+        fx = scalar(
             observation, data_start, data_end, forecast_start, forecast_end,
-            forecast.interval_length, forecast.interval_label, load_data)
+            forecast.interval_length, forecast.interval_label)
     elif not intraday and not index:
-        fx = persistence.persistence_interval(
+        fx = interval(
             observation, data_start, data_end, forecast_start,
-            forecast.interval_length, forecast.interval_label, load_data)
+            forecast.interval_length, forecast.interval_label)
     else:
         raise ValueError(
             'index=True not supported for forecasts with run_length >= 1day')
@@ -258,6 +273,39 @@ def run_persistence(session, observation, forecast, run_time, issue_time,
     return fx
 
 
+def make_persistence_engine(session, max_age=pd.Timedelta('2d'),
+                            overlap=None):
+    """
+    Make a :py:class:`solarforecastarbiter.reference_forecasts.persistence.PersistenceEngine`
+    that loads observation values from the API. Pass it to
+    :py:func:`run_persistence` to reuse the observation data and clear
+    sky references of earlier runs.
+
+    Parameters
+    ----------
+    session : api.Session
+        The session object to use to request data from the
+        SolarForecastArbiter API.
+    max_age : pd.Timedelta
+        Length of data to keep for each observation.
+    overlap : pd.Timedelta or None
+        Length of buffered data that is loaded again on later runs to
+        pick up values uploaded late. If None, one observation interval
+        length.
+
+    Returns
+    -------
+    persistence.PersistenceEngine
+    """  # NOQA
+    def fetch_data(observation, start, end):
+        df = session.get_observation_values(observation.observation_id,
+                                            start, end)
+        return df['value'].tz_convert(observation.site.timezone)
+
+    return persistence.PersistenceEngine(fetch_data, max_age=max_age,
+                                         overlap=overlap)
+
+
 def all_equal(iterable):
     "Returns True if all the elements are equal to each other"
     g = itertools.groupby(iterable)
@@ -284,6 +332,14 @@ def _is_reference_forecast(extra_params_string):
     return match is not None
 
 
+@lru_cache(maxsize=4096)
+def _load_extra_parameters(extra_params_string):
+    """Parse the extra_parameters JSON of a forecast. Parsed values are
+    cached because the same forecasts are searched on every run. The
+    returned dict must not be modified."""
+    return json.loads(extra_params_string)
+
+
 def find_reference_nwp_forecasts(forecasts, run_time=None):
     """
     Sort through all *forecasts* to find those that should be generated
@@ -316,7 +372,7 @@ def find_reference_nwp_forecasts(forecasts, run_time=None):
             continue
 
         try:
-            extra_parameters = json.loads(fx.extra_parameters)
+            extra_parameters = _load_extra_parameters(fx.extra_parameters)
         except json.JSONDecodeError:
             logger.warning(
                 'Failed to decode extra_parameters for %s: %s as JSON',
@@ -331,72 +387,185 @@ def find_reference_nwp_forecasts(forecasts, run_time=None):
                 fx.name, fx.forecast_id)
             continue
 
-        if run_time is not None:
-            next_issue_time = utils.get_next_issue_time(fx, run_time)
-        else:
-            next_issue_time = None
         piggyback_on = extra_parameters.get('piggyback_on', fx.forecast_id)
-        df_vals.append((fx.forecast_id, fx, piggyback_on, model,
-                        next_issue_time))
+        df_vals.append((fx.forecast_id, fx, piggyback_on, model))
 
     forecast_df = pd.DataFrame(
-        df_vals, columns=['forecast_id', 'forecast', 'piggyback_on', 'model',
-                          'next_issue_time']
+        df_vals, columns=['forecast_id', 'forecast', 'piggyback_on', 'model']
         ).set_index('forecast_id')
+    _add_next_issue_time(forecast_df, run_time)
     return forecast_df
 
 
-def process_nwp_forecast_groups(session, run_time, forecast_df):
-    """
-    Groups NWP forecasts based on piggyback_on, calculates the forecast as
-    appropriate for *run_time*, and uploads the values to the API.
+def _add_next_issue_time(forecast_df, run_time):
+    """Add the next_issue_time column to a DataFrame of forecasts, None
+    if run_time is None"""
+    if run_time is not None and len(forecast_df):
+        forecast_df['next_issue_time'] = utils.IssueSchedule(
+            forecast_df['forecast']).next_issue_times(run_time)
+    else:
+        forecast_df['next_issue_time'] = None
 
-    Parameters
-    ----------
-    session : io.api.APISession
-        API session for uploading forecast values
-    run_time : pandas.Timestamp
-        Run time of the forecast. Also used along with the forecast metadata
-        to determine the issue_time of the forecast.
-    forecast_df : pandas.DataFrame
-        Dataframe of the forecast objects as procduced by
-        :py:func:`solarforecastarbiter.reference_forecasts.main.find_reference_nwp_forecasts`.
-    """  # NOQA
+
+def _prepare_nwp_forecast_groups(run_time, forecast_df):
+    """Verify the piggyback groups and find the key forecast, model, and
+    issue time of each. Returns a list of valid groups and a dict of
+    the errors of invalid groups"""
+    groups = []
+    errors = {}
     for run_for, group in forecast_df.groupby('piggyback_on'):
-        logger.info('Computing forecasts for group %s', run_for)
-        errors = _verify_nwp_forecasts_compatible(group)
-        if errors:
+        incompatible = _verify_nwp_forecasts_compatible(group)
+        if incompatible:
             logger.error(
                 'Not all forecasts compatible in group with %s. '
-                'The following parameters may differ: %s', run_for, errors)
+                'The following parameters may differ: %s', run_for,
+                incompatible)
+            errors[run_for] = f'Incompatible parameters {incompatible}'
             continue
         try:
             key_fx = group.loc[run_for].forecast
         except KeyError:
             logger.error('Forecast, %s,  that others are piggybacking on not '
                          'found', run_for)
+            errors[run_for] = 'Piggyback forecast not found'
             continue
-        model = getattr(models, group.loc[run_for].model)
+        model_name = group.loc[run_for].model
         issue_time = group.loc[run_for].next_issue_time
         if issue_time is None:
             issue_time = utils.get_next_issue_time(key_fx, run_time)
-        try:
-            nwp_result = run_nwp(key_fx, model, run_time, issue_time)
-        except FileNotFoundError as e:
-            logger.error('Could not process group of %s, %s', run_for, str(e))
+        groups.append((run_for, group, key_fx, model_name, issue_time))
+    return groups, errors
+
+
+def _compute_nwp_group(key_fx, model_name, run_time, issue_time):
+    """Run the NWP forecast of a group and return the result and the
+    time it took"""
+    start = time.perf_counter()
+    model = getattr(models, model_name)
+    nwp_result = run_nwp(key_fx, model, run_time, issue_time)
+    return nwp_result, time.perf_counter() - start
+
+
+def _post_nwp_group(session, run_for, group, nwp_result, issue_time):
+    """Post the values of each forecast in a group and return the time
+    it took and the number of failed uploads"""
+    start = time.perf_counter()
+    failed = 0
+    for fx_id, fx in group['forecast'].iteritems():
+        fx_vals = getattr(nwp_result, fx.variable)
+        if fx_vals is None:
+            logger.warning('No forecast produced for %s in group with %s',
+                           fx_id, run_for)
             continue
-        for fx_id, fx in group['forecast'].iteritems():
-            fx_vals = getattr(nwp_result, fx.variable)
-            if fx_vals is None:
-                logger.warning('No forecast produced for %s in group with %s',
-                               fx_id, run_for)
-                continue
-            logger.info('Posting values %s for %s:%s issued at %s',
-                        len(fx_vals), fx.name, fx_id, issue_time)
+        logger.info('Posting values %s for %s:%s issued at %s',
+                    len(fx_vals), fx.name, fx_id, issue_time)
+        try:
             session.post_forecast_values(fx_id, fx_vals)
+        except Exception:
+            logger.exception('Failed to post values for %s in group with %s',
+                             fx_id, run_for)
+            failed += 1
+    return time.perf_counter() - start, failed
+
+
+def _compute_error(run_for, exc):
+    if isinstance(exc, FileNotFoundError):
+        logger.error('Could not process group of %s, %s', run_for, str(exc))
+    else:
+        logger.error('Failed to compute forecasts for group %s', run_for,
+                     exc_info=exc)
+    return f'{type(exc).__name__}: {exc}'
+
+
+def _upload_error(failed):
+    return f'{failed} uploads failed' if failed else None
+
 
+def process_nwp_forecast_groups(session, run_time, forecast_df,
+                                workers=None):
+    """
+    Groups NWP forecasts based on piggyback_on, calculates the forecast as
+    appropriate for *run_time*, and uploads the values to the API.
+
+    Parameters
+    ----------
+    session : io.api.APISession
+        API session for uploading forecast values
+    run_time : pandas.Timestamp
+        Run time of the forecast. Also used along with the forecast metadata
+        to determine the issue_time of the forecast.
+    forecast_df : pandas.DataFrame
+        Dataframe of the forecast objects as procduced by
+        :py:func:`solarforecastarbiter.reference_forecasts.main.find_reference_nwp_forecasts`.
+    workers : int or None, default None
+        If greater than 1, compute the forecasts of up to *workers* groups
+        at the same time in a pool of processes and upload the values in
+        a pool of threads. Otherwise, process the groups one at a time.
 
-def make_latest_nwp_forecasts(token, run_time, issue_buffer, base_url=None):
+    Returns
+    -------
+    dict
+        Maps the forecast_id each group piggybacks on to a GroupTiming
+        of the seconds spent computing and uploading the group and an
+        error message, or None if the group was processed successfully.
+        A failure in one group does not affect other groups.
+    """  # NOQA
+    # enabled before the pool so that worker processes also use it
+    pvmodel.enable_solar_position_cache()
+    groups, errors = _prepare_nwp_forecast_groups(run_time, forecast_df)
+    timing = {run_for: GroupTiming(0.0, 0.0, err)
+              for run_for, err in errors.items()}
+    if workers is None or workers <= 1:
+        for run_for, group, key_fx, model_name, issue_time in groups:
+            logger.info('Computing forecasts for group %s', run_for)
+            try:
+                nwp_result, compute_time = _compute_nwp_group(
+                    key_fx, model_name, run_time, issue_time)
+            except Exception as e:
+                timing[run_for] = GroupTiming(0.0, 0.0,
+                                              _compute_error(run_for, e))
+                continue
+            upload_time, failed = _post_nwp_group(
+                session, run_for, group, nwp_result, issue_time)
+            timing[run_for] = GroupTiming(compute_time, upload_time,
+                                          _upload_error(failed))
+        return timing
+
+    # compute in processes to use multiple cores for the CPU bound
+    # modeling and upload in threads while other groups are computed
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=models.initialize_worker,
+                             initargs=models.worker_settings()
+                             ) as compute_pool, \
+            ThreadPoolExecutor(max_workers=workers) as upload_pool:
+        computing = {}
+        for run_for, group, key_fx, model_name, issue_time in groups:
+            logger.info('Computing forecasts for group %s', run_for)
+            fut = compute_pool.submit(_compute_nwp_group, key_fx,
+                                      model_name, run_time, issue_time)
+            computing[fut] = (run_for, group, issue_time)
+        uploading = {}
+        for fut in as_completed(computing):
+            run_for, group, issue_time = computing[fut]
+            try:
+                nwp_result, compute_time = fut.result()
+            except Exception as e:
+                timing[run_for] = GroupTiming(0.0, 0.0,
+                                              _compute_error(run_for, e))
+                continue
+            upload = upload_pool.submit(_post_nwp_group, session, run_for,
+                                        group, nwp_result, issue_time)
+            uploading[upload] = (run_for, compute_time)
+        for upload in as_completed(uploading):
+            run_for, compute_time = uploading[upload]
+            upload_time, failed = upload.result()
+            timing[run_for] = GroupTiming(compute_time, upload_time,
+                                          _upload_error(failed))
+    return timing
+
+
+def make_latest_nwp_forecasts(token, run_time, issue_buffer, base_url=None,
+                              workers=None):
     """
     Make all reference NWP forecasts for *run_time* that are within
     *issue_buffer* of the next issue time for the forecast. For example,
@@ -416,6 +585,9 @@ def make_latest_nwp_forecasts(token, run_time, issue_buffer, base_url=None):
         each forecast that will be updated
     base_url : str or None, default None
         Alternate base_url of the API
+    workers : int or None, default None
+        Number of groups of forecasts to process in parallel. See
+        :py:func:`process_nwp_forecast_groups`.
     """
     session = api.APISession(token, base_url=base_url)
     forecasts = session.list_forecasts()
@@ -425,4 +597,240 @@ def make_latest_nwp_forecasts(token, run_time, issue_buffer, base_url=None):
     if execute_for.empty:
         logger.info('No forecasts to be made at %s', run_time)
         return
-    process_nwp_forecast_groups(session, run_time, execute_for)
+    process_nwp_forecast_groups(session, run_time, execute_for,
+                                workers=workers)
+
+
+def _is_reference_persistence_forecast(extra_params_string):
+    match = re.search('is_reference_persistence_forecast(["\\s\\:]*)true',
+                      extra_params_string, re.I)
+    return match is not None
+
+
+def find_reference_persistence_forecasts(forecasts, observations,
+                                         run_time=None):
+    """
+    Sort through all *forecasts* to find those that should be generated
+    by the Arbiter from persistence of observations. The forecast must
+    have an *observation_id* key in *extra_parameters* (formatted as a
+    JSON string) that is the observation_id of one of *observations*.
+    If *index_persistence* is true in *extra_parameters*, the forecast
+    uses persistence of the clear sky or AC power index.
+
+    Parameters
+    ----------
+    forecasts : list of datamodel.Forecasts
+        The forecasts that should be filtered to find references.
+    observations : list of datamodel.Observations
+        The observations that the forecasts may persist.
+    run_time : pandas.Timestamp or None, default None
+        The run_time of that forecast generation is taking place. If not
+        None, the next issue time for each forecast is added to the output.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Persistence reference forecasts with index of forecast_id and
+        columns (forecast, observation_id, observation, index,
+        next_issue_time).
+    """
+    observations = {obs.observation_id: obs for obs in observations}
+    df_vals = []
+    for fx in forecasts:
+        if not _is_reference_persistence_forecast(fx.extra_parameters):
+            logger.debug('Forecast %s is not labeled as a reference '
+                         'persistence forecast', fx.forecast_id)
+            continue
+
+        try:
+            extra_parameters = _load_extra_parameters(fx.extra_parameters)
+        except json.JSONDecodeError:
+            logger.warning(
+                'Failed to decode extra_parameters for %s: %s as JSON',
+                fx.name, fx.forecast_id)
+            continue
+
+        try:
+            observation = observations[extra_parameters['observation_id']]
+        except KeyError:
+            logger.error(
+                'Forecast, %s: %s, has no valid observation_id. Cannot make '
+                'forecast.', fx.name, fx.forecast_id)
+            continue
+
+        index = bool(extra_parameters.get('index_persistence', False))
+        df_vals.append((fx.forecast_id, fx, observation.observation_id,
+                        observation, index))
+
+    forecast_df = pd.DataFrame(
+        df_vals, columns=['forecast_id', 'forecast', 'observation_id',
+                          'observation', 'index']
+        ).set_index('forecast_id')
+    _add_next_issue_time(forecast_df, run_time)
+    return forecast_df
+
+
+def _persistence_group_windows(observation, group, run_time, errors):
+    """Data windows of the forecasts of an observation. Forecasts with
+    invalid windows are added to errors."""
+    windows = []
+    for fx_id, fx in group['forecast'].iteritems():
+        try:
+            windows.append(utils.get_data_start_end(observation, fx,
+                                                    run_time))
+        except ValueError as e:
+            logger.error('Invalid persistence forecast %s: %s', fx_id, e)
+            errors[fx_id] = f'{type(e).__name__}: {e}'
+    return windows
+
+
+def process_persistence_forecasts(session, run_time, forecast_df,
+                                  workers=None, engine=None):
+    """
+    Calculates the persistence forecasts in *forecast_df* as appropriate
+    for *run_time* and uploads the values to the API. The observation
+    data that all the forecasts of an observation need is loaded with a
+    single request.
+
+    Parameters
+    ----------
+    session : io.api.APISession
+        API session for loading observation values and uploading forecast
+        values
+    run_time : pandas.Timestamp
+        Run time of the forecast. Also used along with the forecast metadata
+        to determine the issue_time of the forecast.
+    forecast_df : pandas.DataFrame
+        Dataframe of the forecast objects as produced by
+        :py:func:`solarforecastarbiter.reference_forecasts.main.find_reference_persistence_forecasts`.
+    workers : int or None, default None
+        Maximum number of forecasts to upload at the same time. If None,
+        the default of :py:meth:`solarforecastarbiter.io.api.APISession.post_values_bulk`
+        is used.
+    engine : persistence.PersistenceEngine or None, default None
+        Engine that buffers the observation data. Pass the same engine
+        to later runs to only load new data. If None, a new engine is
+        made with :py:func:`make_persistence_engine`.
+
+    Returns
+    -------
+    PersistenceTiming
+        Seconds spent loading observation data, computing forecasts,
+        and uploading forecast values, and a dict that maps the
+        forecast_id of each failed forecast to an error message. The
+        *find* time is 0.
+    """  # NOQA
+    pvmodel.enable_solar_position_cache()
+    if engine is None:
+        engine = make_persistence_engine(session)
+    errors = {}
+    fetch_time = 0.0
+    compute_time = 0.0
+    fx_values = {}
+    for obs_id, group in forecast_df.groupby('observation_id'):
+        observation = group['observation'].iloc[0]
+        windows = _persistence_group_windows(observation, group, run_time,
+                                             errors)
+        if not windows:
+            continue
+        start = time.perf_counter()
+        try:
+            # one request for the data of all forecasts of the observation
+            engine.load_data(observation, min(w[0] for w in windows),
+                             max(w[1] for w in windows))
+        except Exception as e:
+            logger.exception('Failed to load data for observation %s',
+                             obs_id)
+            for fx_id in group.index:
+                errors.setdefault(fx_id, f'{type(e).__name__}: {e}')
+            continue
+        finally:
+            fetch_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for fx_id, fx, index, issue_time in zip(
+                group.index, group['forecast'], group['index'],
+                group['next_issue_time']):
+            if fx_id in errors:
+                continue
+            if issue_time is None:
+                issue_time = utils.get_next_issue_time(fx, run_time)
+            try:
+                fx_values[fx] = run_persistence(
+                    session, observation, fx, run_time, issue_time,
+                    index=index, engine=engine)
+            except Exception as e:
+                logger.error('Failed to compute persistence forecast %s',
+                             fx_id, exc_info=e)
+                errors[fx_id] = f'{type(e).__name__}: {e}'
+        compute_time += time.perf_counter() - start
+
+    start = time.perf_counter()
+    if fx_values:
+        logger.info('Posting values of %s persistence forecasts',
+                    len(fx_values))
+        if workers is None:
+            results = session.post_values_bulk(fx_values)
+        else:
+            results = session.post_values_bulk(fx_values,
+                                               max_workers=workers)
+        for fx, exc in results.items():
+            if exc is not None:
+                logger.error('Failed to post values for %s',
+                             fx.forecast_id, exc_info=exc)
+                errors[fx.forecast_id] = f'{type(exc).__name__}: {exc}'
+    upload_time = time.perf_counter() - start
+    return PersistenceTiming(0.0, fetch_time, compute_time, upload_time,
+                             errors)
+
+
+def make_latest_persistence_forecasts(token, run_time, issue_buffer,
+                                      base_url=None, workers=None):
+    """
+    Make all reference persistence forecasts for *run_time* that are
+    within *issue_buffer* of the next issue time for the forecast. See
+    :py:func:`make_latest_nwp_forecasts`.
+
+    Parameters
+    ----------
+    token : str
+        Access token for the API
+    run_time : pandas.Timestamp
+        Run time of the forecast generation
+    issue_buffer : pandas.Timedelta
+        Maximum time between *run_time* and the next issue time of
+        each forecast that will be updated
+    base_url : str or None, default None
+        Alternate base_url of the API
+    workers : int or None, default None
+        Maximum number of forecasts to upload at the same time.
+
+    Returns
+    -------
+    PersistenceTiming or None
+        Seconds spent in each stage and the errors of failed forecasts,
+        or None if no forecasts were due.
+    """
+    session = api.APISession(token, base_url=base_url)
+    start = time.perf_counter()
+    forecasts = session.list_forecasts()
+    observations = session.list_observations()
+    forecast_df = find_reference_persistence_forecasts(
+        forecasts, observations, run_time)
+    find_time = time.perf_counter() - start
+    if forecast_df.empty:
+        logger.info('No persistence forecasts to be made at %s', run_time)
+        return None
+    execute_for = forecast_df[
+        forecast_df.next_issue_time <= run_time + issue_buffer]
+    if execute_for.empty:
+        logger.info('No persistence forecasts to be made at %s', run_time)
+        return None
+    timing = process_persistence_forecasts(session, run_time, execute_for,
+                                           workers=workers)
+    timing = timing._replace(find=find_time)
+    logger.info('Made %s persistence forecasts in %.1fs: find %.1fs, '
+                'fetch %.1fs, compute %.1fs, upload %.1fs, %s errors',
+                len(execute_for), sum(timing[:4]), *timing[:4],
+                len(timing.errors))
+    return timing
@@ -61,18 +61,105 @@ because we anticipate that these functions may be of more general use
 and that functions that accept primitives may be easier to maintain in
 the long run.
 """
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 import inspect
 
 
 from solarforecastarbiter import datamodel, pvmodel
+from solarforecastarbiter.io import nwp
 from solarforecastarbiter.io.nwp import load_forecast
 from solarforecastarbiter.io.utils import adjust_start_end_for_interval_label
 from solarforecastarbiter.reference_forecasts import forecast
 
+import numpy as np
 import pandas as pd
 
 
+GEFS_MEMBERS = ('c00',) + tuple(f'p{member:02d}' for member in range(1, 21))
+GEFS_MEMBER_WORKERS = None
+# (GEFS_MEMBER_WORKERS, worker settings, ProcessPoolExecutor) or None
+_GEFS_POOL = None
+
+
+def set_gefs_member_workers(max_workers):
+    """Set the number of processes that
+    :py:func:`gefs_half_deg_to_hourly_mean` uses to load and process
+    the perturbation members. If None, members are processed serially.
+    The processes are started on first use and reused by later
+    forecasts."""
+    global GEFS_MEMBER_WORKERS
+    GEFS_MEMBER_WORKERS = max_workers
+    if max_workers is None or max_workers <= 1:
+        _shutdown_gefs_pool()
+
+
+def _shutdown_gefs_pool():
+    global _GEFS_POOL
+    if _GEFS_POOL is not None:
+        _GEFS_POOL[2].shutdown()
+        _GEFS_POOL = None
+
+
+def _gefs_member_pool():
+    # reuse the pool unless the number of workers or the settings
+    # that the workers were started with changed
+    global _GEFS_POOL
+    settings = worker_settings()
+    if (_GEFS_POOL is None or _GEFS_POOL[0] != GEFS_MEMBER_WORKERS or
+            _GEFS_POOL[1] != settings):
+        _shutdown_gefs_pool()
+        executor = ProcessPoolExecutor(
+            max_workers=GEFS_MEMBER_WORKERS, initializer=initialize_worker,
+            initargs=settings)
+        _GEFS_POOL = (GEFS_MEMBER_WORKERS, settings, executor)
+    return _GEFS_POOL[2]
+
+
+def worker_settings():
+    """
+    Settings of this process that worker processes computing forecasts
+    need: the NWP base path, grid index caching, dataset pool size, and
+    the size and directory of the solar position cache.
+
+    Returns
+    -------
+    tuple
+        Arguments of :py:func:`initialize_worker`, e.g. the initargs of
+        a ProcessPoolExecutor.
+    """
+    cache = pvmodel.SOLAR_POSITION_CACHE
+    cache_settings = None if cache is None else (cache.maxsize,
+                                                 cache.cache_dir)
+    return (nwp.BASE_PATH, nwp.CACHE_GRID_INDEX, nwp.DATASET_POOL.maxsize,
+            cache_settings)
+
+
+def initialize_worker(base_path, cache_grid_index, dataset_pool_size,
+                      solar_position_cache):
+    """
+    Apply the settings from :py:func:`worker_settings` in a worker
+    process, whether it was started by fork, forkserver, or spawn.
+    A forked worker keeps the solar position cache it inherited if the
+    cache settings are the same. Workers process GEFS members serially
+    because they already run in parallel.
+    """
+    global GEFS_MEMBER_WORKERS, _GEFS_POOL
+    nwp.set_base_path(base_path)
+    nwp.set_grid_index_caching(cache_grid_index)
+    nwp.set_dataset_pool_size(dataset_pool_size)
+    cache = pvmodel.SOLAR_POSITION_CACHE
+    current = None if cache is None else (cache.maxsize, cache.cache_dir)
+    if current != solar_position_cache:
+        if solar_position_cache is None:
+            pvmodel.set_solar_position_cache(None)
+        else:
+            pvmodel.set_solar_position_cache(*solar_position_cache)
+    GEFS_MEMBER_WORKERS = None
+    # a pool inherited by a forked worker belongs to the parent
+    _GEFS_POOL = None
+
+
 def get_nwp_model(func):
     """Get the NWP model string from a modeling function"""
     return inspect.signature(func).parameters['__model'].default
@@ -138,16 +225,11 @@ def _resample_using_cloud_cover(latitude, longitude, elevation,
     freq = '5min'
     start_adj, end_adj = adjust_start_end_for_interval_label(interval_label,
                                                              start, end)
-    cloud_cover = forecast.reindex_fill_slice(
-        cloud_cover, freq=freq, start=start, end=end,
-        start_slice=start_adj, end_slice=end_adj,
-        fill_method=fill_method)
-    resample_fill_slicer = partial(
-        forecast.reindex_fill_slice, freq=freq, start=start, end=end,
-        start_slice=start_adj, end_slice=end_adj, fill_method='interpolate')
-    air_temperature, wind_speed = [
-        resample_fill_slicer(v) for v in (air_temperature, wind_speed)
-    ]
+    cloud_cover, air_temperature, wind_speed = \
+        forecast.reindex_fill_slice_many(
+            (cloud_cover, air_temperature, wind_speed), freq=freq,
+            start=start, end=end, start_slice=start_adj, end_slice=end_adj,
+            fill_method=(fill_method, 'interpolate', 'interpolate'))
     if solar_position is None:
         solar_position = pvmodel.calculate_solar_position(
             latitude, longitude, elevation, cloud_cover.index)
@@ -252,13 +334,10 @@ def hrrr_subhourly_to_hourly_mean(latitude, longitude, elevation,
     # output.
     start_adj, end_adj = adjust_start_end_for_interval_label(interval_label,
                                                              start, end)
-    resample_interpolate_slicer = partial(forecast.reindex_fill_slice,
-                                          freq='5min', start_slice=start_adj,
-                                          end_slice=end_adj)
-    ghi, dni, dhi, air_temperature, wind_speed = [
-        resample_interpolate_slicer(v) for v in
-        (ghi, dni, dhi, air_temperature, wind_speed)
-    ]
+    ghi, dni, dhi, air_temperature, wind_speed = \
+        forecast.reindex_fill_slice_many(
+            (ghi, dni, dhi, air_temperature, wind_speed), freq='5min',
+            start_slice=start_adj, end_slice=end_adj)
     # weather (and optionally power) will eventually be resampled
     # to hourly average using resampler defined below
     label = datamodel.CLOSED_MAPPING[interval_label]
@@ -472,28 +551,19 @@ def _adjust_gfs_start_end(start, end):
 
 def _unmix_various_gfs_intervals(init_time, start_floored, end_ceil,
                                  cloud_cover_mixed):
-    """unmix intervals for each kind of interval length in GFS forecast"""
-    end_1h = init_time + pd.Timedelta('120hr')
-    end_3h = init_time + pd.Timedelta('240hr')
-
-    cloud_covers = []
+    """unmix intervals for each kind of interval length in GFS forecast.
+    cloud_cover_mixed may be a Series or a DataFrame of many sites."""
+    # the 1 hour (to 120 hr) and 3 hour (to 240 hr) sections are mixed,
+    # the 12 hour section is not. unmix all sections in one pass
+    return _unmix_sections(cloud_cover_mixed.loc[start_floored:end_ceil])
 
-    if start_floored < end_1h:
-        cloud_cover_1h_mixed = cloud_cover_mixed.loc[start_floored:end_1h]
-        cloud_covers.append(forecast.unmix_intervals(cloud_cover_1h_mixed))
 
-    if end_ceil > end_1h and start_floored < end_3h:
-        cloud_cover_3h_mixed = cloud_cover_mixed.loc[
-            end_1h+pd.Timedelta('3hr'):end_3h]
-        cloud_covers.append(forecast.unmix_intervals(cloud_cover_3h_mixed))
-
-    if end_ceil > end_3h:
-        cloud_cover_12h = cloud_cover_mixed.loc[
-            end_3h+pd.Timedelta('12hr'):end_ceil]
-        cloud_covers.append(cloud_cover_12h)
-
-    cloud_cover = pd.concat(cloud_covers)
-    return cloud_cover
+def _unmix_sections(mixed):
+    unmixed = forecast.unmix_intervals_array(mixed.to_numpy(), mixed.index)
+    if mixed.ndim == 2:
+        return pd.DataFrame(unmixed, index=mixed.index,
+                            columns=mixed.columns)
+    return pd.Series(unmixed, index=mixed.index)
 
 
 def gefs_half_deg_to_hourly_mean(latitude, longitude, elevation,
@@ -544,45 +614,27 @@ def gefs_half_deg_to_hourly_mean(latitude, longitude, elevation,
     ``constant_values=[0, 5, ...95, 100]``.
     """
     start_floored, end_ceil = _adjust_gfs_start_end(start, end)
-
-    def _load_gefs_member(member, solar_position):
-        cloud_cover_mixed, air_temperature, wind_speed = load_forecast(
-            latitude, longitude, init_time, start_floored, end_ceil, member,
-            variables=('cloud_cover', 'air_temperature', 'wind_speed'))
-        cloud_cover = _unmix_various_gefs_intervals(
-            init_time, start_floored, end_ceil, cloud_cover_mixed)
-        return _resample_using_cloud_cover(
-            latitude, longitude, elevation, cloud_cover, air_temperature,
-            wind_speed, start, end, interval_label, 'bfill',
-            solar_position=solar_position)
+    load_member = partial(
+        _load_gefs_member, latitude, longitude, elevation, init_time,
+        start, end, interval_label, load_forecast, start_floored, end_ceil)
 
     # load and process control forecast, then load and process
     # permutations. for efficiency, use control's solar position.
-    # accumulate results in dicts so they can be easily converted to
-    # DataFrames.
     ghi, dni, dhi, air_temperature, wind_speed, resampler, sol_pos_calc = \
-        _load_gefs_member('gefs_c00', None)
-    solar_position = sol_pos_calc()
-    ghi_ens = {'c00': ghi}
-    dni_ens = {'c00': dni}
-    dhi_ens = {'c00': dhi}
-    air_temperature_ens = {'c00': air_temperature}
-    wind_speed_ens = {'c00': wind_speed}
-    for member in range(1, 21):
-        key = f'p{member:02d}'
-        ghi, dni, dhi, air_temperature, wind_speed, _, _ = \
-            _load_gefs_member(f'gefs_{key}', solar_position)
-        ghi_ens[key] = ghi
-        dni_ens[key] = dni
-        dhi_ens[key] = dhi
-        air_temperature_ens[key] = air_temperature
-        wind_speed_ens[key] = wind_speed
-
-    ghi_ens = pd.DataFrame(ghi_ens)
-    dni_ens = pd.DataFrame(dni_ens)
-    dhi_ens = pd.DataFrame(dhi_ens)
-    air_temperature_ens = pd.DataFrame(air_temperature_ens)
-    wind_speed_ens = pd.DataFrame(wind_speed_ens)
+        load_member('gefs_c00')
+    load_member = partial(load_member, solar_position=sol_pos_calc())
+    perturbations = [f'gefs_{key}' for key in GEFS_MEMBERS[1:]]
+    if GEFS_MEMBER_WORKERS is not None and GEFS_MEMBER_WORKERS > 1:
+        # processes because the netCDF library can't be used from
+        # several threads at once
+        members = list(_gefs_member_pool().map(load_member, perturbations))
+    else:
+        members = [load_member(member) for member in perturbations]
+    members.insert(0, (ghi, dni, dhi, air_temperature, wind_speed))
+
+    ghi_ens, dni_ens, dhi_ens, air_temperature_ens, wind_speed_ens = (
+        _gefs_member_frame([member[i] for member in members])
+        for i in range(5))
 
     def resample_sort(fx):
         resampled = resampler(fx)
@@ -593,24 +645,46 @@ def gefs_half_deg_to_hourly_mean(latitude, longitude, elevation,
             resample_sort, sol_pos_calc)
 
 
-def _unmix_various_gefs_intervals(init_time, start_floored, end_ceil,
-                                  cloud_cover_mixed):
-    """unmix intervals for each kind of interval length in GEFS forecast"""
-    end_3h = init_time + pd.Timedelta('192hr')
+def _load_gefs_member(latitude, longitude, elevation, init_time, start, end,
+                      interval_label, load_forecast, start_floored, end_ceil,
+                      member, solar_position=None):
+    """Load and process one GEFS member. If solar_position is None,
+    returns the full output of _resample_using_cloud_cover, otherwise
+    only ghi, dni, dhi, air_temperature, and wind_speed."""
+    cloud_cover_mixed, air_temperature, wind_speed = load_forecast(
+        latitude, longitude, init_time, start_floored, end_ceil, member,
+        variables=('cloud_cover', 'air_temperature', 'wind_speed'))
+    cloud_cover = _unmix_various_gefs_intervals(
+        init_time, start_floored, end_ceil, cloud_cover_mixed)
+    out = _resample_using_cloud_cover(
+        latitude, longitude, elevation, cloud_cover, air_temperature,
+        wind_speed, start, end, interval_label, 'bfill',
+        solar_position=solar_position)
+    if solar_position is None:
+        return out
+    return out[:5]
 
-    cloud_covers = []
 
-    if start_floored < end_3h:
-        cloud_cover_3h_mixed = cloud_cover_mixed.loc[start_floored:end_3h]
-        cloud_covers.append(forecast.unmix_intervals(cloud_cover_3h_mixed))
+def _gefs_member_frame(members):
+    """Combine the Series of each GEFS member into a DataFrame"""
+    index = members[0].index
+    if all(member.index.equals(index) for member in members[1:]):
+        # members are on the same 5 minute grid, so skip the alignment
+        # of pd.DataFrame(dict)
+        return pd.DataFrame(
+            np.column_stack([member.to_numpy() for member in members]),
+            index=index, columns=list(GEFS_MEMBERS))
+    return pd.DataFrame(dict(zip(GEFS_MEMBERS, members)))
 
-    if end_ceil > end_3h:
-        cloud_cover_6_or_12h = cloud_cover_mixed.loc[
-            end_3h+pd.Timedelta('6hr'):end_ceil]
-        cloud_covers.append(cloud_cover_6_or_12h)
 
-    cloud_cover = pd.concat(cloud_covers)
-    return cloud_cover
+def _unmix_various_gefs_intervals(init_time, start_floored, end_ceil,
+                                  cloud_cover_mixed):
+    """unmix intervals for each kind of interval length in GEFS forecast.
+    cloud_cover_mixed may be a Series or a DataFrame of many members or
+    sites."""
+    # the 3 hour (to 192 hr) section is mixed, the 6 and 12 hour
+    # sections are not. unmix all sections in one pass
+    return _unmix_sections(cloud_cover_mixed.loc[start_floored:end_ceil])
 
 
 def nam_12km_hourly_to_hourly_instantaneous(latitude, longitude, elevation,
@@ -20,12 +20,19 @@ The functions accept a *load_data* keyword argument that allows users to
 change where the functions load the observation data from. This is most
 useful for users that would like to provide their own observation data
 rather than using the solarforecastarbiter database.
+
+Forecasts that are run repeatedly for the same observations, such as
+intraday forecasts issued every hour, may use a
+:py:class:`PersistenceEngine` that keeps the recent observation data and
+clear sky references between runs.
 """
 from functools import partial
 
+import numpy as np
 import pandas as pd
 
 from solarforecastarbiter import datamodel, pvmodel
+from solarforecastarbiter.io.utils import adjust_timeseries_for_interval_label
 
 
 def persistence_scalar(observation, data_start, data_end, forecast_start,
@@ -242,72 +249,254 @@ def persistence_scalar_index(observation, data_start, data_end, forecast_start,
     # get observation data for specified range
     obs = load_data(observation, data_start, data_end)
 
-    # partial-up the metadata for solar position and
-    # clearsky calculation clarity and consistency
-    site = observation.site
-    calc_solpos = partial(pvmodel.calculate_solar_position,
-                          site.latitude, site.longitude, site.elevation)
-    calc_cs = partial(pvmodel.calculate_clearsky,
-                      site.latitude, site.longitude, site.elevation)
+    # Calculate clear sky for the obs time range and average it over the
+    # observation intervals
+    clear_ref_resampled = _clear_reference(observation, data_start, data_end,
+                                           _clear_values)
+    # calculate persistence index (clear sky index or ac power index)
+    # avg{index_{t_start}...index_{t_end}} =
+    #   avg{obs_{t_start}/clear_{t_start}...obs_{t_end}/clear_{t_end}}
+    # clear_ref is calculated at high temporal resolution, so this is accurate
+    # for any observation interval length
+    # apply clip to the clear sky index array before computing the average.
+    # this prevents outliers from distorting the mean, a common occurance
+    # near sunrise and sunset.
+    pers_index = (obs / clear_ref_resampled).clip(lower=0, upper=2).mean()
 
-    # Calculate solar position and clearsky for obs time range.
+    return _index_forecast(observation, pers_index, forecast_start,
+                           forecast_end, _clear_freq(observation),
+                           interval_length, interval_label)
+
+
+class PersistenceEngine:
+    """
+    Rolling buffers of observation values and clear sky references for
+    persistence forecasts that are made repeatedly.
+
+    The first forecast for an observation loads its data window with
+    *fetch_data*. Later forecasts only load the data after the end of
+    the buffered data and the last *overlap* of the buffered data, and
+    data more than *max_age* before the end of the latest window is
+    dropped. The clear sky irradiance or AC power at the times that are
+    averaged over each observation interval is kept for the same period,
+    so :py:meth:`persistence_scalar_index` only models the clear sky
+    reference of new times.
+
+    Values loaded again replace the buffered values, so values uploaded
+    late are used if they are within *overlap* of the end of the
+    buffered data. Older values are assumed not to change once they are
+    loaded. Use :py:meth:`clear` to reload the data of an observation.
+
+    Parameters
+    ----------
+    fetch_data : function
+        A function that loads the observation data. Must have the
+        signature fetch_data(observation, start, end) and return a
+        pd.Series with a localized DatetimeIndex of the values from
+        start to end inclusive of both endpoints.
+    max_age : pd.Timedelta
+        Length of data to keep before the end of the latest data window.
+        The default is long enough for day ahead persistence.
+    overlap : pd.Timedelta or None
+        Length of buffered data before its end that is loaded again
+        with the new data. If None, one observation interval length.
+    """
+    def __init__(self, fetch_data, max_age=pd.Timedelta('2d'),
+                 overlap=None):
+        self.fetch_data = fetch_data
+        self.max_age = pd.Timedelta(max_age)
+        self.overlap = None if overlap is None else pd.Timedelta(overlap)
+        # observation_id -> (buffer start, buffer end, values)
+        self._values = {}
+        # observation_id -> clear sky reference at the modeled times
+        self._clear_ref = {}
+
+    def clear(self, observation=None):
+        """Drop the buffers of *observation* or, if None, of all
+        observations."""
+        if observation is None:
+            self._values.clear()
+            self._clear_ref.clear()
+        else:
+            self._values.pop(observation.observation_id, None)
+            self._clear_ref.pop(observation.observation_id, None)
+
+    def load_data(self, observation, data_start, data_end):
+        """
+        Load the *observation* data from *data_start* to *data_end*,
+        accounting for the observation interval label. Only data that
+        is not buffered, and the last *overlap* of the buffered data, is
+        loaded with *fetch_data*. May be used as the
+        *load_data* argument of the persistence functions.
+
+        Parameters
+        ----------
+        observation : datamodel.Observation
+        data_start : pd.Timestamp
+        data_end : pd.Timestamp
+
+        Returns
+        -------
+        pd.Series
+        """
+        key = observation.observation_id
+        state = self._values.get(key)
+        # windows of consecutive runs may be separated by the 1 second
+        # used to exclude interval endpoints
+        if (state is None or data_start < state[0] or
+                data_start > state[1] + observation.interval_length):
+            # the window does not continue the buffered data
+            start, end = data_start, data_end
+            values = self.fetch_data(observation, start, end)
+        else:
+            start, end, values = state
+            if data_end > end:
+                overlap = observation.interval_length
+                if self.overlap is not None:
+                    overlap = max(overlap, self.overlap)
+                # reload the end of the buffer for values uploaded late
+                reload_from = max(start, end - overlap)
+                new = self.fetch_data(observation, reload_from, data_end)
+                values = pd.concat([values[values.index < reload_from], new])
+                end = data_end
+        keep_from = min(data_start, max(start, end - self.max_age))
+        if keep_from > start:
+            values = values[values.index >= keep_from]
+            start = keep_from
+        self._values[key] = (start, end, values)
+        return adjust_timeseries_for_interval_label(
+            values, observation.interval_label, data_start, data_end)
+
+    def clear_reference(self, observation, times):
+        """
+        Clear sky irradiance or AC power of *observation* at *times*.
+        Only the times that are not buffered are modeled.
+
+        Parameters
+        ----------
+        observation : datamodel.Observation
+        times : pd.DatetimeIndex
+            Localized times.
+
+        Returns
+        -------
+        pd.Series
+        """
+        key = observation.observation_id
+        buffered = self._clear_ref.get(key)
+        utc = times.tz_convert('UTC')
+        if buffered is None:
+            missing = np.ones(len(times), dtype=bool)
+        else:
+            missing = ~utc.isin(buffered.index)
+        if missing.any():
+            new = pd.Series(
+                _clear_values(observation, times[missing]).to_numpy(),
+                index=utc[missing])
+            if buffered is None:
+                buffered = new
+            else:
+                buffered = pd.concat([buffered, new]).sort_index()
+            buffered = buffered[
+                buffered.index >= buffered.index[-1] - self.max_age]
+            self._clear_ref[key] = buffered
+        if buffered is None:
+            return pd.Series(np.nan, index=times)
+        return pd.Series(buffered.reindex(utc).to_numpy(), index=times)
+
+    def persistence_scalar(self, observation, data_start, data_end,
+                           forecast_start, forecast_end, interval_length,
+                           interval_label):
+        """:py:func:`persistence_scalar` using the buffered data."""
+        return persistence_scalar(
+            observation, data_start, data_end, forecast_start, forecast_end,
+            interval_length, interval_label, self.load_data)
+
+    def persistence_interval(self, observation, data_start, data_end,
+                             forecast_start, interval_length,
+                             interval_label):
+        """:py:func:`persistence_interval` using the buffered data."""
+        return persistence_interval(
+            observation, data_start, data_end, forecast_start,
+            interval_length, interval_label, self.load_data)
+
+    def persistence_scalar_index(self, observation, data_start, data_end,
+                                 forecast_start, forecast_end,
+                                 interval_length, interval_label):
+        """:py:func:`persistence_scalar_index` using the buffered data
+        and clear sky references."""
+        _check_intervals_times(observation.interval_label, data_start,
+                               data_end, forecast_start, forecast_end,
+                               observation.interval_length)
+        obs = self.load_data(observation, data_start, data_end)
+        clear_ref = _clear_reference(observation, data_start, data_end,
+                                     self.clear_reference)
+        pers_index = (obs / clear_ref).clip(lower=0, upper=2).mean()
+        return _index_forecast(observation, pers_index, forecast_start,
+                               forecast_end, _clear_freq(observation),
+                               interval_length, interval_label)
+
+
+def _clear_freq(observation):
+    """Frequency of the clear sky values used for the observation."""
     # if data is instantaneous, calculate at the obs time.
     # else (if data is interval average), calculate at 1 minute resolution to
     # reduce errors from changing solar position during persistence data range.
-    # Later, modeled clear sky or ac power will be averaged over the data range
-    closed = datamodel.CLOSED_MAPPING[observation.interval_label]
-    if closed is None:
-        freq = observation.interval_length
+    if datamodel.CLOSED_MAPPING[observation.interval_label] is None:
+        return observation.interval_length
     else:
-        freq = pd.Timedelta('1min')
-    obs_range = pd.date_range(start=data_start, end=data_end, freq=freq,
-                              closed=closed)
-    solar_position_obs = calc_solpos(obs_range)
-    clearsky_obs = calc_cs(solar_position_obs['apparent_zenith'])
+        return pd.Timedelta('1min')
 
-    # Calculate solar position and clearsky for the forecast times.
-    # Use 5 minute or better frequency to minimize solar position errors.
-    # Later, modeled clear sky or ac power will be resampled to interval_length
-    closed_fx = datamodel.CLOSED_MAPPING[interval_label]
-    fx_range = pd.date_range(start=forecast_start, end=forecast_end, freq=freq,
-                             closed=closed_fx)
-    solar_position_fx = calc_solpos(fx_range)
-    clearsky_fx = calc_cs(solar_position_fx['apparent_zenith'])
 
-    # Consider putting the code within each if/else block below into its own
-    # function with standard outputs clear_ref and clear_fx. But with only two
-    # cases for now, it might be more clear to leave inline.
+def _clear_reference(observation, data_start, data_end, clear_values):
+    """Clear sky irradiance or AC power of the observation intervals
+    from data_start to data_end, calculated at times from data_start by
+    clear_values(observation, times)."""
+    closed = datamodel.CLOSED_MAPPING[observation.interval_label]
+    obs_range = pd.date_range(start=data_start, end=data_end,
+                              freq=_clear_freq(observation), closed=closed)
+    clear_ref = clear_values(observation, obs_range)
+    # resample sub-interval reference clear sky to observation intervals
+    return clear_ref.resample(
+        observation.interval_length, closed=closed, label=closed).mean()
+
+
+def _clear_values(observation, times):
+    """Clear sky irradiance of the observation variable or, for a
+    SolarPowerPlant, clear sky AC power at times."""
+    # partial-up the metadata for solar position and
+    # clearsky calculation clarity and consistency
+    site = observation.site
+    calc_solpos = partial(pvmodel.calculate_solar_position,
+                          site.latitude, site.longitude, site.elevation)
+    calc_cs = partial(pvmodel.calculate_clearsky_at_times,
+                      site.latitude, site.longitude, site.elevation)
+    clearsky = calc_cs(times)
     if isinstance(site, datamodel.SolarPowerPlant):
+        solar_position = calc_solpos(times)
         # No temperature input is only OK so long as temperature effects
         # do not push the system above or below AC clip point.
         # It's only a reference forecast!
-        clear_ref = pvmodel.irradiance_to_power(
-            site.modeling_parameters, solar_position_obs['apparent_zenith'],
-            solar_position_obs['azimuth'], clearsky_obs['ghi'],
-            clearsky_obs['dni'], clearsky_obs['dhi']
-        )
-        clear_fx = pvmodel.irradiance_to_power(
-            site.modeling_parameters, solar_position_fx['apparent_zenith'],
-            solar_position_fx['azimuth'], clearsky_fx['ghi'],
-            clearsky_fx['dni'], clearsky_fx['dhi']
-        )
+        return pvmodel.irradiance_to_power(
+            site.modeling_parameters, solar_position['apparent_zenith'],
+            solar_position['azimuth'], clearsky['ghi'],
+            clearsky['dni'], clearsky['dhi'])
     else:
         # assume we are working with ghi, dni, or dhi.
-        clear_ref = clearsky_obs[observation.variable]
-        clear_fx = clearsky_fx[observation.variable]
+        return clearsky[observation.variable]
 
-    # resample sub-interval reference clear sky to observation intervals
-    clear_ref_resampled = clear_ref.resample(
-        observation.interval_length, closed=closed, label=closed).mean()
-    # calculate persistence index (clear sky index or ac power index)
-    # avg{index_{t_start}...index_{t_end}} =
-    #   avg{obs_{t_start}/clear_{t_start}...obs_{t_end}/clear_{t_end}}
-    # clear_ref is calculated at high temporal resolution, so this is accurate
-    # for any observation interval length
-    # apply clip to the clear sky index array before computing the average.
-    # this prevents outliers from distorting the mean, a common occurance
-    # near sunrise and sunset.
-    pers_index = (obs / clear_ref_resampled).clip(lower=0, upper=2).mean()
+
+def _index_forecast(observation, pers_index, forecast_start, forecast_end,
+                    freq, interval_length, interval_label):
+    """Multiply the persistence index by the clear sky irradiance or
+    power averaged over each forecast interval."""
+    # Calculate solar position and clearsky for the forecast times.
+    # Use 5 minute or better frequency to minimize solar position errors.
+    # Later, modeled clear sky or ac power will be resampled to interval_length
+    closed_fx = datamodel.CLOSED_MAPPING[interval_label]
+    fx_range = pd.date_range(start=forecast_start, end=forecast_end, freq=freq,
+                             closed=closed_fx)
+    clear_fx = _clear_values(observation, fx_range)
 
     # average instantaneous clear forecasts over interval_length windows
     # resample operation should be safe due to
@@ -1,5 +1,6 @@
 import itertools
 
+import numpy as np
 import pandas as pd
 from pandas.util.testing import assert_series_equal
 
@@ -91,6 +92,59 @@ def test_reindex_fill_slice_none():
     assert out is None
 
 
+@pytest.mark.parametrize(
+    'start,end,start_slice,end_slice', [
+        (None, None, None, None),
+        ('20190101', '20190101 0230', None, None),
+        ('20190101', '20190101 02', '20190101 0030', '20190101 0130'),
+    ]
+)
+def test_reindex_fill_slice_many(start, end, start_slice, end_slice):
+    index = pd.DatetimeIndex(['20190101 01', '20190101 02', '20190101 03'])
+    args = [pd.Series([1., 3, 2], index=index, name='a'),
+            pd.Series([0, None, 4], index=index),
+            pd.Series([5, 4, 3], index=index)]
+    fill_methods = ['bfill', 'interpolate', 'interpolate']
+    kwargs = dict(freq='30min', start=start, end=end,
+                  start_slice=start_slice, end_slice=end_slice)
+    out = forecast.reindex_fill_slice_many(args, fill_method=fill_methods,
+                                           **kwargs)
+    for o, arg, method in zip(out, args, fill_methods):
+        exp = forecast.reindex_fill_slice(arg, fill_method=method, **kwargs)
+        assert_series_equal(o, exp.astype(float))
+    assert out[0].index is out[1].index is out[2].index
+
+
+def test_reindex_fill_slice_many_none_empty():
+    index = pd.DatetimeIndex(['20190101 01', '20190101 02'])
+    arg = pd.Series([1., 2], index=index)
+    empty = pd.Series()
+    out = forecast.reindex_fill_slice_many([None, arg, empty],
+                                           freq='30min')
+    assert out[0] is None
+    assert out[2] is empty
+    assert_series_equal(out[1], forecast.reindex_fill_slice(arg,
+                                                            freq='30min'))
+    assert forecast.reindex_fill_slice_many([None], freq='30min') == [None]
+
+
+def test_reindex_fill_slice_many_different_index():
+    arg0 = pd.Series([1., 2], index=pd.DatetimeIndex(
+        ['20190101 01', '20190101 02']))
+    arg1 = pd.Series([1., 2], index=pd.DatetimeIndex(
+        ['20190101 02', '20190101 03']))
+    out = forecast.reindex_fill_slice_many([arg0, arg1], freq='30min')
+    for o, arg in zip(out, (arg0, arg1)):
+        assert_series_equal(o, forecast.reindex_fill_slice(arg,
+                                                           freq='30min'))
+
+
+def test_reindex_fill_slice_many_bad_fill_method(rfs_series):
+    with pytest.raises(ValueError):
+        forecast.reindex_fill_slice_many(
+            [rfs_series, rfs_series], fill_method=['bfill'])
+
+
 def test_cloud_cover_to_ghi_linear():
     cloud_cover = pd.Series([0, 50, 100.])
     ghi_clear = pd.Series([1000, 1000, 1000.])
@@ -209,6 +263,55 @@ def test_unmix_intervals_invalidfreq():
         forecast.unmix_intervals(mixed_s)
 
 
+END_1H = pd.Timestamp('20190106T0000Z')
+END_3H = pd.Timestamp('20190111T0000Z')
+
+
+@pytest.fixture
+def gfs_mixed():
+    # 1 hour, 3 hour, and 12 hour sections of a GFS forecast
+    index = pd.date_range('20190101T0100Z', END_1H, freq='1h').append(
+        pd.date_range(END_1H + pd.Timedelta('3h'), END_3H, freq='3h')).append(
+        pd.date_range(END_3H + pd.Timedelta('12h'), periods=12, freq='12h'))
+    values = np.random.RandomState(0).uniform(0, 100, (len(index), 3))
+    return pd.DataFrame(values, index=index)
+
+
+def test_unmix_intervals_array(gfs_mixed):
+    out = forecast.unmix_intervals_array(gfs_mixed.to_numpy(),
+                                         gfs_mixed.index)
+    assert out.shape == gfs_mixed.shape
+    sections = [gfs_mixed.loc[:END_1H],
+                gfs_mixed.loc[END_1H + pd.Timedelta('3h'):END_3H]]
+    for col in gfs_mixed.columns:
+        expected = pd.concat(
+            [forecast.unmix_intervals(section[col]) for section in sections]
+            + [gfs_mixed.loc[END_3H + pd.Timedelta('12h'):, col]])
+        np.testing.assert_array_equal(out[:, col], expected.to_numpy())
+    # 1-D
+    out_1d = forecast.unmix_intervals_array(gfs_mixed[0].to_numpy(),
+                                            gfs_mixed.index)
+    np.testing.assert_array_equal(out_1d, out[:, 0])
+
+
+def test_unmix_intervals_array_bounds():
+    index = pd.date_range('20190101 01Z', freq='1h', periods=6)
+    mixed = np.array([65.0, 66.0, 44.0, 32.0, 30.0, 26.0])
+    out = forecast.unmix_intervals_array(mixed, index, lower=None,
+                                         upper=None)
+    np.testing.assert_allclose(out, [65.0, 67.0, 0.0, -4.0, 22.0, 6.0])
+
+
+@pytest.mark.parametrize('index', [
+    pd.date_range('20190101 02Z', freq='1h', periods=6),
+    pd.date_range('20190101 06Z', freq='3h', periods=2),
+    pd.date_range('20190101 01Z', freq='2h', periods=3),
+])
+def test_unmix_intervals_array_fail(index):
+    with pytest.raises(ValueError):
+        forecast.unmix_intervals_array(np.zeros(len(index)), index)
+
+
 def test_unmix_intervals_two_freq():
     index = pd.DatetimeIndex(['20190101 01', '20190101 02', '20190101 04'])
     mixed_s = pd.Series([1, 1/3, 1/6], index=index)
@@ -66,6 +66,54 @@ def test_get_next_issue_time(single_forecast, runtime, expected):
     assert out == expected
 
 
+@pytest.mark.parametrize('runtime', [
+    pd.Timestamp('20190501T1100Z'),
+    pd.Timestamp('20190501T1030Z'),
+    pd.Timestamp('20190501T0030Z'),
+    pd.Timestamp('20190501T2359Z'),
+    pd.Timestamp('20190501T0000Z'),
+    pd.Timestamp('20190501T2200-0700'),
+    pd.Timestamp('20190310T0330', tz='America/Denver'),
+    pd.Timestamp('20190501T1317'),
+])
+def test_get_next_issue_times(single_forecast, runtime):
+    fxs = [replace(single_forecast, issue_time_of_day=itod,
+                   run_length=pd.Timedelta(rl))
+           for itod, rl in ((dt.time(5, 0), '6h'), (dt.time(0), '1d'),
+                            (dt.time(23, 0), '1h'), (dt.time(7, 30), '5min'),
+                            (dt.time(0), '15min'), (dt.time(12), '24h'))]
+    expected = [utils.get_next_issue_time(fx, runtime) for fx in fxs]
+    out = utils.get_next_issue_times(
+        [fx.issue_time_of_day for fx in fxs],
+        [fx.run_length for fx in fxs], runtime)
+    assert list(out) == expected
+    arrays = utils.get_next_issue_times(
+        utils._time_of_day_ns([fx.issue_time_of_day for fx in fxs]),
+        pd.TimedeltaIndex([fx.run_length for fx in fxs]).asi8, runtime)
+    assert arrays.equals(out)
+
+
+@pytest.mark.parametrize('runtime', [
+    pd.Timestamp('20190501T0430Z'),
+    pd.Timestamp('20190501T2200-0700'),
+    pd.Timestamp('20190310T0430', tz='America/Denver'),
+])
+def test_issue_schedule(single_forecast, runtime):
+    fxs = [replace(single_forecast, issue_time_of_day=itod,
+                   run_length=pd.Timedelta(rl))
+           for itod, rl in ((dt.time(5, 0), '6h'), (dt.time(0), '1d'),
+                            (dt.time(4, 0), '1h'), (dt.time(3, 30), '12h'))]
+    schedule = utils.IssueSchedule(fxs)
+    assert len(schedule) == 4
+    expected = [utils.get_next_issue_time(fx, runtime) for fx in fxs]
+    assert list(schedule.next_issue_times(runtime)) == expected
+    buffer = pd.Timedelta('1h')
+    due = schedule.due(runtime, buffer)
+    assert due.dtype == bool
+    assert list(due) == [exp <= runtime + buffer for exp in expected]
+    assert not utils.IssueSchedule([]).due(runtime, buffer).any()
+
+
 def test_get_init_time():
     run_time = pd.Timestamp('20190501T1200Z')
     fetch_metadata = {'delay_to_first_forecast': '1h',
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 import datetime as dt
 from functools import partial
@@ -7,7 +8,7 @@ import re
 
 
 import pandas as pd
-from pandas.testing import assert_frame_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
 import pytest
 
 
@@ -133,6 +134,31 @@ def test_run_persistence_scalar_index(session, site_metadata, obs_5min_begin,
     assert main.persistence.persistence_scalar_index.call_count == 1
 
 
+@pytest.mark.parametrize('index', [False, True])
+def test_run_persistence_engine(session, site_metadata, obs_5min_begin,
+                                requests_mock, index):
+    # issued every hour
+    forecast = default_forecast(
+        site_metadata,
+        issue_time_of_day=dt.time(hour=0),
+        lead_time_to_start=pd.Timedelta('1h'),
+        interval_length=pd.Timedelta('1h'),
+        run_length=pd.Timedelta('1h'),
+        interval_label='beginning')
+    engine = main.make_persistence_engine(session)
+    for hour in (19, 20, 21):
+        run_time = pd.Timestamp(f'20190101T{hour}45Z')
+        issue_time = pd.Timestamp(f'20190101T{hour + 2}00Z')
+        out = main.run_persistence(session, obs_5min_begin, forecast,
+                                   run_time, issue_time, index=index,
+                                   engine=engine)
+        expected = main.run_persistence(session, obs_5min_begin, forecast,
+                                        run_time, issue_time, index=index)
+        assert_series_equal(out, expected)
+    # one request for each run without the engine, three with it
+    assert requests_mock.call_count == 6
+
+
 def test_run_persistence_interval(session, site_metadata, obs_5min_begin,
                                   mocker):
     run_time = pd.Timestamp('20190102T1945Z')
@@ -272,6 +298,17 @@ def test_find_reference_nwp_forecasts_no_init(ac_power_forecast_metadata):
     assert out.piggyback_on.unique() == ['0']
 
 
+def test_find_reference_nwp_forecasts_cached_parameters(forecast_list):
+    main._load_extra_parameters.cache_clear()
+    main.find_reference_nwp_forecasts(forecast_list)
+    misses = main._load_extra_parameters.cache_info().misses
+    out = main.find_reference_nwp_forecasts(forecast_list,
+                                            pd.Timestamp('20190501T0000Z'))
+    info = main._load_extra_parameters.cache_info()
+    assert info.misses == misses
+    assert info.hits >= len(out)
+
+
 def test_find_reference_nwp_forecasts(ac_power_forecast_metadata):
     fxs = [replace(ac_power_forecast_metadata,
                    extra_parameters='{"model": "am", "is_reference_forecast": true}',  # NOQA
@@ -417,6 +454,107 @@ def test_process_nwp_forecast_groups_missing_runfor(mocker, forecast_list):
     assert api.post_forecast_values.call_count == 0
 
 
+class _NWPResult:
+    ac_power = [0]
+    ghi = [0]
+
+
+@pytest.fixture()
+def thread_compute_pool(mocker):
+    # run_nwp is mocked, which does not carry over to worker processes
+    mocker.patch(
+        'solarforecastarbiter.reference_forecasts.main.ProcessPoolExecutor',
+        new=ThreadPoolExecutor)
+
+
+@pytest.mark.parametrize('workers', [None, 1, 3])
+def test_process_nwp_forecast_groups_timing(mocker, forecast_list,
+                                            thread_compute_pool, workers):
+    api = mocker.MagicMock()
+    mocker.patch('solarforecastarbiter.reference_forecasts.main.run_nwp',
+                 return_value=_NWPResult)
+    fxs = main.find_reference_nwp_forecasts(forecast_list[:-4])
+    logger = mocker.patch(
+        'solarforecastarbiter.reference_forecasts.main.logger')
+    timing = main.process_nwp_forecast_groups(
+        api, pd.Timestamp('20190501T0000Z'), fxs, workers=workers)
+    assert not logger.error.called
+    assert api.post_forecast_values.call_count == 3
+    assert set(timing.keys()) == {'0', '1'}
+    for group_timing in timing.values():
+        assert isinstance(group_timing, main.GroupTiming)
+        assert group_timing.compute >= 0
+        assert group_timing.upload >= 0
+        assert group_timing.error is None
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+@pytest.mark.parametrize('exc', [FileNotFoundError, ValueError])
+def test_process_nwp_forecast_groups_compute_error(
+        mocker, forecast_list, thread_compute_pool, workers, exc):
+    api = mocker.MagicMock()
+
+    def run_nwp(forecast, *args):
+        if forecast.forecast_id == '0':
+            raise exc('bad')
+        return _NWPResult
+
+    mocker.patch('solarforecastarbiter.reference_forecasts.main.run_nwp',
+                 new=run_nwp)
+    fxs = main.find_reference_nwp_forecasts(forecast_list[:-4])
+    logger = mocker.patch(
+        'solarforecastarbiter.reference_forecasts.main.logger')
+    timing = main.process_nwp_forecast_groups(
+        api, pd.Timestamp('20190501T0000Z'), fxs, workers=workers)
+    assert logger.error.called
+    # other group is still posted
+    api.post_forecast_values.assert_called_once_with('1', [0])
+    assert timing['0'].error == f'{exc.__name__}: bad'
+    assert timing['1'].error is None
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_process_nwp_forecast_groups_upload_error(
+        mocker, forecast_list, thread_compute_pool, workers):
+    api = mocker.MagicMock()
+    api.post_forecast_values.side_effect = [ValueError, None, None]
+    mocker.patch('solarforecastarbiter.reference_forecasts.main.run_nwp',
+                 return_value=_NWPResult)
+    fxs = main.find_reference_nwp_forecasts(forecast_list[:-4])
+    timing = main.process_nwp_forecast_groups(
+        api, pd.Timestamp('20190501T0000Z'), fxs, workers=workers)
+    assert api.post_forecast_values.call_count == 3
+    errors = [t.error for t in timing.values()]
+    assert errors.count(None) == 1
+    assert '1 uploads failed' in errors
+
+
+def test_process_nwp_forecast_groups_invalid_timing(mocker, forecast_list):
+    api = mocker.MagicMock()
+    mocker.patch('solarforecastarbiter.reference_forecasts.main.run_nwp',
+                 return_value=_NWPResult)
+    fxs = main.find_reference_nwp_forecasts(forecast_list[-2:])
+    timing = main.process_nwp_forecast_groups(
+        api, pd.Timestamp('20190501T0000Z'), fxs, workers=2)
+    assert timing['6'] == main.GroupTiming(
+        0.0, 0.0, 'Piggyback forecast not found')
+
+
+def test_process_nwp_forecast_groups_processes(mocker, forecast_list):
+    api = mocker.MagicMock()
+    # worker processes may not be forked, so nothing can be mocked in
+    # them. BASE_PATH is passed to the workers. the latest init_time
+    # at this run_time is 20190515T0000Z for both models
+    mocker.patch.object(nwp, 'BASE_PATH', str(BASE_PATH))
+    fxs = main.find_reference_nwp_forecasts(forecast_list[:-4])
+    timing = main.process_nwp_forecast_groups(
+        api, pd.Timestamp('20190515T0500Z'), fxs, workers=2)
+    assert set(timing.keys()) == {'0', '1'}
+    assert all(t.error is None and t.compute > 0 for t in timing.values())
+    # only the ghi forecast, 2, has values for a site without power
+    api.post_forecast_values.assert_called_once_with('2', mocker.ANY)
+
+
 @pytest.mark.parametrize('issue_buffer,empty', [
     (pd.Timedelta('10h'), False),
     (pd.Timedelta('1h'), True),
@@ -429,8 +567,148 @@ def test_make_latest_nwp_forecasts(forecast_list, mocker, issue_buffer, empty):
     fxdf = main.find_reference_nwp_forecasts(forecast_list[:-3], run_time)
     process = mocker.patch(
         'solarforecastarbiter.reference_forecasts.main.process_nwp_forecast_groups')  # NOQA
-    main.make_latest_nwp_forecasts('', run_time, issue_buffer)
+    main.make_latest_nwp_forecasts('', run_time, issue_buffer, workers=2)
+    if empty:
+        process.assert_not_called()
+    else:
+        assert_frame_equal(process.call_args[0][-1], fxdf)
+        assert process.call_args[1]['workers'] == 2
+
+
+@pytest.fixture
+def persistence_forecast_list(site_metadata, obs_5min_begin):
+    intraday = default_forecast(
+        site_metadata,
+        issue_time_of_day=dt.time(hour=23),
+        lead_time_to_start=pd.Timedelta('1h'),
+        interval_length=pd.Timedelta('1h'),
+        run_length=pd.Timedelta('1h'),
+        interval_label='beginning')
+    dayahead = default_forecast(
+        site_metadata,
+        issue_time_of_day=dt.time(hour=23),
+        lead_time_to_start=pd.Timedelta('1h'),
+        interval_length=pd.Timedelta('1h'),
+        run_length=pd.Timedelta('24h'),
+        interval_label='beginning')
+    extra = ('{"is_reference_persistence_forecast": true, '
+             '"observation_id": "%s"%s}')
+    obs_id = obs_5min_begin.observation_id
+    return [
+        replace(intraday, forecast_id='0',
+                extra_parameters=extra % (obs_id, '')),
+        replace(intraday, forecast_id='1',
+                extra_parameters=extra % (
+                    obs_id, ', "index_persistence": true')),
+        replace(dayahead, forecast_id='2',
+                extra_parameters=extra % (obs_id, '')),
+        replace(intraday, forecast_id='3',
+                extra_parameters=extra % ('missing', '')),
+        replace(intraday, forecast_id='4',
+                extra_parameters='{"is_reference_persistence_forecast": true'),
+        replace(intraday, forecast_id='5',
+                extra_parameters='{"is_reference_forecast": true}'),
+    ]
+
+
+def test_find_reference_persistence_forecasts(persistence_forecast_list,
+                                              obs_5min_begin, mocker):
+    logger = mocker.patch(
+        'solarforecastarbiter.reference_forecasts.main.logger')
+    run_time = pd.Timestamp('20190101T1945Z')
+    out = main.find_reference_persistence_forecasts(
+        persistence_forecast_list, [obs_5min_begin], run_time)
+    assert list(out.index) == ['0', '1', '2']
+    assert list(out['index']) == [False, True, False]
+    assert all(obs == obs_5min_begin for obs in out.observation)
+    assert list(out.next_issue_time) == [
+        pd.Timestamp('20190101T2300Z')] * 3
+    assert logger.warning.called
+    assert logger.error.called
+    out = main.find_reference_persistence_forecasts(
+        persistence_forecast_list, [obs_5min_begin])
+    assert out.next_issue_time.unique() == [None]
+    out = main.find_reference_persistence_forecasts(
+        persistence_forecast_list[3:], [obs_5min_begin], run_time)
+    assert out.empty
+
+
+def test_process_persistence_forecasts(session, persistence_forecast_list,
+                                       obs_5min_begin, requests_mock):
+    # data for the intraday and day ahead forecasts is in the test data
+    run_time = pd.Timestamp('20190102T0045Z')
+    fx_df = main.find_reference_persistence_forecasts(
+        persistence_forecast_list, [obs_5min_begin], run_time)
+    post = requests_mock.register_uri(
+        'POST', re.compile(f'{session.base_url}/forecasts/single/.*/values'))
+    timing = main.process_persistence_forecasts(session, run_time, fx_df,
+                                                workers=2)
+    assert isinstance(timing, main.PersistenceTiming)
+    assert timing.errors == {}
+    # the day ahead and intraday data windows are loaded at once
+    get_requests = [r for r in requests_mock.request_history
+                    if r.method == 'GET']
+    assert len(get_requests) == 1
+    assert post.call_count == 3
+    for fx_id, index, issue_time in zip(
+            fx_df.index, fx_df['index'], fx_df.next_issue_time):
+        expected = main.run_persistence(
+            session, obs_5min_begin, fx_df.loc[fx_id, 'forecast'], run_time,
+            issue_time, index=index)
+        posted = [r for r in post.request_history
+                  if f'/{fx_id}/values' in r.url][0].json()['values']
+        assert len(posted) == len(expected)
+
+
+def test_process_persistence_forecasts_errors(
+        session, persistence_forecast_list, obs_5min_begin, mocker):
+    run_time = pd.Timestamp('20190102T0045Z')
+    fx_df = main.find_reference_persistence_forecasts(
+        persistence_forecast_list, [obs_5min_begin], run_time)
+    mocker.patch.object(
+        session, 'post_values_bulk',
+        side_effect=lambda values, **kw: {
+            fx: ValueError('bad') if fx.forecast_id == '0' else None
+            for fx in values})
+    run = mocker.patch(
+        'solarforecastarbiter.reference_forecasts.main.run_persistence',
+        side_effect=[pd.Series(), TypeError('fail'), pd.Series()])
+    timing = main.process_persistence_forecasts(session, run_time, fx_df)
+    assert run.call_count == 3
+    assert timing.errors == {'0': 'ValueError: bad',
+                             '1': 'TypeError: fail'}
+
+    # observation data fails to load
+    mocker.patch.object(session, 'get_observation_values',
+                        side_effect=ValueError('no data'))
+    timing = main.process_persistence_forecasts(session, run_time, fx_df)
+    assert set(timing.errors) == {'0', '1', '2'}
+
+
+@pytest.mark.parametrize('issue_buffer,empty', [
+    (pd.Timedelta('10h'), False),
+    (pd.Timedelta('10min'), True),
+])
+def test_make_latest_persistence_forecasts(
+        persistence_forecast_list, obs_5min_begin, mocker, issue_buffer,
+        empty):
+    session = mocker.patch('solarforecastarbiter.io.api.APISession')
+    session.return_value.list_forecasts.return_value = \
+        persistence_forecast_list
+    session.return_value.list_observations.return_value = [obs_5min_begin]
+    run_time = pd.Timestamp('20190101T1945Z')
+    fxdf = main.find_reference_persistence_forecasts(
+        persistence_forecast_list, [obs_5min_begin], run_time)
+    process = mocker.patch(
+        'solarforecastarbiter.reference_forecasts.main.process_persistence_forecasts',  # NOQA
+        return_value=main.PersistenceTiming(0.0, 1.0, 2.0, 3.0, {}))
+    out = main.make_latest_persistence_forecasts('', run_time, issue_buffer,
+                                                 workers=2)
     if empty:
         process.assert_not_called()
+        assert out is None
     else:
         assert_frame_equal(process.call_args[0][-1], fxdf)
+        assert process.call_args[1]['workers'] == 2
+        assert out.find > 0
+        assert out[1:] == (1.0, 2.0, 3.0, {})
@@ -3,10 +3,11 @@ from pathlib import Path
 import types
 
 import pandas as pd
-# from pandas.util.testing import assert_series_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
 
 import pytest
 
+from solarforecastarbiter import pvmodel
 from solarforecastarbiter.io import nwp
 from solarforecastarbiter.reference_forecasts import models
 
@@ -138,6 +139,113 @@ def test_gefs_half_deg_to_hourly_mean(start, end, init_time):
     check_out(out, start, end_fx_expected, end_strict=True)
 
 
+def test_gefs_half_deg_to_hourly_mean_workers(mocker):
+    args = (latitude, longitude, elevation, init_time, start, end_long,
+            'beginning')
+    serial = models.gefs_half_deg_to_hourly_mean(
+        *args, load_forecast=LOAD_FORECAST)
+    mocker.patch.object(models, 'GEFS_MEMBER_WORKERS', 4)
+    mocker.patch.object(models, '_GEFS_POOL', None)
+    executor = mocker.spy(models, 'ProcessPoolExecutor')
+    try:
+        out = models.gefs_half_deg_to_hourly_mean(
+            *args, load_forecast=LOAD_FORECAST)
+        # the pool is reused by the next forecast
+        models.gefs_half_deg_to_hourly_mean(
+            *args, load_forecast=LOAD_FORECAST)
+    finally:
+        models._shutdown_gefs_pool()
+    assert executor.call_count == 1
+    assert executor.call_args[1]['max_workers'] == 4
+    assert executor.call_args[1]['initializer'] is models.initialize_worker
+    for o, s in zip(out[:5], serial[:5]):
+        assert list(o.columns) == list(models.GEFS_MEMBERS)
+        assert_frame_equal(o, s)
+
+
+def test_gefs_member_pool(mocker):
+    mocker.patch.object(models, '_GEFS_POOL', None)
+    mocker.patch.object(models, 'GEFS_MEMBER_WORKERS', None)
+    executor = mocker.patch.object(
+        models, 'ProcessPoolExecutor',
+        side_effect=lambda **kwargs: mocker.MagicMock())
+    models.set_gefs_member_workers(2)
+    pool = models._gefs_member_pool()
+    assert models._gefs_member_pool() is pool
+    # new settings need new workers
+    mocker.patch.object(nwp, 'BASE_PATH', 'other')
+    assert models._gefs_member_pool() is not pool
+    assert pool.shutdown.called
+    models.set_gefs_member_workers(None)
+    assert models._GEFS_POOL is None
+    assert executor.call_count == 2
+
+
+@pytest.mark.parametrize('func,model', [
+    (models._unmix_various_gfs_intervals, 'gfs_0p25'),
+    (models._unmix_various_gefs_intervals, 'gefs_c00'),
+])
+def test__unmix_various_intervals_frame(func, model):
+    start_floored, end_ceil = models._adjust_gfs_start_end(
+        pd.Timestamp('20190515T0100Z'), pd.Timestamp('20190531T0000Z'))
+    cloud_cover = LOAD_FORECAST(
+        latitude, longitude, init_time, start_floored, end_ceil, model,
+        variables=('cloud_cover', 'air_temperature'))[0]
+    mixed = pd.DataFrame({'a': cloud_cover, 'b': cloud_cover / 2})
+    out = func(init_time, start_floored, end_ceil, mixed)
+    for col in mixed.columns:
+        expected = func(init_time, start_floored, end_ceil, mixed[col])
+        assert_series_equal(out[col], expected, check_names=False)
+
+
+def test_set_gefs_member_workers(mocker):
+    mocker.patch.object(models, 'GEFS_MEMBER_WORKERS')
+    models.set_gefs_member_workers(3)
+    assert models.GEFS_MEMBER_WORKERS == 3
+
+
+def test_initialize_worker(mocker, tmp_path):
+    mocker.patch.object(nwp, 'BASE_PATH', 'nwp_data')
+    mocker.patch.object(nwp, 'CACHE_GRID_INDEX', True)
+    mocker.patch.object(pvmodel, 'SOLAR_POSITION_CACHE',
+                        pvmodel.SolarPositionCache(10, str(tmp_path)))
+    mocker.patch.object(models, 'GEFS_MEMBER_WORKERS', 3)
+    settings = models.worker_settings()
+    # a new process that did not inherit the settings
+    mocker.patch.object(nwp, 'BASE_PATH', '')
+    mocker.patch.object(nwp, 'CACHE_GRID_INDEX', False)
+    mocker.patch.object(pvmodel, 'SOLAR_POSITION_CACHE',
+                        pvmodel.SolarPositionCache())
+    models.initialize_worker(*settings)
+    assert nwp.BASE_PATH == 'nwp_data'
+    assert nwp.CACHE_GRID_INDEX
+    assert pvmodel.SOLAR_POSITION_CACHE.maxsize == 10
+    assert pvmodel.SOLAR_POSITION_CACHE.cache_dir == str(tmp_path)
+    assert models.GEFS_MEMBER_WORKERS is None
+
+
+def test_initialize_worker_forked(mocker):
+    # a forked process keeps the cache it inherited
+    cache = pvmodel.SolarPositionCache(10)
+    mocker.patch.object(pvmodel, 'SOLAR_POSITION_CACHE', cache)
+    mocker.patch.object(models, 'GEFS_MEMBER_WORKERS', None)
+    models.initialize_worker(*models.worker_settings())
+    assert pvmodel.SOLAR_POSITION_CACHE is cache
+
+
+def test__gefs_member_frame():
+    index = pd.date_range(start, periods=3, freq='5min')
+    members = [pd.Series([i, i + 1., i + 2.], index=index)
+               for i in range(21)]
+    out = models._gefs_member_frame(members)
+    assert_frame_equal(out, pd.DataFrame(dict(zip(models.GEFS_MEMBERS,
+                                                  members))))
+    members[1] = members[1].iloc[1:]
+    out = models._gefs_member_frame(members)
+    assert list(out.columns) == list(models.GEFS_MEMBERS)
+    assert out['p01'].isnull().sum() == 1
+
+
 @pytest.mark.parametrize('model', [
     'hrrr_hourly',
     'hrrr_subhourly',
@@ -1,4 +1,5 @@
 from contextlib import nullcontext as does_not_raise
+from dataclasses import replace
 from functools import partial
 
 import pandas as pd
@@ -343,3 +344,201 @@ def test_persistence_scalar_index_low_solar_elevation(
         observation_ac, data_start, data_end, forecast_start, forecast_end,
         interval_length, interval_label, load_data)
     assert_series_equal(fx, expected, check_less_precise=1, check_names=False)
+
+
+def _without_freq(series):
+    # the engine joins loaded data, which drops the index freq
+    return pd.Series(series.to_numpy(), name=series.name,
+                     index=pd.DatetimeIndex(list(series.index)))
+
+
+@pytest.fixture
+def engine_fetches(uniform_data):
+    fetches = []
+
+    def fetch_data(observation, start, end):
+        fetches.append((start, end))
+        return uniform_data[start:end]
+
+    return persistence.PersistenceEngine(fetch_data), fetches
+
+
+@pytest.mark.parametrize('interval_label', ['beginning', 'ending'])
+def test_persistence_engine_scalar(site_metadata, uniform_data,
+                                   engine_fetches, interval_label):
+    engine, fetches = engine_fetches
+    observation = default_observation(
+        site_metadata, interval_length='5min', interval_label=interval_label)
+    tz = uniform_data.index.tzinfo
+    load_data = partial(load_data_base, uniform_data)
+    interval_length = pd.Timedelta('5min')
+    for hour in (12, 13, 14):
+        data_start = pd.Timestamp(f'20190404 {hour}00', tz=tz)
+        data_end = data_start + pd.Timedelta('1h')
+        args = (observation, data_start, data_end, data_end,
+                data_end + pd.Timedelta('1h'), interval_length,
+                interval_label)
+        assert_series_equal(
+            engine.persistence_scalar(*args),
+            persistence.persistence_scalar(*args, load_data=load_data))
+        assert_series_equal(
+            _without_freq(
+                engine.load_data(observation, data_start, data_end)),
+            _without_freq(load_data(observation, data_start, data_end)))
+    # only the data after the first window and the last observation
+    # interval of the buffer are fetched on later runs
+    assert fetches == [
+        (pd.Timestamp('20190404 1200', tz=tz),
+         pd.Timestamp('20190404 1300', tz=tz)),
+        (pd.Timestamp('20190404 1255', tz=tz),
+         pd.Timestamp('20190404 1400', tz=tz)),
+        (pd.Timestamp('20190404 1355', tz=tz),
+         pd.Timestamp('20190404 1500', tz=tz))]
+
+
+@pytest.mark.parametrize('overlap,reload_from', [
+    (None, '20190404 1255'),
+    ('2min', '20190404 1255'),
+    ('30min', '20190404 1230'),
+    ('2h', '20190404 1200'),
+])
+def test_persistence_engine_late_values(site_metadata, uniform_data,
+                                        overlap, reload_from):
+    tz = uniform_data.index.tzinfo
+    late = pd.Timestamp('20190404 1255', tz=tz)
+    uploaded = uniform_data.drop(late)
+    fetches = []
+
+    def fetch_data(observation, start, end):
+        fetches.append((start, end))
+        return uploaded[start:end]
+
+    engine = persistence.PersistenceEngine(fetch_data, overlap=overlap)
+    observation = default_observation(
+        site_metadata, interval_length='5min', interval_label='beginning')
+    start = pd.Timestamp('20190404 1200', tz=tz)
+    end = start + pd.Timedelta('1h')
+    first = engine.load_data(observation, start, end)
+    assert late not in first.index
+    uploaded = uniform_data.copy()
+    uploaded[late] = 50.
+    second = engine.load_data(observation, start, end + pd.Timedelta('1h'))
+    assert fetches[-1] == (pd.Timestamp(reload_from, tz=tz),
+                           end + pd.Timedelta('1h'))
+    assert second[late] == 50.
+    assert not second.index.duplicated().any()
+    assert second.index.is_monotonic_increasing
+    assert len(second) == 24
+
+
+def test_persistence_engine_max_age_and_clear(site_metadata, uniform_data):
+    fetches = []
+
+    def fetch_data(observation, start, end):
+        fetches.append((start, end))
+        return uniform_data[start:end]
+
+    engine = persistence.PersistenceEngine(fetch_data, max_age='1h')
+    observation = default_observation(
+        site_metadata, interval_length='5min', interval_label='beginning')
+    tz = uniform_data.index.tzinfo
+    start = pd.Timestamp('20190404 1200', tz=tz)
+    engine.load_data(observation, start, start + pd.Timedelta('30min'))
+    engine.load_data(observation, start + pd.Timedelta('30min'),
+                     start + pd.Timedelta('2h'))
+    buffered = engine._values[observation.observation_id][2]
+    assert buffered.index[0] == start + pd.Timedelta('30min')
+    # window before the buffer is fetched again
+    engine.load_data(observation, start, start + pd.Timedelta('1h'))
+    assert fetches[-1] == (start, start + pd.Timedelta('1h'))
+    engine.clear(observation)
+    assert observation.observation_id not in engine._values
+    engine.load_data(observation, start, start + pd.Timedelta('1h'))
+    assert len(fetches) == 4
+
+
+def test_persistence_engine_interval(site_metadata, uniform_data,
+                                     engine_fetches):
+    engine, fetches = engine_fetches
+    observation = default_observation(
+        site_metadata, interval_length='5min', interval_label='beginning')
+    tz = 'America/Phoenix'
+    load_data = partial(load_data_base, uniform_data)
+    args = (observation, pd.Timestamp('20190404', tz=tz),
+            pd.Timestamp('20190405', tz=tz), pd.Timestamp('20190405', tz=tz),
+            pd.Timedelta('1h'), 'beginning')
+    assert_series_equal(
+        engine.persistence_interval(*args),
+        persistence.persistence_interval(*args, load_data=load_data))
+
+
+@pytest.mark.parametrize('interval_label', ['beginning', 'ending'])
+@pytest.mark.parametrize('obs_interval_label', ['beginning', 'instant'])
+def test_persistence_engine_scalar_index(
+        site_metadata, powerplant_metadata, uniform_data, engine_fetches,
+        interval_label, obs_interval_label, mocker):
+    engine, fetches = engine_fetches
+    observation = default_observation(
+        site_metadata, interval_length='5min',
+        interval_label=obs_interval_label)
+    observation_ac = replace(default_observation(
+        powerplant_metadata, interval_length='5min',
+        interval_label=obs_interval_label, variable='ac_power'),
+        observation_id='ac')
+    tz = uniform_data.index.tzinfo
+    load_data = partial(load_data_base, uniform_data)
+    interval_length = pd.Timedelta('30min')
+    if obs_interval_label == 'instant':
+        end_offset = pd.Timedelta('1s')
+    else:
+        end_offset = pd.Timedelta(0)
+    spy = mocker.spy(persistence, '_clear_values')
+    modeled = []
+    for obs in (observation, observation_ac):
+        for hour in (12, 13):
+            data_start = pd.Timestamp(f'20190404 {hour}00', tz=tz)
+            data_end = data_start + pd.Timedelta('1h') - end_offset
+            forecast_start = data_start + pd.Timedelta('1h')
+            args = (obs, data_start, data_end, forecast_start,
+                    forecast_start + pd.Timedelta('1h'), interval_length,
+                    interval_label)
+            spy.reset_mock()
+            fx = engine.persistence_scalar_index(*args)
+            # the first call models the clear sky reference of the data
+            modeled.append(spy.call_args_list[0][0][1])
+            assert_series_equal(
+                fx,
+                persistence.persistence_scalar_index(
+                    *args, load_data=load_data),
+                check_names=False)
+    # clear sky reference is only modeled for the new hour of each run
+    npts = 12 if obs_interval_label == 'instant' else 60
+    assert [len(times) for times in modeled] == [npts] * 4
+    assert modeled[1][0] == pd.Timestamp('20190404 1300', tz=tz)
+    # and data after the first window is fetched once for each observation
+    assert len(fetches) == 4
+
+
+@pytest.mark.parametrize('interval_label', ['beginning', 'ending'])
+@pytest.mark.parametrize('start_offset', ['1s', '2min'])
+def test_persistence_engine_scalar_index_unaligned(
+        site_metadata, uniform_data, engine_fetches, interval_label,
+        start_offset):
+    engine, fetches = engine_fetches
+    observation = default_observation(
+        site_metadata, interval_length='5min', interval_label='instant')
+    tz = uniform_data.index.tzinfo
+    load_data = partial(load_data_base, uniform_data)
+    interval_length = pd.Timedelta('30min')
+    for hour in (12, 13, 14):
+        data_end = pd.Timestamp(f'20190404 {hour}00', tz=tz)
+        data_start = data_end - pd.Timedelta('1h') + pd.Timedelta(
+            start_offset)
+        args = (observation, data_start, data_end, data_end,
+                data_end + pd.Timedelta('1h'), interval_length,
+                interval_label)
+        assert_series_equal(
+            engine.persistence_scalar_index(*args),
+            persistence.persistence_scalar_index(
+                *args, load_data=load_data),
+            check_names=False)
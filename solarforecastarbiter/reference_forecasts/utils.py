@@ -50,6 +50,114 @@ def get_next_issue_time(forecast, run_time):
     return issue_times[idx]
 
 
+def _time_of_day_ns(times):
+    """Nanoseconds since midnight of each datetime.time"""
+    return np.array(
+        [((t.hour * 60 + t.minute) * 60 + t.second) * 10**9 +
+         t.microsecond * 1000 for t in times], dtype='int64')
+
+
+def get_next_issue_times(issue_time_of_day, run_length, run_time):
+    """
+    Determine the next issue time of many forecasts at once. The result
+    for each forecast is the same as :py:func:`get_next_issue_time`.
+
+    Parameters
+    ----------
+    issue_time_of_day : list of datetime.time or np.ndarray
+        Issue time of day of each forecast, or an int64 array of
+        nanoseconds since midnight.
+    run_length : list of pandas.Timedelta or np.ndarray
+        Run length of each forecast, or an int64 array of nanoseconds.
+    run_time : pandas.Timestamp
+
+    Returns
+    -------
+    pandas.DatetimeIndex
+        Next issue time of each forecast in the time zone of *run_time*.
+    """
+    if isinstance(issue_time_of_day, np.ndarray):
+        time_of_day = issue_time_of_day.astype('int64')
+    else:
+        time_of_day = _time_of_day_ns(issue_time_of_day)
+    if isinstance(run_length, np.ndarray):
+        length = run_length.astype('int64')
+    else:
+        length = pd.TimedeltaIndex(run_length).asi8
+    next_issue = pd.DatetimeIndex(
+        _next_issue_ns(time_of_day, length, run_time))
+    if run_time.tz is not None:
+        next_issue = next_issue.tz_localize('UTC').tz_convert(run_time.tz)
+    return next_issue
+
+
+def _next_issue_ns(time_of_day, length, run_time):
+    """Next issue times as nanoseconds since the epoch in UTC"""
+    # first issue time on the day of run_time in the time zone of run_time
+    midnight = run_time.tz_localize(None).normalize().value
+    first = midnight + time_of_day
+    if run_time.tz is not None and str(run_time.tz) != 'UTC':
+        # daylight saving time may change the offset during the day
+        first = pd.DatetimeIndex(first).tz_localize(run_time.tz).asi8
+    elapsed = run_time.value - first
+    periods = np.where(elapsed > 0, -(-elapsed // length), 0)
+    return first + periods * length
+
+
+class IssueSchedule:
+    """
+    Issue times of many forecasts kept as arrays, so that the forecasts
+    due at a run time are found without creating the issue times of
+    each forecast.
+
+    Parameters
+    ----------
+    forecasts : list of datamodel.Forecast
+    """
+    def __init__(self, forecasts):
+        self.forecasts = list(forecasts)
+        self._time_of_day = _time_of_day_ns(
+            [fx.issue_time_of_day for fx in self.forecasts])
+        self._run_length = pd.TimedeltaIndex(
+            [fx.run_length for fx in self.forecasts]).asi8
+
+    def __len__(self):
+        return len(self.forecasts)
+
+    def next_issue_times(self, run_time):
+        """Next issue time of each forecast as in
+        :py:func:`get_next_issue_time`.
+
+        Parameters
+        ----------
+        run_time : pandas.Timestamp
+
+        Returns
+        -------
+        pandas.DatetimeIndex
+        """
+        return get_next_issue_times(self._time_of_day, self._run_length,
+                                    run_time)
+
+    def due(self, run_time, issue_buffer):
+        """Which forecasts have their next issue time within
+        *issue_buffer* of *run_time*.
+
+        Parameters
+        ----------
+        run_time : pandas.Timestamp
+        issue_buffer : pandas.Timedelta
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array in the order of the forecasts.
+        """
+        next_issue = _next_issue_ns(self._time_of_day, self._run_length,
+                                    run_time)
+        return next_issue <= (run_time + pd.Timedelta(issue_buffer)).value
+
+
 def get_init_time(run_time, fetch_metadata):
     """Determine the most recent init time for which all forecast data is
     available."""
@@ -61,7 +61,7 @@ from solarforecastarbiter.metrics import preprocessing, calculator
 from solarforecastarbiter.reports import figures, template
 
 
-def get_data_for_report(session, report):
+def get_data_for_report(session, report, max_workers=None):
     """
     Get data for report.
 
@@ -73,13 +73,27 @@ def get_data_for_report(session, report):
         API session for getting and posting data
     report : solarforecastarbiter.datamodel.Report
         Metadata describing report
+    max_workers : int or None
+        If provided, make up to max_workers API calls at the same time
+        with :py:meth:`~solarforecastarbiter.io.api.APISession.get_values_bulk`.
+        If None, make the API calls one after another.
 
     Returns
     -------
     data : dict
         Keys are Forecast and Observation uuids, values are
         the corresponding data.
-    """
+    """  # NOQA
+    if max_workers is not None:
+        objects = [obj for fxobs in report.forecast_observations
+                   for obj in (fxobs.forecast, fxobs.observation)]
+        data = session.get_values_bulk(objects, report.start, report.end,
+                                       max_workers=max_workers)
+        for val in data.values():
+            if isinstance(val, Exception):
+                raise val
+        return data
+
     data = {}
     for fxobs in report.forecast_observations:
         # forecasts and especially observations may be repeated.
@@ -235,7 +249,7 @@ def create_raw_report_from_data(report, data):
     return raw_report
 
 
-def compute_report(access_token, report_id, base_url=None):
+def compute_report(access_token, report_id, base_url=None, max_workers=None):
     """
     Create a raw report using data from API.
 
@@ -248,6 +262,9 @@ def compute_report(access_token, report_id, base_url=None):
     report_id : str
         ID of the report to fetch from the API and generate the raw
         report for
+    max_workers : int or None
+        Number of concurrent requests to make when getting data, see
+        :py:func:`get_data_for_report`.
 
     Returns
     -------
@@ -256,7 +273,7 @@ def compute_report(access_token, report_id, base_url=None):
     session = APISession(access_token, base_url=base_url)
     try:
         report = session.get_report(report_id)
-        data = get_data_for_report(session, report)
+        data = get_data_for_report(session, report, max_workers=max_workers)
         raw_report = create_raw_report_from_data(report, data)
         session.post_raw_report(report.report_id, raw_report)
     except Exception:
@@ -56,6 +56,27 @@ def test_get_data(mock_data, report_objects):
     assert get_observation_values.call_count == 1
 
 
+def test_get_data_bulk(mock_data, report_objects):
+    report, observation, forecast_0, forecast_1 = report_objects
+    session = api.APISession('nope')
+    data = main.get_data_for_report(session, report, max_workers=2)
+    assert isinstance(data[observation], pd.DataFrame)
+    assert isinstance(data[forecast_0], pd.Series)
+    assert isinstance(data[forecast_1], pd.Series)
+    get_forecast_values, get_observation_values = mock_data
+    assert get_forecast_values.call_count == 2
+    assert get_observation_values.call_count == 1
+
+
+def test_get_data_bulk_error(mock_data, report_objects):
+    report, observation, forecast_0, forecast_1 = report_objects
+    get_forecast_values, get_observation_values = mock_data
+    get_observation_values.side_effect = KeyError('nope')
+    session = api.APISession('nope')
+    with pytest.raises(KeyError):
+        main.get_data_for_report(session, report, max_workers=2)
+
+
 @pytest.mark.skipif(shutil.which('pandoc') is None,
                     reason='Pandoc can not be found')
 def test_full_render(mock_data, report_objects):
@@ -138,6 +138,32 @@ def test_dailyvalidation_cmd_all(cli_token, mocker):
                                    'https://api.solarforecastarbiter.org')
 
 
+def test_dailyvalidation_cmd_workers(cli_token, mocker):
+    mocked = mocker.patch(
+        'solarforecastarbiter.validation.tasks.daily_observation_validation')
+    mocker.patch.object(cli, 'midnight',
+                        new=pd.Timestamp('2019-01-02T00:00:00Z'))
+    runner = CliRunner()
+    runner.invoke(cli.dailyvalidation, ['-u user', '-p pass', '--workers',
+                                        '3'])
+    assert mocked.called
+    assert mocked.call_args[1] == {'max_workers': 3, 'processes': 3,
+                                   'incremental': False}
+
+
+def test_dailyvalidation_cmd_incremental(cli_token, mocker):
+    mocked = mocker.patch(
+        'solarforecastarbiter.validation.tasks.daily_single_observation_validation')  # NOQA
+    mocker.patch.object(cli, 'midnight',
+                        new=pd.Timestamp('2019-01-02T00:00:00Z'))
+    runner = CliRunner()
+    runner.invoke(cli.dailyvalidation, ['-u user', '-p pass',
+                                        '--incremental', 'OBS_ID'])
+    assert mocked.called
+    assert mocked.call_args[0][1] == 'OBS_ID'
+    assert mocked.call_args[1] == {'incremental': True}
+
+
 def test_dailyvalidation_cmd_single(cli_token, mocker):
     mocked = mocker.patch(
         'solarforecastarbiter.validation.tasks.daily_single_observation_validation')  # NOQA
@@ -186,6 +212,20 @@ def test_fetchnwp(mocker):
     assert mocked.called
 
 
+def test_fetchnwp_sidecar_points(mocker, tmp_path):
+    mocker.patch('solarforecastarbiter.cli.start_cluster')
+    mocker.patch('solarforecastarbiter.io.fetch.nwp.check_wgrib2')
+    mocked = mocker.patch('solarforecastarbiter.io.fetch.nwp.run',
+                          return_value=asyncio.sleep(0))
+    points = tmp_path / 'points.csv'
+    points.write_text('name,latitude,longitude\na,32.2,-110.9\nb,35,-105\n')
+    runner = CliRunner()
+    res = runner.invoke(cli.fetchnwp, ['--sidecar-points', str(points),
+                                       str(tmp_path), 'rap'])
+    assert res.exit_code == 0
+    assert mocked.call_args[0][-1] == [(32.2, -110.9), (35, -105)]
+
+
 def test_fetchnwp_netcdfonly(mocker):
     mocker.patch('solarforecastarbiter.cli.start_cluster')
     mocker.patch('solarforecastarbiter.io.fetch.nwp.check_wgrib2')
@@ -210,6 +250,7 @@ def test_fetchnwp_netcdfonly_nogrib(mocker):
 def test_reference_nwp(cli_token, mocker):
     mocked = mocker.patch(
         'solarforecastarbiter.cli.reference_forecasts.make_latest_nwp_forecasts')  # NOQA
+    mocker.patch.object(cli.nwp, 'CACHE_GRID_INDEX', False)
     runner = CliRunner()
     with tempfile.TemporaryDirectory() as tmpdir:
         res = runner.invoke(cli.referencenwp,
@@ -217,9 +258,50 @@ def test_reference_nwp(cli_token, mocker):
                              '--issue-time-buffer=2h',
                              tmpdir])
         assert cli.nwp.BASE_PATH == tmpdir
+        assert cli.nwp.CACHE_GRID_INDEX
+    assert res.exit_code == 0
+    mocked.assert_called_with('TOKEN', pd.Timestamp('20190501T1200Z'),
+                              pd.Timedelta('2h'), mocker.ANY, workers=1)
+
+
+def test_reference_nwp_workers(cli_token, mocker):
+    mocked = mocker.patch(
+        'solarforecastarbiter.cli.reference_forecasts.make_latest_nwp_forecasts')  # NOQA
+    mocker.patch.object(cli.nwp, 'CACHE_GRID_INDEX', False)
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        res = runner.invoke(cli.referencenwp,
+                            ['-u user', '-p pass', '--run-time=20190501T1200Z',
+                             '--workers=4', tmpdir])
+    assert res.exit_code == 0
+    assert mocked.call_args[1]['workers'] == 4
+
+
+def test_reference_nwp_gefs_member_workers(cli_token, mocker):
+    mocker.patch(
+        'solarforecastarbiter.cli.reference_forecasts.make_latest_nwp_forecasts')  # NOQA
+    mocked = mocker.patch(
+        'solarforecastarbiter.cli.reference_forecasts.models.set_gefs_member_workers')  # NOQA
+    mocker.patch.object(cli.nwp, 'CACHE_GRID_INDEX', False)
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        res = runner.invoke(cli.referencenwp,
+                            ['-u user', '-p pass', '--run-time=20190501T1200Z',
+                             '--gefs-member-workers=6', tmpdir])
+    assert res.exit_code == 0
+    mocked.assert_called_once_with(6)
+
+
+def test_reference_persistence(cli_token, mocker):
+    mocked = mocker.patch(
+        'solarforecastarbiter.cli.reference_forecasts.make_latest_persistence_forecasts')  # NOQA
+    runner = CliRunner()
+    res = runner.invoke(cli.referencepersistence,
+                        ['-u user', '-p pass', '--run-time=20190501T1200Z',
+                         '--issue-time-buffer=2h', '--workers=8'])
     assert res.exit_code == 0
     mocked.assert_called_with('TOKEN', pd.Timestamp('20190501T1200Z'),
-                              pd.Timedelta('2h'), mocker.ANY)
+                              pd.Timedelta('2h'), mocker.ANY, workers=8)
 
 
 def test_report(cli_token, mocker):
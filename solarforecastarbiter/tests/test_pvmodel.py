@@ -1,11 +1,14 @@
 import datetime
 from functools import partial
 
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal, assert_series_equal
 import pytest
 
+import pvlib
 from pvlib.location import Location
+import tables
 
 from solarforecastarbiter import pvmodel
 
@@ -40,6 +43,199 @@ def test_calculate_solar_position(expected_solpos, golden_mst):
                        check_less_precise=3)
 
 
+@pytest.fixture
+def solpos_cache(mocker):
+    cache = pvmodel.SolarPositionCache(maxsize=4)
+    mocker.patch.object(pvmodel, 'SOLAR_POSITION_CACHE', cache)
+    return cache
+
+
+@pytest.mark.parametrize('times', [
+    pd.date_range('20190515T0000', '20190517T0000', freq='5min',
+                  tz='MST', closed='left'),
+    pd.date_range('20190515T1203Z', '20190515T1800Z', freq='1h'),
+    pd.date_range('20190515T0001', periods=30, freq='1min'),
+    pd.date_range('20190515T0001-0700', periods=30, freq='1min'),
+    pd.DatetimeIndex(['20190515T0100Z', '20190515T0115Z',
+                      '20190517T2345Z']),
+])
+def test_calculate_solar_position_cached(golden_mst, solpos_cache, times):
+    args = (golden_mst.latitude, golden_mst.longitude, golden_mst.altitude)
+    out = pvmodel.calculate_solar_position(*args, times)
+    assert len(solpos_cache) > 0
+    expected = pvmodel._spa(*args, times)
+    assert_frame_equal(out, expected[out.columns])
+    cs = pvmodel.calculate_clearsky_at_times(*args, times)
+    expected_cs = pvmodel.calculate_clearsky(*args,
+                                             expected['apparent_zenith'])
+    assert_frame_equal(cs, expected_cs)
+
+
+def test_calculate_solar_position_batch():
+    times = pd.date_range('20190101', '20190103', freq='5min', tz='MST')
+    latitudes = [32.2, 39.742476, -45., 70.]
+    longitudes = [-110.9, -105.1786, 170., 20.]
+    elevations = [700., 1830.14, 0., 100.]
+    out = pvmodel.calculate_solar_position_batch(latitudes, longitudes,
+                                                 elevations, times)
+    assert out['azimuth'].shape == (len(times), 4)
+    for i, site in enumerate(zip(latitudes, longitudes, elevations)):
+        expected = pvmodel._spa(*site, times)
+        assert_frame_equal(out.xs(i, axis=1, level=1),
+                           expected[list(pvmodel.SOLAR_POSITION_COLUMNS)],
+                           check_names=False)
+
+
+def test_solar_position_cache_preload(golden_mst, solpos_cache, mocker):
+    sites = [(32.2, -110.9, 700.), (golden_mst.latitude,
+                                    golden_mst.longitude,
+                                    golden_mst.altitude)]
+    times = pd.date_range('20190515T0000Z', '20190515T2300Z', freq='1h')
+    spa = mocker.spy(pvmodel, '_spa')
+    batch = mocker.spy(pvmodel, 'calculate_solar_position_batch')
+    pvmodel.preload_solar_position(*zip(*sites), times)
+    assert batch.call_count == 1
+    assert len(solpos_cache) == 2
+    for site in sites:
+        out = pvmodel.calculate_solar_position(*site, times[3:10])
+        assert_frame_equal(out, pvmodel._spa(*site, times[3:10]))
+    # only the direct comparisons above
+    assert spa.call_count == 2
+    # cached sites are not calculated again
+    pvmodel.preload_solar_position(*zip(*sites), times)
+    assert batch.call_count == 1
+
+
+def test_solar_position_cache_preload_maxsize(solpos_cache, caplog):
+    times = pd.date_range('20190515T0000Z', '20190516T2300Z', freq='1h')
+    solpos_cache.preload([30, 31, 32], [-110, -110, -110], [0, 0, 0], times)
+    assert len(solpos_cache) == 4
+    assert 'can only hold 2 of 3 sites' in caplog.text
+    solpos_cache.preload([30], [-110], [0], times[:1])
+    assert len(solpos_cache) == 4
+
+
+def test_solar_position_cache_preload_duplicate_sites(solpos_cache, mocker,
+                                                      caplog):
+    times = pd.date_range('20190515T0000Z', '20190516T2300Z', freq='1h')
+    batch = mocker.spy(pvmodel, 'calculate_solar_position_batch')
+    solpos_cache.preload([30, 30, 31], [-110, -110, -110], [0, 0, 0], times)
+    assert len(solpos_cache) == 4
+    assert batch.call_args[0][0] == [30, 31]
+    assert 'can only hold' not in caplog.text
+
+
+def test_preload_solar_position_no_cache(mocker):
+    mocker.patch.object(pvmodel, 'SOLAR_POSITION_CACHE', None)
+    batch = mocker.spy(pvmodel, 'calculate_solar_position_batch')
+    times = pd.date_range('20190515T0000Z', '20190515T2300Z', freq='1h')
+    pvmodel.preload_solar_position([30], [-110], [0], times)
+    batch.assert_not_called()
+
+
+@pytest.mark.parametrize('times', [
+    pd.DatetimeIndex(['20190515T0100Z']),
+    pd.date_range('20190515T0000Z', periods=5, freq='30s'),
+    pd.date_range('20190515T0000Z', periods=5, freq='7min'),
+    pd.DatetimeIndex(['20190515T0100Z', '20190515T0000Z']),
+])
+def test_solar_position_cache_not_cacheable(golden_mst, solpos_cache,
+                                            times):
+    args = (golden_mst.latitude, golden_mst.longitude, golden_mst.altitude)
+    assert solpos_cache.get(*args, times) is None
+    out = pvmodel.calculate_solar_position(*args, times)
+    assert len(out.index) == len(times)
+    assert len(solpos_cache) == 0
+
+
+def test_solar_position_cache_reuse(golden_mst, solpos_cache, mocker):
+    args = (golden_mst.latitude, golden_mst.longitude, golden_mst.altitude)
+    spa = mocker.spy(pvmodel, '_spa')
+    cs = mocker.spy(pvmodel, 'calculate_clearsky')
+    times = pd.date_range('20190515T0000Z', '20190516T2300Z', freq='1h')
+    first = pvmodel.calculate_clearsky_at_times(*args, times)
+    assert spa.call_count == 1
+    assert cs.call_count == 1
+    assert len(solpos_cache) == 2
+    # slice of the same daily grids
+    second = pvmodel.calculate_clearsky_at_times(*args, times[5:30])
+    pvmodel.calculate_solar_position(*args, times[10:12])
+    assert spa.call_count == 1
+    assert cs.call_count == 1
+    assert_frame_equal(second, first.iloc[5:30])
+    # other site
+    pvmodel.calculate_solar_position(32.2, -110.9, 700, times[:3])
+    assert spa.call_count == 2
+
+
+def test_solar_position_cache_maxsize(golden_mst, solpos_cache):
+    args = (golden_mst.latitude, golden_mst.longitude, golden_mst.altitude)
+    times = pd.date_range('20190501T0000Z', '20190510T2300Z', freq='1h')
+    out = pvmodel.calculate_solar_position(*args, times)
+    assert len(out.index) == len(times)
+    assert len(solpos_cache) == 4
+    solpos_cache.clear()
+    assert len(solpos_cache) == 0
+
+
+def test_solar_position_cache_dir(golden_mst, tmp_path, mocker):
+    args = (golden_mst.latitude, golden_mst.longitude, golden_mst.altitude)
+    times = pd.date_range('20190515T0000Z', '20190515T2300Z', freq='1h')
+    cache = pvmodel.SolarPositionCache(maxsize=0, cache_dir=str(tmp_path))
+    first = cache.get(*args, times, clearsky=True)
+    assert len(cache) == 0
+    assert len(list(tmp_path.glob('solar_position_*.npz'))) == 1
+    spa = mocker.spy(pvmodel, '_spa')
+    cs = mocker.spy(pvmodel, 'calculate_clearsky')
+    other = pvmodel.SolarPositionCache(cache_dir=str(tmp_path))
+    assert_frame_equal(other.get(*args, times, clearsky=True), first)
+    spa.assert_not_called()
+    cs.assert_not_called()
+
+
+def test_solar_position_cache_dir_unwritable(golden_mst, tmp_path, caplog):
+    args = (golden_mst.latitude, golden_mst.longitude, golden_mst.altitude)
+    times = pd.date_range('20190515T0000Z', '20190515T2300Z', freq='1h')
+    cache_dir = tmp_path / 'file'
+    cache_dir.write_text('not a directory')
+    cache = pvmodel.SolarPositionCache(cache_dir=str(cache_dir))
+    out = cache.get(*args, times)
+    assert len(out.index) == len(times)
+    assert 'Unable to save solar position' in caplog.text
+
+
+def test_solar_position_not_cached_by_default(golden_mst, mocker):
+    assert pvmodel.SOLAR_POSITION_CACHE is None
+    times = pd.date_range('20190515T0000Z', periods=2, freq='1h')
+    spa = mocker.spy(pvmodel, '_spa')
+    pvmodel.calculate_solar_position(
+        golden_mst.latitude, golden_mst.longitude, golden_mst.altitude,
+        times)
+    # only the requested times, not a daily grid
+    assert len(spa.call_args[0][3]) == 2
+
+
+def test_enable_solar_position_cache(solpos_cache):
+    pvmodel.enable_solar_position_cache()
+    assert pvmodel.SOLAR_POSITION_CACHE is solpos_cache
+    pvmodel.set_solar_position_cache(None)
+    pvmodel.enable_solar_position_cache()
+    assert isinstance(pvmodel.SOLAR_POSITION_CACHE,
+                      pvmodel.SolarPositionCache)
+
+
+def test_set_solar_position_cache(mocker, tmp_path):
+    mocker.patch.object(pvmodel, 'SOLAR_POSITION_CACHE')
+    pvmodel.set_solar_position_cache(10, str(tmp_path))
+    assert pvmodel.SOLAR_POSITION_CACHE.maxsize == 10
+    assert pvmodel.SOLAR_POSITION_CACHE.cache_dir == str(tmp_path)
+    pvmodel.set_solar_position_cache(None)
+    assert pvmodel.SOLAR_POSITION_CACHE is None
+    times = pd.date_range('20190515T0000Z', '20190515T0100Z', freq='1h')
+    out = pvmodel.calculate_clearsky_at_times(32.2, -110.9, 700, times)
+    assert list(out.columns) == ['ghi', 'dni', 'dhi']
+
+
 # modified from pvlib
 def test_complete_irradiance_components():
     index = pd.DatetimeIndex(
@@ -118,6 +314,50 @@ def test_clearsky(golden_mst, apparent_zenith):
     assert_frame_equal(expected, out)
 
 
+@pytest.mark.parametrize('latitude,longitude', [
+    (39.742476, -105.1786), (0, 0), (90, 180), (-90, -180),
+    (89.99, 179.99), (-45.3, 170.1)
+])
+def test_linke_turbidity_table(latitude, longitude):
+    times = pd.date_range('20151225', '20170105', freq='7h', tz='MST')
+    table = pvmodel.LinkeTurbidityTable()
+    out = table.lookup(times, latitude, longitude)
+    expected = pvlib.clearsky.lookup_linke_turbidity(times, latitude,
+                                                     longitude)
+    assert_series_equal(out, expected)
+
+
+@pytest.mark.parametrize('latitude,longitude', [
+    (90.1, 0), (-91, 0), (0, 180.1), (0, -181)
+])
+def test_linke_turbidity_table_out_of_range(latitude, longitude):
+    times = pd.date_range('20190101', periods=2, freq='1h', tz='UTC')
+    with pytest.raises(IndexError):
+        pvmodel.LinkeTurbidityTable().lookup(times, latitude, longitude)
+
+
+def test_linke_turbidity_table_load(mocker):
+    open_file = mocker.spy(tables, 'open_file')
+    table = pvmodel.LinkeTurbidityTable()
+    table.load([32.2, 39.7, 39.7, 91], [-110.9, -105.2, -105.2, 0])
+    assert open_file.call_count == 1
+    assert len(table) == 2
+    table.load([32.2], [-110.9])
+    times = pd.date_range('20190101', periods=2, freq='1h', tz='UTC')
+    table.lookup(times, 39.7, -105.2)
+    assert open_file.call_count == 1
+    table.lookup(times, 0, 0)
+    assert open_file.call_count == 2
+    assert len(table) == 3
+
+
+def test_load_linke_turbidity(mocker):
+    mocker.patch.object(pvmodel, 'LINKE_TURBIDITY',
+                        pvmodel.LinkeTurbidityTable())
+    pvmodel.load_linke_turbidity([32.2], [-110.9])
+    assert len(pvmodel.LINKE_TURBIDITY) == 1
+
+
 def fixed_or_tracking(system_type, expected_fixed, expected_tracking, out):
     if system_type == 'fixed':
         assert_series_equal(expected_fixed, out)
@@ -213,3 +453,51 @@ def test_irradiance_to_power(modeling_parameters_system_type, apparent_zenith,
     expected_fixed = pd.Series([0., 0.003], index=index)
     expected_tracking = pd.Series([0., 0.00293178], index=index)
     fixed_or_tracking(system_type, expected_fixed, expected_tracking, out)
+
+
+@pytest.fixture
+def ensemble(golden_mst):
+    times = pd.date_range('20190601T0000', freq='1h', periods=48,
+                          tz=golden_mst.tz)
+    solar_position = golden_mst.get_solarposition(times)
+    clearsky = golden_mst.get_clearsky(times)
+    rng = np.random.RandomState(0)
+    members = [f'p{i:02d}' for i in range(10)]
+    scale = pd.DataFrame(rng.uniform(0.2, 1, (len(times), len(members))),
+                         index=times, columns=members)
+    ghi, dni, dhi = [scale.mul(clearsky[k], axis=0)
+                     for k in ('ghi', 'dni', 'dhi')]
+    temp_air = scale * 30
+    wind_speed = scale * 5
+    return solar_position, ghi, dni, dhi, temp_air, wind_speed
+
+
+def test_calculate_poa_effective_ensemble(aoi_func_system_type, ensemble):
+    aoi_func, system_type = aoi_func_system_type
+    solar_position, ghi, dni, dhi, _, _ = ensemble
+    out = pvmodel.calculate_poa_effective_ensemble(
+        aoi_func, solar_position['apparent_zenith'],
+        solar_position['azimuth'], ghi, dni, dhi)
+    for col in ghi.columns:
+        expected = pvmodel.calculate_poa_effective(
+            aoi_func, solar_position['apparent_zenith'],
+            solar_position['azimuth'], ghi[col], dni[col], dhi[col])
+        assert_series_equal(out[col], expected, check_names=False)
+
+
+def test_irradiance_to_power_ensemble(modeling_parameters_system_type,
+                                      ensemble):
+    modeling_parameters, system_type = modeling_parameters_system_type
+    solar_position, ghi, dni, dhi, temp_air, wind_speed = ensemble
+    out = pvmodel.irradiance_to_power_ensemble(
+        modeling_parameters, solar_position['apparent_zenith'],
+        solar_position['azimuth'], ghi, dni, dhi, temp_air=temp_air,
+        wind_speed=wind_speed)
+    assert list(out.columns) == list(ghi.columns)
+    assert (out.max() > 0).all()
+    for col in ghi.columns:
+        expected = pvmodel.irradiance_to_power(
+            modeling_parameters, solar_position['apparent_zenith'],
+            solar_position['azimuth'], ghi[col], dni[col], dhi[col],
+            temp_air=temp_air[col], wind_speed=wind_speed[col])
+        assert_series_equal(out[col], expected, check_names=False)
@@ -130,6 +130,24 @@ def _flag_description_checks(flag_description):
                     'Elements of flag_description must have type str')
 
 
+def _description_mask(version, flag_description):
+    """Combined bit mask of flag_description for the flag version and
+    whether any of the descriptions is OK"""
+    mask_dict = BITMASK_DESCRIPTION_DICT[version]
+    if isinstance(flag_description, str):
+        mask = mask_dict[flag_description]
+        ok_mask = mask == 0
+    else:
+        mask = 0
+        ok_mask = False
+        for k in flag_description:
+            m = mask_dict[k]
+            if m == 0:
+                ok_mask = True
+            mask |= m
+    return mask, ok_mask
+
+
 def check_if_single_value_flagged(flag, flag_description,
                                   _perform_checks=True):
     """Check if the single integer flag has been flagged for flag_description
@@ -160,19 +178,7 @@ def check_if_single_value_flagged(flag, flag_description,
         if not has_data_been_validated(flag):
             raise ValueError('Data has not been validated')
         _flag_description_checks(flag_description)
-    mask_dict = BITMASK_DESCRIPTION_DICT[get_version(flag)]
-    if isinstance(flag_description, str):
-        mask = mask_dict[flag_description]
-        ok_mask = mask == 0
-    else:
-        mask = 0
-        ok_mask = False
-        for k in flag_description:
-            m = mask_dict[k]
-            if m == 0:
-                ok_mask = True
-            mask |= m
-
+    mask, ok_mask = _description_mask(get_version(flag), flag_description)
     out = bool(flag & mask)
     if ok_mask:
         out |= which_data_is_ok(flag)
@@ -303,6 +309,17 @@ def check_if_series_flagged(flag_series, flag_description):
     if not has_data_been_validated(flag_series).all():
         raise ValueError('Not all data has not been validated')
     _flag_description_checks(flag_description)
-    return flag_series.apply(check_if_single_value_flagged,
-                             flag_description=flag_description,
-                             _perform_checks=False)
+    flags = np.asarray(flag_series)
+    versions = get_version(flags)
+    # the combined mask of the descriptions for the version of each flag
+    masks = np.zeros_like(flags)
+    ok = np.zeros(len(flags), dtype=bool)
+    for version in pd.unique(versions):
+        mask, ok_mask = _description_mask(version, flag_description)
+        in_version = versions == version
+        masks[in_version] = mask
+        if ok_mask:
+            ok |= in_version
+    out = np.bitwise_and(flags, masks).astype(bool)
+    out |= ok & which_data_is_ok(flags)
+    return pd.Series(out, index=flag_series.index, name=flag_series.name)
@@ -1,15 +1,29 @@
+from collections import defaultdict, namedtuple
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait)
 import logging
+import multiprocessing
+import threading
+import time
 
 
+import numpy as np
+import pandas as pd
 from pvlib.irradiance import get_extra_radiation
 
 
 from solarforecastarbiter import pvmodel
 from solarforecastarbiter.io.api import APISession
 from solarforecastarbiter.validation import validator
+from solarforecastarbiter.validation.quality_mapping import (
+    DESCRIPTION_MASK_MAPPING, LATEST_VERSION, LATEST_VERSION_FLAG,
+    has_data_been_validated, get_version)
 
 
 logger = logging.getLogger(__name__)
+ValidationSummary = namedtuple(
+    'ValidationSummary',
+    ['validated', 'unchanged', 'skipped', 'failed', 'seconds'])
 
 
 def _validate_timestamp(observation, values):
@@ -51,9 +65,9 @@ def validate_ghi(observation, values):
     """
     solar_position, dni_extra, timestamp_flag, night_flag = _solpos_dni_extra(
         observation, values)
-    clearsky = pvmodel.calculate_clearsky(
+    clearsky = pvmodel.calculate_clearsky_at_times(
         observation.site.latitude, observation.site.longitude,
-        observation.site.elevation, solar_position['apparent_zenith'])
+        observation.site.elevation, values.index)
 
     ghi_limit_flag = validator.check_ghi_limits_QCRad(
         values, solar_position['zenith'], dni_extra,
@@ -143,9 +157,9 @@ def validate_poa_global(observation, values):
     """
     solar_position, dni_extra, timestamp_flag, night_flag = _solpos_dni_extra(
         observation, values)
-    clearsky = pvmodel.calculate_clearsky(
+    clearsky = pvmodel.calculate_clearsky_at_times(
         observation.site.latitude, observation.site.longitude,
-        observation.site.elevation, solar_position['apparent_zenith'])
+        observation.site.elevation, values.index)
     aoi_func = pvmodel.aoi_func_factory(observation.site.modeling_parameters)
     poa_clearsky = pvmodel.calculate_poa_effective(
         aoi_func=aoi_func, apparent_zenith=solar_position['apparent_zenith'],
@@ -336,6 +350,233 @@ def validate_daily_ac_power(observation, values):
     return (timestamp_flag, stale_flag, interpolation_flag, clipping_flag)
 
 
+class _CheckInputs:
+    """Observation values and the inputs shared by validation checks.
+    Solar position, extraterrestrial irradiance and clear sky are
+    calculated once, when the first check needs them."""
+    def __init__(self, observation, values):
+        self.observation = observation
+        self.series = values
+        self._solar_position = None
+        self._dni_extra = None
+        self._clearsky = None
+        self._poa_clearsky = None
+
+    @property
+    def solar_position(self):
+        if self._solar_position is None:
+            site = self.observation.site
+            self._solar_position = pvmodel.calculate_solar_position(
+                site.latitude, site.longitude, site.elevation,
+                self.series.index)
+        return self._solar_position
+
+    @property
+    def dni_extra(self):
+        if self._dni_extra is None:
+            self._dni_extra = get_extra_radiation(self.series.index)
+        return self._dni_extra
+
+    @property
+    def clearsky(self):
+        if self._clearsky is None:
+            site = self.observation.site
+            self._clearsky = pvmodel.calculate_clearsky_at_times(
+                site.latitude, site.longitude, site.elevation,
+                self.series.index)
+        return self._clearsky
+
+    @property
+    def poa_clearsky(self):
+        if self._poa_clearsky is None:
+            solar_position = self.solar_position
+            clearsky = self.clearsky
+            aoi_func = pvmodel.aoi_func_factory(
+                self.observation.site.modeling_parameters)
+            self._poa_clearsky = pvmodel.calculate_poa_effective(
+                aoi_func=aoi_func,
+                apparent_zenith=solar_position['apparent_zenith'],
+                azimuth=solar_position['azimuth'], ghi=clearsky['ghi'],
+                dni=clearsky['dni'], dhi=clearsky['dhi'])
+        return self._poa_clearsky
+
+
+def _check_timestamp_spacing(inputs):
+    # same as validator.check_timestamp_spacing without a Series of
+    # time differences
+    times = inputs.series.index
+    flags = np.ones(len(times), dtype=bool)
+    flags[1:] = (np.diff(times.asi8) ==
+                 pd.Timedelta(inputs.observation.interval_length).value)
+    return flags
+
+
+def _check_day_night(inputs):
+    return validator.check_irradiance_day_night(
+        inputs.solar_position['zenith'].values)
+
+
+def _check_ghi_limits(inputs):
+    return validator.check_ghi_limits_QCRad(
+        inputs.series, inputs.solar_position['zenith'], inputs.dni_extra)
+
+
+def _check_dni_limits(inputs):
+    return validator.check_dni_limits_QCRad(
+        inputs.series, inputs.solar_position['zenith'], inputs.dni_extra)
+
+
+def _check_dhi_limits(inputs):
+    return validator.check_dhi_limits_QCRad(
+        inputs.series, inputs.solar_position['zenith'], inputs.dni_extra)
+
+
+def _check_ghi_clearsky(inputs):
+    return validator.check_ghi_clearsky(inputs.series.values,
+                                        inputs.clearsky['ghi'].values)
+
+
+def _check_poa_clearsky(inputs):
+    return validator.check_poa_clearsky(inputs.series.values,
+                                        np.asarray(inputs.poa_clearsky))
+
+
+def _check_temperature_limits(inputs):
+    return validator.check_temperature_limits(inputs.series)
+
+
+def _check_wind_limits(inputs):
+    return validator.check_wind_limits(inputs.series)
+
+
+def _check_rh_limits(inputs):
+    return validator.check_rh_limits(inputs.series.values)
+
+
+def _detect_stale_values(inputs):
+    return validator.detect_stale_values(inputs.series)
+
+
+def _detect_interpolation(inputs):
+    return validator.detect_interpolation(inputs.series)
+
+
+def _detect_clipping(inputs):
+    return validator.detect_clipping(inputs.series)
+
+
+# name: (flag description, invert, check). As for validator.mask_flags,
+# invert is True when the check returns True for values that pass.
+VALIDATION_CHECKS = {
+    'timestamp_spacing': ('UNEVEN FREQUENCY', True, _check_timestamp_spacing),
+    'day_night': ('NIGHTTIME', True, _check_day_night),
+    'ghi_limits': ('LIMITS EXCEEDED', True, _check_ghi_limits),
+    'dni_limits': ('LIMITS EXCEEDED', True, _check_dni_limits),
+    'dhi_limits': ('LIMITS EXCEEDED', True, _check_dhi_limits),
+    'ghi_clearsky': ('CLEARSKY EXCEEDED', True, _check_ghi_clearsky),
+    'poa_clearsky': ('CLEARSKY EXCEEDED', True, _check_poa_clearsky),
+    'temperature_limits': ('LIMITS EXCEEDED', True,
+                           _check_temperature_limits),
+    'wind_limits': ('LIMITS EXCEEDED', True, _check_wind_limits),
+    'rh_limits': ('LIMITS EXCEEDED', True, _check_rh_limits),
+    'stale_values': ('STALE VALUES', False, _detect_stale_values),
+    'interpolation': ('INTERPOLATED VALUES', False, _detect_interpolation),
+    'clipping': ('CLIPPED VALUES', False, _detect_clipping),
+}
+
+
+def run_validation_checks(observation, values, checks):
+    """
+    Run validation checks on observation values in a single pass.
+
+    The inputs the checks share, e.g. solar position, are calculated
+    once and the result of each check is OR'ed in place into one
+    preallocated flag array instead of into a bitmask series per check.
+
+    Parameters
+    ----------
+    observation : solarforecastarbiter.datamodel.Observation
+       Observation object that the data is associated with
+    values : pandas.Series
+       Series of observation values
+    checks : iterable of str
+       Names of the checks to run, keys of `VALIDATION_CHECKS`
+
+    Returns
+    -------
+    pandas.Series
+        Integer bitmask series of the flags of all checks, equal to the
+        bitwise OR of the series of flags from the individual checks
+    """
+    inputs = _CheckInputs(observation, values)
+    flags = np.full(len(values), LATEST_VERSION_FLAG, dtype=np.uint16)
+    for name in checks:
+        description, invert, check = VALIDATION_CHECKS[name]
+        flagged = np.asarray(check(inputs), dtype=bool)
+        if invert:
+            flagged = ~flagged
+        np.bitwise_or(flags, np.uint16(DESCRIPTION_MASK_MAPPING[description]),
+                      out=flags, where=flagged)
+    return pd.Series(flags, index=values.index, name='quality_flag')
+
+
+# the checks run by run_validation_checks in place of each validation
+# function, giving the same flags. entries must list the checks of the
+# function in order; the tests compare both for every entry
+FUSED_VALIDATION_CHECKS = {
+    validate_ghi: ('timestamp_spacing', 'day_night', 'ghi_limits',
+                   'ghi_clearsky'),
+    validate_dni: ('timestamp_spacing', 'day_night', 'dni_limits'),
+    validate_dhi: ('timestamp_spacing', 'day_night', 'dhi_limits'),
+    validate_poa_global: ('timestamp_spacing', 'day_night', 'poa_clearsky'),
+    validate_air_temperature: ('timestamp_spacing', 'temperature_limits'),
+    validate_wind_speed: ('timestamp_spacing', 'wind_limits'),
+    validate_relative_humidity: ('timestamp_spacing', 'rh_limits'),
+    validate_timestamp: ('timestamp_spacing',),
+    validate_daily_ghi: ('timestamp_spacing', 'day_night', 'ghi_limits',
+                         'ghi_clearsky', 'stale_values', 'interpolation'),
+    validate_daily_dc_power: ('timestamp_spacing', 'stale_values',
+                              'interpolation'),
+    validate_daily_ac_power: ('timestamp_spacing', 'stale_values',
+                              'interpolation', 'clipping'),
+}
+
+
+# number of values before a value that a windowed check needs to flag
+# it, or None if the check uses all values. checks that are not listed
+# only use the value itself
+VALIDATION_CHECK_CONTEXT = {
+    'timestamp_spacing': 1,
+    'stale_values': 2,
+    'interpolation': 2,
+    'clipping': None,
+}
+
+
+def _validation_context(validation_func):
+    """Number of values before the new values that the checks of
+    validation_func need, or None if all values are needed"""
+    checks = FUSED_VALIDATION_CHECKS.get(validation_func)
+    if checks is None:
+        return None
+    context = 0
+    for name in checks:
+        check_context = VALIDATION_CHECK_CONTEXT.get(name, 0)
+        if check_context is None:
+            return None
+        context = max(context, check_context)
+    return context
+
+
+def _validation_flags(observation, value_series, validation_func):
+    # run the checks of the validation function in one pass when they
+    # are known, otherwise the function itself
+    checks = FUSED_VALIDATION_CHECKS.get(validation_func)
+    if checks is not None:
+        return (run_validation_checks(observation, value_series, checks),)
+    return validation_func(observation, value_series)
+
+
 IMMEDIATE_VALIDATION_FUNCS = {
     'air_temperature': validate_air_temperature,
     'wind_speed': validate_wind_speed,
@@ -347,28 +588,50 @@ IMMEDIATE_VALIDATION_FUNCS = {
 }
 
 
-def immediate_observation_validation(access_token, observation_id, start, end,
-                                     base_url=None):
-    """
-    Task that will run immediately after Observation values are uploaded to the
-    API to validate the data.
-    """
-    session = APISession(access_token, base_url=base_url)
-    observation = session.get_observation(observation_id)
-    observation_values = session.get_observation_values(observation_id, start,
-                                                        end)
+def _immediate_validation_func(observation):
+    return IMMEDIATE_VALIDATION_FUNCS.get(observation.variable,
+                                          validate_timestamp)
+
+
+def _validate_immediate_values(observation, observation_values):
     value_series = observation_values['value']
     quality_flags = observation_values['quality_flag'].copy()
 
-    validation_func = IMMEDIATE_VALIDATION_FUNCS.get(
-        observation.variable, validate_timestamp)
-    validation_flags = validation_func(observation, value_series)
+    validation_func = _immediate_validation_func(observation)
+    validation_flags = _validation_flags(observation, value_series,
+                                         validation_func)
 
     for flag in validation_flags:
         quality_flags |= flag
 
     quality_flags.name = 'quality_flag'
     observation_values.update(quality_flags)
+    return observation_values
+
+
+def immediate_observation_validation(access_token, observation_id, start, end,
+                                     base_url=None, incremental=False):
+    """
+    Task that will run immediately after Observation values are uploaded to the
+    API to validate the data.
+
+    If incremental is True, only the values that have not been validated
+    with the latest version of the checks are validated and posted. See
+    :py:func:`solarforecastarbiter.validation.tasks.validate_new_values`.
+    """
+    session = APISession(access_token, base_url=base_url)
+    observation = session.get_observation(observation_id)
+    if incremental:
+        observation_values = _get_new_values(session, observation, start,
+                                             end, daily=False)
+        if observation_values.empty:
+            logger.info('No new values of %s to validate', observation.name)
+            return
+    else:
+        observation_values = session.get_observation_values(
+            observation_id, start, end)
+        observation_values = _validate_immediate_values(observation,
+                                                        observation_values)
     session.post_observation_values(observation_id, observation_values,
                                     params='donotvalidate')
 
@@ -380,61 +643,443 @@ DAILY_VALIDATION_FUNCS = {
 }
 
 
-def _daily_validation(session, observation, start, end, base_url):
-    logger.info('Validating data for %s from %s to %s',
-                observation.name, start, end)
-    observation_values = session.get_observation_values(
-        observation.observation_id, start, end)
-    value_series = observation_values['value']
-    if len(value_series.dropna()) < 10:
-        raise IndexError(
-            'Data series does not have at least 10 datapoints to validate')
-    quality_flags = observation_values['quality_flag'].copy()
-
+def _daily_validation_func(observation):
     # if the variable has a daily check, run that, else run the
     # immediate validation, else validate timestamps
-    validation_func = DAILY_VALIDATION_FUNCS.get(
+    return DAILY_VALIDATION_FUNCS.get(
         observation.variable, IMMEDIATE_VALIDATION_FUNCS.get(
             observation.variable, validate_timestamp))
-    validation_flags = validation_func(observation, value_series)
+
+
+def _check_daily_values_length(observation_values):
+    if len(observation_values['value'].dropna()) < 10:
+        raise IndexError(
+            'Data series does not have at least 10 datapoints to validate')
+
+
+def _validate_daily_values(observation, observation_values,
+                           check_length=True):
+    value_series = observation_values['value']
+    if check_length:
+        _check_daily_values_length(observation_values)
+    quality_flags = observation_values['quality_flag'].copy()
+
+    validation_func = _daily_validation_func(observation)
+    validation_flags = _validation_flags(observation, value_series,
+                                         validation_func)
 
     for flag in validation_flags:
         quality_flags |= flag
 
     quality_flags.name = 'quality_flag'
     observation_values.update(quality_flags)
+    return observation_values
+
+
+def _needs_validation(quality_flags):
+    # also true for values validated by an older version of the checks
+    return (~has_data_been_validated(quality_flags) |
+            (get_version(quality_flags) != LATEST_VERSION))
+
+
+def _new_values_context(observation, daily):
+    if daily:
+        validation_func = _daily_validation_func(observation)
+    else:
+        validation_func = _immediate_validation_func(observation)
+    return _validation_context(validation_func)
+
+
+def validate_new_values(observation, observation_values, start, daily=False):
+    """
+    Validate only the values at or after start that have not been
+    validated with the latest version of the checks.
+
+    Windowed checks, e.g. stale values, are run on the new values and as
+    many values before them as the checks need, so the new flags are the
+    same as when validating all values. The flags of the new values keep
+    only the user flag before the results of the checks are added.
+
+    Parameters
+    ----------
+    observation : solarforecastarbiter.datamodel.Observation
+       Observation object that the data is associated with
+    observation_values : pandas.DataFrame
+       DataFrame with value and quality_flag columns that starts early
+       enough to include the values needed by windowed checks, see
+       :py:func:`solarforecastarbiter.validation.tasks.new_values_start`
+    start : pandas.Timestamp
+       Values before start are only used by windowed checks
+    daily : bool, default False
+       Run the daily validation checks instead of the immediate checks
+
+    Returns
+    -------
+    pandas.DataFrame
+       The rows of observation_values with new flags, which may be empty
+
+    Raises
+    ------
+    IndexError
+       If daily is True, some values are new, and observation_values
+       does not have at least 10 values
+    """
+    new = (_needs_validation(observation_values['quality_flag']) &
+           (observation_values.index >= start))
+    if not new.any():
+        return observation_values.iloc[:0]
+    if daily:
+        # the section validated below may have fewer values than the
+        # daily checks require of the whole window
+        _check_daily_values_length(observation_values)
+    context = _new_values_context(observation, daily)
+    if context is None:
+        first = 0
+    else:
+        first = max(int(np.argmax(new.values)) - context, 0)
+    section = observation_values.iloc[first:].copy()
+    new = new.iloc[first:]
+    section.loc[new, 'quality_flag'] = (
+        section.loc[new, 'quality_flag'] &
+        DESCRIPTION_MASK_MAPPING['USER FLAGGED'])
+    if daily:
+        section = _validate_daily_values(observation, section,
+                                         check_length=False)
+    else:
+        section = _validate_immediate_values(observation, section)
+    return section[new]
+
+
+def new_values_start(observation, start, daily=False):
+    """
+    Start of the values to retrieve to validate the new values from start
+    with :py:func:`solarforecastarbiter.validation.tasks.validate_new_values`,
+    including the values before start that windowed checks need.
+
+    Parameters
+    ----------
+    observation : solarforecastarbiter.datamodel.Observation
+    start : pandas.Timestamp
+    daily : bool, default False
+       Whether the daily validation checks will be run
+
+    Returns
+    -------
+    pandas.Timestamp
+    """  # NOQA
+    context = _new_values_context(observation, daily)
+    if not context:
+        return start
+    return start - context * observation.interval_length
+
+
+def _get_new_values(session, observation, start, end, daily):
+    observation_values = session.get_observation_values(
+        observation.observation_id,
+        new_values_start(observation, start, daily=daily), end)
+    return validate_new_values(observation, observation_values, start,
+                               daily=daily)
+
+
+SOLAR_POSITION_VARIABLES = ('ghi', 'dni', 'dhi', 'poa_global')
+
+
+def _preload_solar_position(observations, start, end):
+    # one batched solar position calculation for the sites of all
+    # observations with the same interval length
+    sites = defaultdict(list)
+    for observation in observations:
+        if observation.variable in SOLAR_POSITION_VARIABLES:
+            sites[observation.interval_length].append(observation.site)
+    for interval_length, group in sites.items():
+        times = pd.date_range(start, end, freq=interval_length)
+        pvmodel.preload_solar_position(
+            [site.latitude for site in group],
+            [site.longitude for site in group],
+            [site.elevation for site in group], times)
+
+
+def _daily_validation(session, observation, start, end, base_url,
+                      incremental=False):
+    # returns False if there were no new values to post
+    logger.info('Validating data for %s from %s to %s',
+                observation.name, start, end)
+    if incremental:
+        observation_values = _get_new_values(session, observation, start,
+                                             end, daily=True)
+        if observation_values.empty:
+            logger.info('No new values of %s to validate', observation.name)
+            return False
+    else:
+        observation_values = session.get_observation_values(
+            observation.observation_id, start, end)
+        observation_values = _validate_daily_values(observation,
+                                                    observation_values)
     session.post_observation_values(observation.observation_id,
                                     observation_values,
                                     params='donotvalidate')
+    return True
+
+
+def _bulk_daily_validation(session, observations, start, end, max_workers,
+                           incremental=False):
+    begin = time.perf_counter()
+    validated = 0
+    unchanged = []
+    skipped = []
+    failed = {}
+    if incremental:
+        # one start for all observations that includes the values
+        # needed by the windowed checks of each
+        fetch_start = min(
+            (new_values_start(observation, start, daily=True)
+             for observation in observations), default=start)
+    else:
+        fetch_start = start
+    data = session.get_values_bulk(observations, fetch_start, end,
+                                   max_workers=max_workers)
+    to_post = {}
+    for observation, observation_values in data.items():
+        if isinstance(observation_values, Exception):
+            # already logged by get_values_bulk
+            failed[observation.observation_id] = _error_message(
+                observation_values)
+            continue
+        logger.info('Validating data for %s from %s to %s',
+                    observation.name, start, end)
+        try:
+            if incremental:
+                observation_values = validate_new_values(
+                    observation, observation_values, start, daily=True)
+            else:
+                observation_values = _validate_daily_values(
+                    observation, observation_values)
+        except IndexError:
+            logger.warning(('Skipping daily validation of %s '
+                            'not enough values'), observation.name)
+            skipped.append(observation.observation_id)
+            continue
+        if observation_values.empty:
+            logger.info('No new values of %s to validate', observation.name)
+            unchanged.append(observation.observation_id)
+            continue
+        to_post[observation] = observation_values
+    posted = session.post_values_bulk(to_post, params='donotvalidate',
+                                      max_workers=max_workers)
+    for observation, result in posted.items():
+        if isinstance(result, Exception):
+            failed[observation.observation_id] = _error_message(result)
+        else:
+            validated += 1
+    return _validation_summary(begin, validated, unchanged, skipped, failed)
+
+
+def _error_message(exc):
+    return f'{type(exc).__name__}: {exc}'
+
+
+def _validation_summary(begin, validated, unchanged, skipped, failed):
+    seconds = time.perf_counter() - begin
+    logger.info(
+        'Validated %s observations in %.1f s (%.2f per second), '
+        '%s without new values, %s skipped, %s failed', validated, seconds,
+        validated / seconds if seconds > 0 else 0.0, len(unchanged),
+        len(skipped), len(failed))
+    return ValidationSummary(validated, unchanged, skipped, failed, seconds)
+
+
+# set in each worker process of the validation pool
+_WORKER_BARRIER = None
+
+
+def _set_worker_barrier(barrier):
+    global _WORKER_BARRIER
+    _WORKER_BARRIER = barrier
+
+
+def _wait_for_workers(timeout):
+    try:
+        _WORKER_BARRIER.wait(timeout)
+    except threading.BrokenBarrierError:
+        pass
+
+
+def _start_validation_pool(processes, timeout=60):
+    """ProcessPoolExecutor with all of its worker processes started.
+    Each warm up task waits until every worker has one, so workers that
+    are started on demand are all started before the pool is returned
+    and none are forked later from a process with running threads."""
+    barrier = multiprocessing.Barrier(processes)
+    pool = ProcessPoolExecutor(max_workers=processes,
+                               initializer=_set_worker_barrier,
+                               initargs=(barrier,))
+    wait([pool.submit(_wait_for_workers, timeout)
+          for _ in range(processes)])
+    return pool
+
+
+def _concurrent_daily_validation(session, observations, start, end,
+                                 max_workers, processes, incremental=False):
+    """Fetch and post values in a pool of threads while validating
+    them in a pool of processes"""
+    begin = time.perf_counter()
+    validated = 0
+    unchanged = []
+    skipped = []
+    failed = {}
+    # the worker processes are started before any threads that fetch
+    # or post values. with the fork start method, they are forked after
+    # the solar position and turbidity are loaded and start with the
+    # same caches. otherwise, the workers calculate them as needed
+    with _start_validation_pool(processes) as compute_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as io_pool:
+        fetching = {}
+        for observation in observations:
+            if incremental:
+                fetch_start = new_values_start(observation, start,
+                                               daily=True)
+            else:
+                fetch_start = start
+            fetch = io_pool.submit(session.get_observation_values,
+                                   observation.observation_id, fetch_start,
+                                   end)
+            fetching[fetch] = observation
+        validating = {}
+        for fut in as_completed(fetching):
+            observation = fetching[fut]
+            try:
+                observation_values = fut.result()
+            except Exception as e:
+                logger.exception('Failed to get values for %s',
+                                 observation.name)
+                failed[observation.observation_id] = _error_message(e)
+                continue
+            logger.info('Validating data for %s from %s to %s',
+                        observation.name, start, end)
+            if incremental:
+                validate = compute_pool.submit(
+                    validate_new_values, observation, observation_values,
+                    start, daily=True)
+            else:
+                validate = compute_pool.submit(
+                    _validate_daily_values, observation, observation_values)
+            validating[validate] = observation
+        posting = {}
+        for fut in as_completed(validating):
+            observation = validating[fut]
+            try:
+                observation_values = fut.result()
+            except IndexError:
+                logger.warning(('Skipping daily validation of %s '
+                                'not enough values'), observation.name)
+                skipped.append(observation.observation_id)
+                continue
+            except Exception as e:
+                logger.error('Failed to validate values for %s',
+                             observation.name, exc_info=e)
+                failed[observation.observation_id] = _error_message(e)
+                continue
+            if observation_values.empty:
+                logger.info('No new values of %s to validate',
+                            observation.name)
+                unchanged.append(observation.observation_id)
+                continue
+            post = io_pool.submit(
+                session.post_observation_values, observation.observation_id,
+                observation_values, params='donotvalidate')
+            posting[post] = observation
+        for fut in as_completed(posting):
+            observation = posting[fut]
+            try:
+                fut.result()
+            except Exception as e:
+                logger.exception('Failed to post values for %s',
+                                 observation.name)
+                failed[observation.observation_id] = _error_message(e)
+            else:
+                validated += 1
+    return _validation_summary(begin, validated, unchanged, skipped, failed)
 
 
 def daily_single_observation_validation(access_token, observation_id, start,
-                                        end, base_url=None):
+                                        end, base_url=None,
+                                        incremental=False):
     """
     Task that expects a longer, likely daily timeseries of Observation values
     that will be validated.
+
+    If incremental is True, only the values that have not been validated
+    with the latest version of the checks are validated and posted. See
+    :py:func:`solarforecastarbiter.validation.tasks.validate_new_values`.
     """
+    pvmodel.enable_solar_position_cache()
     session = APISession(access_token, base_url=base_url)
     observation = session.get_observation(observation_id)
     try:
-        _daily_validation(session, observation, start, end, base_url)
+        _daily_validation(session, observation, start, end, base_url,
+                          incremental=incremental)
     except IndexError:
         logger.warning(
             'Daily validation for %s failed: not enough values',
             observation.name)
 
 
-def daily_observation_validation(access_token, start, end, base_url=None):
+def daily_observation_validation(access_token, start, end, base_url=None,
+                                 max_workers=None, processes=None,
+                                 incremental=False):
     """
     Run the daily observation validation for all observations that the user
     has access to.
+
+    If max_workers is provided, the observation values are retrieved and
+    posted with up to max_workers concurrent requests. A failure to get or
+    post the values for one observation does not stop the validation of
+    the others.
+
+    If processes is also provided, the values are validated in a pool of
+    up to processes worker processes while other values are retrieved
+    and posted.
+
+    Returns a ValidationSummary. Its fields are the number of
+    observations that were validated and posted, the ids of observations
+    without new values to validate when incremental is True, the ids of
+    observations without enough values to validate, a dict of the error
+    message of each observation that failed, and the total seconds.
+
+    If incremental is True, only the values that have not been validated
+    with the latest version of the checks are validated and posted. See
+    :py:func:`solarforecastarbiter.validation.tasks.validate_new_values`.
     """
+    pvmodel.enable_solar_position_cache()
     session = APISession(access_token, base_url=base_url)
     observations = session.list_observations()
+    # read the clear sky turbidity of all sites at once
+    pvmodel.load_linke_turbidity(
+        [observation.site.latitude for observation in observations],
+        [observation.site.longitude for observation in observations])
+    _preload_solar_position(observations, start, end)
+    if max_workers is not None and processes is not None:
+        return _concurrent_daily_validation(session, observations, start,
+                                            end, max_workers, processes,
+                                            incremental=incremental)
+    if max_workers is not None:
+        return _bulk_daily_validation(session, observations, start, end,
+                                      max_workers, incremental=incremental)
+    begin = time.perf_counter()
+    validated = 0
+    unchanged = []
+    skipped = []
     for observation in observations:
         try:
-            _daily_validation(session, observation, start, end, base_url)
+            posted = _daily_validation(session, observation, start, end,
+                                       base_url, incremental=incremental)
         except IndexError:
             logger.warning(('Skipping daily validation of %s '
                             'not enough values'), observation.name)
+            skipped.append(observation.observation_id)
             continue
+        if posted:
+            validated += 1
+        else:
+            unchanged.append(observation.observation_id)
+    return _validation_summary(begin, validated, unchanged, skipped, {})
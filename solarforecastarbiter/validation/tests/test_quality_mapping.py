@@ -1,6 +1,8 @@
 from itertools import product
+import time
 
 
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_series_equal, assert_frame_equal
 import pytest
@@ -302,3 +304,49 @@ def test_check_if_series_flagged_key_fail():
     with pytest.raises(KeyError):
         quality_mapping.check_if_series_flagged(pd.Series([2, 3, 35]),
                                                 ['NOK'])
+
+
+@pytest.mark.parametrize('desc', [
+    'OK', 'NIGHTTIME', ['OK', 'CLOUDY'], ['LIMITS EXCEEDED', 'STALE VALUES'],
+    ('USER FLAGGED', 'CLIPPED VALUES', 'INTERPOLATED VALUES')])
+def test_check_if_series_flagged_single_values(desc):
+    flags = pd.Series(
+        np.random.RandomState(0).randint(0, 1 << 14, 1000) &
+        ~quality_mapping.VERSION_MASK | 2,
+        index=pd.date_range('20190101', freq='1min', periods=1000),
+        name='quality_flag')
+    flags.iloc[:10] = 2
+    expected = pd.Series(
+        [quality_mapping.check_if_single_value_flagged(flag, desc)
+         for flag in flags], index=flags.index, name=flags.name)
+    out = quality_mapping.check_if_series_flagged(flags, desc)
+    assert_series_equal(out, expected)
+
+
+def test_check_if_series_flagged_unknown_version():
+    # validated, but the version identifier is 0
+    with pytest.raises(KeyError):
+        quality_mapping.check_if_series_flagged(pd.Series([2, 1 << 4]),
+                                                'NIGHTTIME')
+
+
+@pytest.mark.benchmark
+def test_check_if_series_flagged_benchmark():
+    # a year of 1 minute flags
+    index = pd.date_range('20190101', '20200101', freq='1min',
+                          closed='left', tz='UTC')
+    flags = pd.Series(
+        np.random.RandomState(0).randint(0, 1 << 14, len(index)) &
+        ~quality_mapping.VERSION_MASK | 2,
+        index=index)
+    desc = ['OK', 'NIGHTTIME', 'CLEARSKY EXCEEDED']
+    start = time.perf_counter()
+    expected = flags.apply(quality_mapping.check_if_single_value_flagged,
+                           flag_description=desc, _perform_checks=False)
+    apply_time = time.perf_counter() - start
+    start = time.perf_counter()
+    out = quality_mapping.check_if_series_flagged(flags, desc)
+    vectorized_time = time.perf_counter() - start
+    assert_series_equal(out, expected)
+    print(f'\ncheck_if_series_flagged of {len(flags)} flags: apply '
+          f'{apply_time:.3f} s, vectorized {vectorized_time:.3f} s')
@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
 import pandas as pd
 from pandas.testing import assert_series_equal, assert_frame_equal
 import pytest
@@ -733,6 +736,24 @@ def test_daily_observation_validation_other(var, mocker, make_observation,
     assert validate_mock.called
 
 
+def test__preload_solar_position(mocker, make_observation, single_site):
+    obs = [make_observation('ghi'), make_observation('air_temperature'),
+           make_observation('dni'),
+           make_observation('dhi').replace(
+               interval_length=pd.Timedelta('5min'))]
+    preload = mocker.patch(
+        'solarforecastarbiter.pvmodel.preload_solar_position')
+    start = pd.Timestamp('20190101T0000', tz=single_site.timezone)
+    end = pd.Timestamp('20190101T2359', tz=single_site.timezone)
+    tasks._preload_solar_position(obs, start, end)
+    assert preload.call_count == 2
+    args = preload.call_args_list[0][0]
+    assert args[0] == [single_site.latitude] * 2
+    assert args[2] == [single_site.elevation] * 2
+    assert len(args[3]) == 24
+    assert len(preload.call_args_list[1][0][3]) == 288
+
+
 def test_daily_observation_validation_many(mocker, make_observation,
                                            daily_index):
     obs = [make_observation('dhi'), make_observation('dni')]
@@ -753,10 +774,80 @@ def test_daily_observation_validation_many(mocker, make_observation,
     mocker.patch.dict(
         'solarforecastarbiter.validation.tasks.IMMEDIATE_VALIDATION_FUNCS',
         {'dhi': validate_mock, 'dni': validate_mock})
-    tasks.daily_observation_validation(
+    load_tl = mocker.patch(
+        'solarforecastarbiter.pvmodel.load_linke_turbidity')
+    summary = tasks.daily_observation_validation(
         '', data.index[0], data.index[-1])
     assert post_mock.called_once
     assert validate_mock.call_count == 2
+    assert summary.validated == 2
+    assert tasks.pvmodel.SOLAR_POSITION_CACHE is not None
+    load_tl.assert_called_once_with(
+        [o.site.latitude for o in obs], [o.site.longitude for o in obs])
+
+
+def test_daily_observation_validation_many_bulk(mocker, make_observation,
+                                                daily_index):
+    obs = [make_observation('dhi'), make_observation('dni'),
+           make_observation('ghi').replace(observation_id='bad')]
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (-100, 0), (100, 0), (300, 0),
+         (300, 0), (300, 0), (300, 0), (100, 0), (0, 0),
+         (100, 1), (0, 0), (0, 0)],
+        index=daily_index,
+        columns=['value', 'quality_flag'])
+
+    def get_values(obsid, start, end):
+        if obsid == 'bad':
+            raise ValueError('failed')
+        return data.copy()
+
+    mocker.patch('solarforecastarbiter.io.api.APISession.list_observations',
+                 return_value=obs)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        side_effect=get_values)
+    post_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values')
+    validate_mock = mocker.MagicMock()
+    mocker.patch.dict(
+        'solarforecastarbiter.validation.tasks.IMMEDIATE_VALIDATION_FUNCS',
+        {'dhi': validate_mock, 'dni': validate_mock})
+    summary = tasks.daily_observation_validation(
+        '', data.index[0], data.index[-1], max_workers=2)
+    assert post_mock.call_count == 2
+    assert validate_mock.call_count == 2
+    assert post_mock.call_args[1]['params'] == 'donotvalidate'
+    assert summary.validated == 2
+    assert summary.skipped == []
+    assert summary.failed == {'bad': 'ValueError: failed'}
+
+
+def test_daily_observation_validation_bulk_not_enough(
+        mocker, make_observation):
+    obs = [make_observation('ghi')]
+    data = pd.DataFrame(
+        [(0, 0)],
+        index=pd.date_range(start='2019-01-01T0000Z',
+                            end='2019-01-01T0100Z',
+                            tz='UTC',
+                            freq='1h'),
+        columns=['value', 'quality_flag'])
+    mocker.patch('solarforecastarbiter.io.api.APISession.list_observations',
+                 return_value=obs)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        return_value=data)
+    post_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values')
+    log = mocker.patch('solarforecastarbiter.validation.tasks.logger.warning')
+    summary = tasks.daily_observation_validation(
+        '', data.index[0], data.index[-1], max_workers=4)
+    assert log.called
+    assert not post_mock.called
+    assert summary.validated == 0
+    assert summary.skipped == [obs[0].observation_id]
+    assert summary.failed == {}
 
 
 def test_daily_single_observation_validation_not_enough(mocker,
@@ -798,5 +889,337 @@ def test_daily_observation_validation_not_enough(mocker, make_observation):
     log = mocker.patch('solarforecastarbiter.validation.tasks.logger.warning')
     out = tasks.daily_observation_validation(
         '', data.index[0], data.index[-1])
-    assert out is None
+    assert isinstance(out, tasks.ValidationSummary)
+    assert out.validated == 0
+    assert out.skipped == [obs[0].observation_id]
+    assert out.failed == {}
     assert log.called
+
+
+IRRADIANCE_VALUES = [10, 1000, -100, 500, 300, 300, 300, 300, 100, 0, 100,
+                     0, 0]
+# validation function: (variable, values) of an observation whose values
+# are flagged by each check of the function
+FUSED_VALIDATION_DATA = {
+    tasks.validate_ghi: ('ghi', IRRADIANCE_VALUES),
+    tasks.validate_dni: ('dni', [10, 1500, -100, 500, 300, 300, 300, 300,
+                                 100, 0, 100, 0, 0]),
+    tasks.validate_dhi: ('dhi', [10, 900, -100, 500, 300, 300, 300, 300, 100,
+                                 0, 100, 0, 0]),
+    tasks.validate_poa_global: ('poa_global', [10, 1000, -400, 300, 300, 300,
+                                               1500, 300, 100, 0, 100, 0,
+                                               0]),
+    tasks.validate_air_temperature: ('air_temperature', [10, 60, -50, 20, 20,
+                                                         20, 20, 20, 10, 0,
+                                                         10, 0, 0]),
+    tasks.validate_wind_speed: ('wind_speed', [1, 60, -1, 5, 5, 5, 5, 5, 1,
+                                               0, 1, 0, 0]),
+    tasks.validate_relative_humidity: ('relative_humidity', [10, 101, -1, 50,
+                                                             30, 30, 30, 30,
+                                                             10, 0, 10, 0,
+                                                             0]),
+    tasks.validate_timestamp: ('curtailment', IRRADIANCE_VALUES),
+    tasks.validate_daily_ghi: ('ghi', IRRADIANCE_VALUES),
+    tasks.validate_daily_dc_power: ('dc_power', [0, 1000, -100, 500, 300, 300,
+                                                 300, 300, 100, 0, 100, 0,
+                                                 0]),
+    tasks.validate_daily_ac_power: ('ac_power', [0, 100, -100, 100, 300, 300,
+                                                 300, 300, 100, 0, 100, 0,
+                                                 0]),
+}
+
+
+def test_fused_validation_data_covers_checks():
+    assert set(FUSED_VALIDATION_DATA) == set(tasks.FUSED_VALIDATION_CHECKS)
+
+
+@pytest.mark.parametrize('func', list(tasks.FUSED_VALIDATION_CHECKS.keys()),
+                         ids=lambda func: func.__name__)
+def test_run_validation_checks(func, make_observation, daily_index):
+    variable, values = FUSED_VALIDATION_DATA[func]
+    obs = make_observation(variable)
+    data = pd.Series(values, index=daily_index, dtype=float)
+    expected = LATEST_VERSION_FLAG
+    for flag in func(obs, data):
+        expected = expected | flag
+    out = tasks.run_validation_checks(obs, data,
+                                      tasks.FUSED_VALIDATION_CHECKS[func])
+    assert out.dtype == 'uint16'
+    assert_series_equal(out.astype(int), expected.astype(int),
+                        check_names=False)
+    # every check of the function flags some values
+    for name in tasks.FUSED_VALIDATION_CHECKS[func]:
+        description = tasks.VALIDATION_CHECKS[name][0]
+        assert (out & DESCRIPTION_MASK_MAPPING[description]).any(), name
+
+
+def test_run_validation_checks_shared_inputs(mocker, make_observation,
+                                             daily_index):
+    obs = make_observation('ghi')
+    data = pd.Series(100., index=daily_index)
+    solpos = mocker.spy(tasks.pvmodel, 'calculate_solar_position')
+    tasks.run_validation_checks(
+        obs, data, tasks.FUSED_VALIDATION_CHECKS[tasks.validate_daily_ghi])
+    assert solpos.call_count == 1
+
+
+def test_immediate_observation_validation_not_fused(mocker, make_observation,
+                                                    default_index):
+    obs = make_observation('ghi')
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (200, 0), (-1, 1), (1500, 0)],
+        index=default_index,
+        columns=['value', 'quality_flag'])
+    mocker.patch('solarforecastarbiter.io.api.APISession.get_observation',
+                 return_value=obs)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        return_value=data)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values')
+    fused = mocker.spy(tasks, 'run_validation_checks')
+    validate_mock = mocker.MagicMock(
+        return_value=(pd.Series(LATEST_VERSION_FLAG, index=data.index),))
+    mocker.patch.dict(
+        'solarforecastarbiter.validation.tasks.IMMEDIATE_VALIDATION_FUNCS',
+        {'ghi': validate_mock})
+    tasks.immediate_observation_validation(
+        '', obs.observation_id, data.index[0], data.index[-1])
+    assert validate_mock.called
+    assert not fused.called
+
+
+def test_daily_observation_validation_concurrent(mocker, make_observation,
+                                                 daily_index):
+    # validation in worker processes would not see the mocks
+    mocker.patch('solarforecastarbiter.validation.tasks.ProcessPoolExecutor',
+                 new=ThreadPoolExecutor)
+    obs = [make_observation('dhi'), make_observation('dni'),
+           make_observation('ghi').replace(observation_id='bad'),
+           make_observation('ghi').replace(observation_id='short'),
+           make_observation('ghi').replace(observation_id='nopost')]
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (-100, 0), (100, 0), (300, 0),
+         (300, 0), (300, 0), (300, 0), (100, 0), (0, 0),
+         (100, 1), (0, 0), (0, 0)],
+        index=daily_index,
+        columns=['value', 'quality_flag'])
+
+    def get_values(obsid, start, end):
+        if obsid == 'bad':
+            raise ValueError('failed')
+        elif obsid == 'short':
+            return data.iloc[:1].copy()
+        return data.copy()
+
+    def post_values(obsid, values, params=None):
+        if obsid == 'nopost':
+            raise ValueError('not posted')
+
+    mocker.patch('solarforecastarbiter.io.api.APISession.list_observations',
+                 return_value=obs)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        side_effect=get_values)
+    post_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values',
+        side_effect=post_values)
+    validate_mock = mocker.MagicMock()
+    mocker.patch.dict(
+        'solarforecastarbiter.validation.tasks.IMMEDIATE_VALIDATION_FUNCS',
+        {'dhi': validate_mock, 'dni': validate_mock})
+    summary = tasks.daily_observation_validation(
+        '', data.index[0], data.index[-1], max_workers=2, processes=2)
+    assert isinstance(summary, tasks.ValidationSummary)
+    assert summary.validated == 2
+    assert summary.unchanged == []
+    assert summary.skipped == ['short']
+    assert summary.failed == {'bad': 'ValueError: failed',
+                              'nopost': 'ValueError: not posted'}
+    assert summary.seconds > 0
+    assert validate_mock.call_count == 2
+    assert post_mock.call_count == 3
+    assert post_mock.call_args[1]['params'] == 'donotvalidate'
+
+
+def test_start_validation_pool(mocker):
+    # threads stand in for processes that would not share the spy
+    mocker.patch('solarforecastarbiter.validation.tasks.ProcessPoolExecutor',
+                 new=ThreadPoolExecutor)
+    waits = mocker.spy(tasks, '_wait_for_workers')
+    with tasks._start_validation_pool(3, timeout=5) as pool:
+        assert waits.call_count == 3
+        # every worker waited for the others
+        assert not tasks._WORKER_BARRIER.broken
+        assert len(pool._threads) == 3
+
+
+@pytest.fixture()
+def hourly_index(single_site):
+    return pd.date_range(start='2019-01-01T00:00:00',
+                         end='2019-01-01T23:00:00',
+                         freq='1h', tz=single_site.timezone)
+
+
+def test_validate_new_values(make_observation, default_index):
+    obs = make_observation('ghi')
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (200, 0), (-1, 1), (1500, 0)],
+        index=default_index,
+        columns=['value', 'quality_flag'])
+    expected = tasks._validate_immediate_values(obs, data.copy())
+    # second value was flagged without a version and is validated again
+    data['quality_flag'] = [
+        expected['quality_flag'].iloc[0],
+        DESCRIPTION_MASK_MAPPING['LIMITS EXCEEDED'], 0, 1, 0]
+    out = tasks.validate_new_values(obs, data, default_index[1])
+    assert_frame_equal(out, expected.iloc[1:])
+    # values before start are not validated
+    out = tasks.validate_new_values(obs, data, default_index[2])
+    assert_frame_equal(out, expected.iloc[2:])
+
+
+def test_validate_new_values_none_new(make_observation, default_index):
+    obs = make_observation('ghi')
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (200, 0), (-1, 1), (1500, 0)],
+        index=default_index,
+        columns=['value', 'quality_flag'])
+    data = tasks._validate_immediate_values(obs, data)
+    out = tasks.validate_new_values(obs, data, default_index[0])
+    assert out.empty
+
+
+@pytest.mark.parametrize('variable', ['dc_power', 'ac_power'])
+def test_validate_new_values_daily(variable, make_observation, hourly_index):
+    obs = make_observation(variable)
+    values = [0, 0, 0, 0, 0, 0, 0, 10, 50, 90, 90, 90, 90, 120, 150, 150,
+              140, 100, 60, 20, 0, 0, 0, 0]
+    data = pd.DataFrame({'value': values, 'quality_flag': 0},
+                        index=hourly_index)
+    expected = tasks._validate_daily_values(obs, data.copy())
+    data.iloc[:12, 1] = expected['quality_flag'].iloc[:12]
+    out = tasks.validate_new_values(obs, data, hourly_index[12], daily=True)
+    assert_frame_equal(out, expected.iloc[12:])
+
+
+@pytest.mark.parametrize('variable', ['dc_power', 'ac_power'])
+def test_validate_new_values_daily_few_new(variable, make_observation,
+                                           hourly_index):
+    # fewer new values than the daily checks need of the whole window
+    obs = make_observation(variable)
+    values = [0, 0, 0, 0, 0, 0, 0, 10, 50, 90, 90, 90, 90, 120, 150, 150,
+              140, 100, 60, 20, 0, 0, 0, 0]
+    data = pd.DataFrame({'value': values, 'quality_flag': 0},
+                        index=hourly_index)
+    expected = tasks._validate_daily_values(obs, data.copy())
+    data.iloc[:21, 1] = expected['quality_flag'].iloc[:21]
+    out = tasks.validate_new_values(obs, data, hourly_index[21], daily=True)
+    assert_frame_equal(out, expected.iloc[21:])
+
+
+def test_validate_new_values_daily_not_enough(make_observation,
+                                              hourly_index):
+    obs = make_observation('dc_power')
+    data = pd.DataFrame({'value': 1., 'quality_flag': 0},
+                        index=hourly_index[:5])
+    with pytest.raises(IndexError):
+        tasks.validate_new_values(obs, data, hourly_index[0], daily=True)
+
+
+@pytest.mark.parametrize('variable,daily,context', [
+    ('ghi', False, 1),
+    ('ghi', True, 2),
+    ('dc_power', True, 2),
+    ('ac_power', True, 0),
+    ('curtailment', False, 1),
+])
+def test_new_values_start(variable, daily, context, make_observation):
+    obs = make_observation(variable)
+    start = pd.Timestamp('20190101T1200Z')
+    out = tasks.new_values_start(obs, start, daily=daily)
+    assert out == start - context * obs.interval_length
+
+
+def test_immediate_observation_validation_incremental(
+        mocker, make_observation, default_index):
+    obs = make_observation('ghi')
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (200, 0), (-1, 1), (1500, 0)],
+        index=default_index,
+        columns=['value', 'quality_flag'])
+    expected = tasks._validate_immediate_values(obs, data.copy())
+    data.iloc[:3, 1] = expected['quality_flag'].iloc[:3]
+    mocker.patch('solarforecastarbiter.io.api.APISession.get_observation',
+                 return_value=obs)
+    get_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        return_value=data)
+    post_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values')
+
+    tasks.immediate_observation_validation(
+        '', obs.observation_id, data.index[3], data.index[-1],
+        incremental=True)
+    assert get_mock.call_args[0][1] == data.index[2]
+    assert post_mock.call_count == 1
+    assert_frame_equal(post_mock.call_args[0][1], expected.iloc[3:])
+
+
+def test_immediate_observation_validation_incremental_none(
+        mocker, make_observation, default_index):
+    obs = make_observation('ghi')
+    data = pd.DataFrame(
+        [(0, 0), (100, 0), (200, 0), (-1, 1), (1500, 0)],
+        index=default_index,
+        columns=['value', 'quality_flag'])
+    data = tasks._validate_immediate_values(obs, data)
+    mocker.patch('solarforecastarbiter.io.api.APISession.get_observation',
+                 return_value=obs)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        return_value=data)
+    post_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values')
+    tasks.immediate_observation_validation(
+        '', obs.observation_id, data.index[0], data.index[-1],
+        incremental=True)
+    assert not post_mock.called
+
+
+@pytest.mark.parametrize('max_workers,processes', [
+    (None, None), (2, None), (2, 2)])
+def test_daily_observation_validation_incremental(
+        mocker, make_observation, hourly_index, max_workers, processes):
+    mocker.patch('solarforecastarbiter.validation.tasks.ProcessPoolExecutor',
+                 new=ThreadPoolExecutor)
+    obs = [make_observation('dc_power'),
+           make_observation('ac_power').replace(observation_id='done')]
+    values = [0, 0, 0, 0, 0, 0, 0, 10, 50, 90, 90, 90, 90, 120, 150, 150,
+              140, 100, 60, 20, 0, 0, 0, 0]
+    data = pd.DataFrame({'value': values, 'quality_flag': 0},
+                        index=hourly_index)
+    expected = tasks._validate_daily_values(obs[0], data.copy())
+    data.iloc[:12, 1] = expected['quality_flag'].iloc[:12]
+
+    def get_values(obsid, start, end):
+        if obsid == 'done':
+            return tasks._validate_daily_values(obs[1], data.copy())
+        return data.loc[start:end].copy()
+
+    mocker.patch('solarforecastarbiter.io.api.APISession.list_observations',
+                 return_value=obs)
+    mocker.patch(
+        'solarforecastarbiter.io.api.APISession.get_observation_values',
+        side_effect=get_values)
+    post_mock = mocker.patch(
+        'solarforecastarbiter.io.api.APISession.post_observation_values')
+    summary = tasks.daily_observation_validation(
+        '', hourly_index[12], hourly_index[-1], max_workers=max_workers,
+        processes=processes, incremental=True)
+    assert summary.validated == 1
+    assert summary.unchanged == ['done']
+    assert summary.skipped == []
+    assert post_mock.call_count == 1
+    assert post_mock.call_args[0][0] == 'OBSID'
+    assert_frame_equal(post_mock.call_args[0][1], expected.iloc[12:])
@@ -9,6 +9,7 @@ import numpy as np
 import pandas as pd
 from pandas.util.testing import assert_series_equal
 from datetime import datetime
+import time
 import pytz
 import pytest
 from solarforecastarbiter.validation import validator
@@ -311,6 +312,70 @@ def test_detect_interpolation():
         validator.detect_interpolation(x, window=2)
 
 
+def _rolling_stale_values(x, window=3, rtol=1e-5, atol=1e-8):
+    # the rolling apply implementation that _stale_window_flags replaces
+    return x.rolling(window=window).apply(
+        validator._all_close_to_first, raw=True,
+        kwargs={'rtol': rtol, 'atol': atol}).fillna(False).astype(bool)
+
+
+@pytest.fixture
+def stale_test_values():
+    rng = np.random.RandomState(42)
+    values = rng.choice([0., -0., 1., 1 + 1e-6, 1.001, 1e-8, 2e-8, -1e-8,
+                         1e6, 1e6 + 5, 1e6 + 20], size=2000)
+    values[rng.randint(0, 2000, 50)] = np.nan
+    values[rng.randint(0, 2000, 10)] = np.inf
+    values[rng.randint(0, 2000, 10)] = -np.inf
+    # runs of stale and linear data
+    values[100:120] = 5.
+    values[300:330] = np.arange(30) * 0.5
+    return values
+
+
+@pytest.mark.parametrize('window', [2, 3, 4, 7, 30])
+@pytest.mark.parametrize('rtol,atol', [
+    (1e-5, 1e-8), (0, 0), (1e-3, 0), (0, 1e-3), (1e-8, 10.)])
+def test_stale_window_flags_equivalence(stale_test_values, window, rtol,
+                                        atol):
+    x = pd.Series(stale_test_values)
+    expected = _rolling_stale_values(x, window, rtol, atol)
+    assert_series_equal(
+        validator.detect_stale_values(x, window, rtol, atol),
+        expected)
+    if window > 2:
+        expected = _rolling_stale_values(x.diff(), window - 1, rtol, atol)
+        assert_series_equal(
+            validator.detect_interpolation(x, window, rtol, atol),
+            expected)
+
+
+@pytest.mark.parametrize('values', [[], [1.], [1., 1.], [np.nan] * 4])
+def test_stale_window_flags_short(values):
+    x = pd.Series(values, dtype=float)
+    assert_series_equal(
+        validator.detect_stale_values(x),
+        _rolling_stale_values(x))
+
+
+@pytest.mark.benchmark
+def test_stale_window_flags_benchmark():
+    # a month of 1 minute data
+    index = pd.date_range('20190101', '20190201', freq='1min',
+                          closed='left', tz='UTC')
+    x = pd.Series(np.round(np.random.RandomState(0).rand(len(index)), 2),
+                  index=index)
+    start = time.perf_counter()
+    expected = _rolling_stale_values(x)
+    rolling_time = time.perf_counter() - start
+    start = time.perf_counter()
+    out = validator.detect_stale_values(x)
+    kernel_time = time.perf_counter() - start
+    assert_series_equal(out, expected)
+    print(f'\ndetect_stale_values of {len(x)} values: rolling apply '
+          f'{rolling_time:.3f} s, kernel {kernel_time:.3f} s')
+
+
 @pytest.fixture
 def ghi_clearsky():
     MST = pytz.timezone('Etc/GMT+7')
@@ -540,9 +540,55 @@ def detect_stale_values(x, window=3, rtol=1e-5, atol=1e-8):
     if window < 2:
         raise ValueError('window set to {}, must be at least 2'.format(window))
 
-    flags = x.rolling(window=window).apply(
-        _all_close_to_first, raw=True, kwargs={'rtol': rtol, 'atol': atol}
-        ).fillna(False).astype(bool)
+    flags = _stale_window_flags(np.asarray(x, dtype=float), window, rtol,
+                                atol)
+    return pd.Series(flags, index=x.index, name=x.name)
+
+
+def _stale_window_flags(values, window, rtol=1e-5, atol=1e-8):
+    """ Flags the last value of each window of values that are all close
+    to the first value of the window.
+
+    Gives the same result as applying :py:func:`_all_close_to_first` to
+    each rolling window of values in O(n) time for any window. Since
+    the tolerance only depends on the first value, a window is close if
+    the rolling maximum and minimum of the window are close to its first
+    value. Windows that contain NaN or inf are not flagged, as pandas
+    rolling windows treat inf as NaN.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1-D array of floats
+    window : int
+        number of values in each window
+    rtol : float, default 1e-5
+        relative tolerance for detecting a change in data values
+    atol : float, default 1e-8
+        absolute tolerance for detecting a change in data values
+
+    Returns
+    -------
+    flags : np.ndarray
+        Boolean array with the length of values
+    """
+    flags = np.zeros(len(values), dtype=bool)
+    nwindows = len(values) - window + 1
+    if nwindows <= 0:
+        return flags
+    finite = np.isfinite(values)
+    # number of values that are not finite in each window
+    nonfinite = np.concatenate([[0], np.cumsum(~finite)])
+    nonfinite = nonfinite[window:] - nonfinite[:nwindows]
+    rolling = pd.Series(np.where(finite, values, 0.)).rolling(window)
+    upper = rolling.max().to_numpy()[window - 1:]
+    lower = rolling.min().to_numpy()[window - 1:]
+    first = values[:nwindows]
+    with np.errstate(invalid='ignore'):
+        # largest difference of any value in the window from the first
+        spread = np.maximum(upper - first, first - lower)
+        close = spread <= atol + rtol * np.abs(first)
+    flags[window - 1:] = close & (nonfinite == 0)
     return flags
 
 